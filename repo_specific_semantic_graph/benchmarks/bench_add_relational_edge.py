@@ -0,0 +1,89 @@
+"""
+Measure the throughput of DependencyGraph.add_relational_edge when the nodes, edges and locations are freshly created
+for every edge, as a graph generator does, compared to interned and already hashed ones.
+
+Usage:
+    python -m benchmarks.bench_add_relational_edge --files 1000 --functions-per-file 20
+"""
+
+import argparse
+import gc
+import time
+from typing import List, Tuple
+
+from benchmarks.bench_graph_backends import REPO_PATH, make_edges
+from dependency_graph import DependencyGraph
+from dependency_graph.models.graph_data import Edge, Interner, Location, Node
+from dependency_graph.models.language import Language
+
+
+def copy_location(location: Location) -> Location:
+    if location is None:
+        return None
+    return Location(
+        file_path=location.file_path,
+        start_line=location.start_line,
+        start_column=location.start_column,
+        end_line=location.end_line,
+        end_column=location.end_column,
+    )
+
+
+def copy_edges(
+    edges: List[Tuple[Node, Node, Edge, Edge]]
+) -> List[Tuple[Node, Node, Edge, Edge]]:
+    """Create new equal objects for every edge, which have not been hashed yet"""
+    copied_edges = []
+    for u, v, edge, inverse_edge in edges:
+        location = copy_location(edge.location)
+        copied_edges.append(
+            (
+                Node(type=u.type, name=u.name, location=copy_location(u.location)),
+                Node(type=v.type, name=v.name, location=copy_location(v.location)),
+                Edge(relation=edge.relation, location=location),
+                Edge(relation=inverse_edge.relation, location=location),
+            )
+        )
+    return copied_edges
+
+
+def bench(edges: List[Tuple[Node, Node, Edge, Edge]], variant: str) -> float:
+    """Return the number of relational edges added per second"""
+    if variant != "reused":
+        edges = copy_edges(edges)
+    gc.collect()
+    start = time.perf_counter()
+    graph = DependencyGraph(REPO_PATH, Language.Python)
+    if variant == "interned":
+        intern = Interner()
+        for u, v, edge, inverse_edge in edges:
+            graph.add_relational_edge(
+                intern(u), intern(v), intern(edge), intern(inverse_edge)
+            )
+    else:
+        for u, v, edge, inverse_edge in edges:
+            graph.add_relational_edge(u, v, edge, inverse_edge)
+    return len(edges) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark DependencyGraph.add_relational_edge."
+    )
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--functions-per-file", type=int, default=20)
+    parser.add_argument("--calls-per-function", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    edges = make_edges(
+        args.files, args.functions_per_file, args.calls_per_function, args.seed
+    )
+    print(f"Adding {len(edges)} relational edges, best of {args.repeat}")
+    # fresh: new equal objects for every edge, hashed once each thanks to the cached hash
+    # interned: the fresh objects interned before being added, so the graph compares them by identity
+    # reused: objects that are already hashed, e.g. the nodes of another graph
+    for variant in ("fresh", "interned", "reused"):
+        throughput = max(bench(edges, variant) for _ in range(args.repeat))
+        print(f"{variant:<12}{throughput:>16.0f} edges/s")
@@ -0,0 +1,193 @@
+"""
+Compare the memory usage and throughput of the networkx-backed DependencyGraph and the array-backed
+CompactDependencyGraph on a synthetic graph.
+
+Usage:
+    python -m benchmarks.bench_graph_backends --files 2000 --functions-per-file 20
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Tuple, Type
+
+from dependency_graph import CompactDependencyGraph, DependencyGraph
+from dependency_graph.models.graph_data import (
+    Edge,
+    EdgeRelation,
+    Location,
+    Node,
+    NodeType,
+)
+from dependency_graph.models.language import Language
+
+REPO_PATH = Path("/repo")
+
+
+def make_edges(
+    number_of_files: int, functions_per_file: int, calls_per_function: int, seed: int
+) -> List[Tuple[Node, Node, Edge, Edge]]:
+    """Generate the relational edges of a synthetic repository"""
+    rng = random.Random(seed)
+    modules, functions = [], []
+    for i in range(number_of_files):
+        file_path = REPO_PATH / f"pkg{i % 50}" / f"module{i}.py"
+        end_line = functions_per_file * 10
+        modules.append(
+            Node(
+                type=NodeType.MODULE,
+                name=f"module{i}",
+                location=Location(file_path, 1, 1, end_line, 1),
+            )
+        )
+        for j in range(functions_per_file):
+            functions.append(
+                Node(
+                    type=NodeType.FUNCTION,
+                    name=f"function{j}",
+                    location=Location(file_path, j * 10 + 1, 1, j * 10 + 9, 1),
+                )
+            )
+
+    edges = []
+    for function in functions:
+        module = modules[int(function.location.file_path.stem[len("module") :])]
+        edges.append(
+            (
+                module,
+                function,
+                Edge(EdgeRelation.ParentOf),
+                Edge(EdgeRelation.ChildOf),
+            )
+        )
+        for _ in range(calls_per_function):
+            callee = rng.choice(functions)
+            location = Location(
+                function.location.file_path,
+                function.location.start_line + 1,
+                5,
+                function.location.start_line + 1,
+                15,
+            )
+            edges.append(
+                (
+                    function,
+                    callee,
+                    Edge(EdgeRelation.Calls, location),
+                    Edge(EdgeRelation.CalledBy, location),
+                )
+            )
+    for module in modules:
+        importee = rng.choice(modules)
+        location = Location(module.location.file_path, 1, 1, 1, 20)
+        edges.append(
+            (
+                module,
+                importee,
+                Edge(EdgeRelation.Imports, location),
+                Edge(EdgeRelation.ImportedBy, location),
+            )
+        )
+    return edges
+
+
+def bench(
+    graph_class: Type[DependencyGraph],
+    edges: List[Tuple[Node, Node, Edge, Edge]],
+    json_round_trip: bool = False,
+) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = graph_class(REPO_PATH, Language.Python)
+    graph.add_relational_edges_from(edges)
+    build_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = graph.get_nodes()
+    start = time.perf_counter()
+    for node in nodes:
+        graph.get_related_edges_by_node(node, EdgeRelation.Calls, EdgeRelation.ParentOf)
+    by_node_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.get_related_edges(EdgeRelation.Imports)
+    related_edges_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    list(graph.get_topological_sorting(EdgeRelation.ImportedBy))
+    topological_sorting_time = time.perf_counter() - start
+
+    file_paths = sorted({node.location.file_path for node in nodes})[:100]
+    start = time.perf_counter()
+    for file_path in file_paths:
+        graph.query_edges(source_files=[file_path])
+        graph.query_edges(target_files=[file_path])
+        graph.query_nodes(file_paths=[file_path])
+    query_time = time.perf_counter() - start
+
+    result = {
+        "memory (MiB)": memory / 2**20,
+        "build (s)": build_time,
+        "edges by node (s)": by_node_time,
+        "related edges (s)": related_edges_time,
+        "topological sort (s)": topological_sorting_time,
+        "query 100 files (s)": query_time,
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        binary_path = Path(temp_dir) / "graph.bin"
+        start = time.perf_counter()
+        graph.to_binary(binary_path)
+        result["binary write (s)"] = time.perf_counter() - start
+
+        # CompactDependencyGraph memory-maps the file, DependencyGraph loads every node and edge
+        start = time.perf_counter()
+        binary_graph = graph_class.from_binary(binary_path)
+        result["binary open (s)"] = time.perf_counter() - start
+        del binary_graph
+
+    if json_round_trip:
+        start = time.perf_counter()
+        graph_class.from_json(graph.to_json())
+        result["json round trip (s)"] = time.perf_counter() - start
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DependencyGraph storage backends."
+    )
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--functions-per-file", type=int, default=20)
+    parser.add_argument("--calls-per-function", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also measure the JSON serialization round trip, which is slow for large graphs.",
+    )
+    args = parser.parse_args()
+
+    edges = make_edges(
+        args.files, args.functions_per_file, args.calls_per_function, args.seed
+    )
+    print(f"Synthetic graph with {2 * len(edges)} edges")
+
+    results = {
+        graph_class.__name__: bench(graph_class, edges, args.json)
+        for graph_class in (DependencyGraph, CompactDependencyGraph)
+    }
+    names = list(results)
+    print(f"{'':<24}" + "".join(f"{name:>26}" for name in names))
+    for metric in results[names[0]]:
+        print(
+            f"{metric:<24}"
+            + "".join(f"{results[name][metric]:>26.3f}" for name in names)
+        )
@@ -0,0 +1,93 @@
+"""
+Measure how the Jedi graph generation scales with the number of worker processes, on a synthetic Python repository or
+on an existing one, and check that every run builds the same graph as the serial one.
+
+Usage:
+    python -m benchmarks.bench_jedi_jobs --files 200 --jobs 1,2,4,8
+    python -m benchmarks.bench_jedi_jobs --repo /path/to/repo --jobs 1,4
+    python -m benchmarks.bench_jedi_jobs --jobs 1 --reference-search-depth 1
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Optional
+
+from dependency_graph.graph_generator.jedi_generator import JediDependencyGraphGenerator
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+
+
+def make_repo(root: Path, number_of_files: int, modules_per_package: int = 20):
+    """Create a Python repository whose modules derive from, call and instantiate the classes of the previous ones"""
+    for i in range(number_of_files):
+        package = root / f"pkg{i // modules_per_package}"
+        package.mkdir(exist_ok=True)
+        (package / "__init__.py").touch()
+        if i == 0:
+            header = "class Base0:\n    def run(self):\n        return 0\n"
+        else:
+            previous = f"pkg{(i - 1) // modules_per_package}.module{i - 1}"
+            header = f"from {previous} import Base{i - 1}, helper{i - 1}\n"
+        body = dedent(
+            f"""
+
+            class Base{i}({"Base" + str(i - 1) if i else "object"}):
+                def __init__(self):
+                    self.value = {i}
+
+                def run(self):
+                    return self.value
+
+
+            def helper{i}(x):
+                instance = Base{i}()
+                return instance.run() + x
+            """
+        )
+        if i:
+            body += f"\n\nresult = helper{i - 1}(helper{i}(1))\n"
+        (package / f"module{i}.py").write_text(header + body)
+
+
+def bench(repo_path: Path, jobs: int, reference_search_depth: Optional[int] = None):
+    """Return the graph and the time of the generation in seconds"""
+    repo = Repository(repo_path, Language.Python)
+    start = time.perf_counter()
+    graph = JediDependencyGraphGenerator(
+        jobs=jobs, reference_search_depth=reference_search_depth
+    ).generate(repo)
+    return graph, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Jedi graph generation with several worker processes."
+    )
+    parser.add_argument("--repo", type=Path, default=None)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--jobs", default="1,2,4,8")
+    parser.add_argument("--reference-search-depth", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = args.repo
+        if repo_path is None:
+            repo_path = Path(temp_dir)
+            make_repo(repo_path, args.files)
+
+        print(f"Generating the graph of {repo_path} on {os.cpu_count()} CPUs")
+        serial_edges = None
+        serial_time = None
+        for jobs in map(int, args.jobs.split(",")):
+            graph, elapsed = bench(repo_path, jobs, args.reference_search_depth)
+            edges = graph.get_edges()
+            if serial_edges is None:
+                serial_edges, serial_time = edges, elapsed
+            print(
+                f"jobs={jobs:<4}{elapsed:>10.2f} s{serial_time / elapsed:>8.2f}x"
+                f"{len(edges):>10} edges, same as the first run: {edges == serial_edges}"
+            )
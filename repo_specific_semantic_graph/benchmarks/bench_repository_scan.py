@@ -0,0 +1,89 @@
+"""
+Compare the time to find the code files of a repository with one rglob per extension, as Repository did, and with the
+single scandir walk of scan_files, on a synthetic tree or on an existing repository.
+
+Usage:
+    python -m benchmarks.bench_repository_scan --directories 200 --files-per-directory 50 --language cpp
+    python -m benchmarks.bench_repository_scan --repo /path/to/repo --language python
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.scan_files import scan_files
+
+
+def rglob_files(repo_path: Path, language: Language) -> List[Path]:
+    """The previous implementation of Repository._compute_files"""
+    files = []
+    for extension in Repository.code_file_extensions[language]:
+        files.extend(
+            file for file in repo_path.rglob(f"*{extension}") if file.is_file()
+        )
+    return list(set(files))
+
+
+def make_tree(
+    root: Path, number_of_directories: int, files_per_directory: int, depth: int
+):
+    """Create a tree of directories with code files of several languages and other files"""
+    suffixes = (".py", ".cpp", ".h", ".js", ".go", ".txt", ".md", ".json")
+    for i in range(number_of_directories):
+        directory = root.joinpath(*(f"d{i % (j + 7)}" for j in range(depth)), f"p{i}")
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(files_per_directory):
+            (directory / f"f{j}{suffixes[j % len(suffixes)]}").write_text("")
+
+
+def bench(function: Callable[[], List[Path]], repeat: int) -> float:
+    """Return the best time of the function in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the discovery of the code files of a repository."
+    )
+    parser.add_argument("--repo", type=Path, default=None)
+    parser.add_argument("--language", type=Language, default=Language.CPP)
+    parser.add_argument("--directories", type=int, default=200)
+    parser.add_argument("--files-per-directory", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = args.repo
+        if repo_path is None:
+            repo_path = Path(temp_dir)
+            make_tree(repo_path, args.directories, args.files_per_directory, args.depth)
+        repo_path = repo_path.resolve()
+        extensions = Repository.code_file_extensions[args.language]
+
+        old_files = rglob_files(repo_path, args.language)
+        new_files = scan_files(repo_path, extensions, respect_gitignore=False)
+        print(
+            f"Finding the {args.language} files of {repo_path}, best of {args.repeat}"
+        )
+        print(
+            f"rglob found {len(old_files)} files, scan_files found {len(new_files)} files"
+        )
+        for name, function in (
+            ("rglob", lambda: rglob_files(repo_path, args.language)),
+            (
+                "scan_files",
+                lambda: scan_files(repo_path, extensions, respect_gitignore=False),
+            ),
+            ("+gitignore", lambda: scan_files(repo_path, extensions)),
+        ):
+            print(f"{name:<12}{bench(function, args.repeat) * 1000:>12.1f} ms")
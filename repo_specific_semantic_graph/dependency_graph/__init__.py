@@ -1,11 +1,14 @@
+import sys
+from dataclasses import replace
 from pathlib import Path
 from textwrap import dedent
-from typing import Union, Optional
+from typing import Union, Optional, Iterable
 
 import networkx as nx
 from ipysigma import Sigma
 from pyvis.network import Network
 
+from dependency_graph.compact_dependency_graph import CompactDependencyGraph
 from dependency_graph.dependency_graph import DependencyGraph
 from dependency_graph.graph_generator import GraphGeneratorType
 from dependency_graph.graph_generator.jedi_generator import JediDependencyGraphGenerator
@@ -13,7 +16,7 @@ from dependency_graph.graph_generator.tree_sitter_generator import (
     TreeSitterDependencyGraphGenerator,
 )
 from dependency_graph.models import PathLike, VirtualPath
-from dependency_graph.models.graph_data import EdgeRelation
+from dependency_graph.models.graph_data import EdgeRelation, Location
 from dependency_graph.models.language import Language
 from dependency_graph.models.repository import Repository
 from dependency_graph.utils.log import setup_logger
@@ -25,7 +28,7 @@ logger = setup_logger()
 def construct_dependency_graph(
     repo: Union[Repository, PathLike],
     dependency_graph_generator: GraphGeneratorType,
-    language: Optional[Language] = None,
+    language: Optional[Union[Language, Iterable[Language]]] = None,
 ) -> DependencyGraph:
     if isinstance(repo, str) or isinstance(repo, Path) or isinstance(repo, VirtualPath):
         if language is None:
@@ -38,30 +41,24 @@ def construct_dependency_graph(
         return TreeSitterDependencyGraphGenerator().generate(repo)
 
 
+def _relativize_location(
+    location: Optional[Location], repo_path: Path
+) -> Optional[Location]:
+    if location and location.file_path and location.file_path.is_relative_to(repo_path):
+        # Copy instead of modifying the location, whose hash is cached by the graph
+        return replace(location, file_path=location.file_path.relative_to(repo_path))
+    return location
+
+
 def stringify_graph(graph: DependencyGraph) -> nx.Graph:
     G = nx.MultiDiGraph()
     for u, v, edge in graph.get_edges():
         # TODO Can we do better to relativize the path elsewhere ?
-        if (
-            u.location
-            and u.location.file_path
-            and u.location.file_path.is_relative_to(graph.repo_path)
-        ):
-            u.location.file_path = u.location.file_path.relative_to(graph.repo_path)
-        if (
-            v.location
-            and v.location.file_path
-            and v.location.file_path.is_relative_to(graph.repo_path)
-        ):
-            v.location.file_path = v.location.file_path.relative_to(graph.repo_path)
-        if (
-            edge.location
-            and edge.location.file_path
-            and edge.location.file_path.is_relative_to(graph.repo_path)
-        ):
-            edge.location.file_path = edge.location.file_path.relative_to(
-                graph.repo_path
-            )
+        u = replace(u, location=_relativize_location(u.location, graph.repo_path))
+        v = replace(v, location=_relativize_location(v.location, graph.repo_path))
+        edge = replace(
+            edge, location=_relativize_location(edge.location, graph.repo_path)
+        )
         str_u, str_v = str(u), str(v)
 
         if not G.has_node(str_u):
@@ -194,6 +191,7 @@ def output_dependency_graph(
 
     :param graph: The Repo-Specific Semantic Graph to output.
     :param output_format: The format in which to output the graph (e.g., "edgelist" or "pyvis").
+        The "ndjson" edge list is written edge by edge and is gzip-compressed if the output file ends with .gz.
     :param output_file: The file path to write the graph to. If None, outputs to stdout.
     """
     logger.info(
@@ -207,6 +205,15 @@ def output_dependency_graph(
             output_file.write_text(data)
         else:
             print(data)
+    elif output_format == "ndjson":
+        if output_file:
+            graph.to_ndjson(output_file)
+        else:
+            graph.to_ndjson(sys.stdout)
+    elif output_format == "binary":
+        if output_file is None:
+            raise ValueError("You must specify an output file for the binary format.")
+        graph.to_binary(output_file)
     elif output_format == "pyvis":
         if output_file is None:
             raise ValueError("You must specify an output file for the pyvis format.")
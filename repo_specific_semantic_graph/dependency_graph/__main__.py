@@ -16,7 +16,7 @@ from dependency_graph.utils.log import setup_logger
 logger = setup_logger()
 
 
-OUTPUT_FORMATS = ["edgelist", "pyvis", "ipysigma"]
+OUTPUT_FORMATS = ["edgelist", "ndjson", "binary", "pyvis", "ipysigma"]
 
 # Press the green button in the gutter to run the script.
 if __name__ == "__main__":
@@ -32,7 +32,11 @@ if __name__ == "__main__":
     )
 
     parser.add_argument(
-        "-l", "--lang", help="The language of the parsed file.", required=True
+        "-l",
+        "--lang",
+        help="The language of the parsed file, or the comma-separated languages of a polyglot repository, "
+        "e.g. typescript,javascript.",
+        required=True,
     )
 
     parser.add_argument(
@@ -63,7 +67,7 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    lang = args.lang
+    lang = args.lang.split(",")
     graph_generator = args.graph_generator
     repo = Repository(args.repo, lang)
     output_file: Path = args.output_file
@@ -0,0 +1,912 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import networkx as nx
+
+from dependency_graph.dependency_graph import DependencyGraph, _to_path
+from dependency_graph.models import PathLike
+from dependency_graph.models.graph_data import (
+    Edge,
+    EdgeRelation,
+    Location,
+    Node,
+    NodeType,
+)
+from dependency_graph.models.language import Language
+from dependency_graph.utils.digraph import lexicographical_cyclic_topological_sort
+
+# Sentinel stored in the integer columns in place of None
+_NONE = -1
+_NODE_TYPES: Tuple[NodeType, ...] = tuple(NodeType)
+_NODE_TYPE_IDS: Dict[NodeType, int] = {t: i for i, t in enumerate(_NODE_TYPES)}
+
+# Binary format: the magic, then the version, offset and length of the JSON header. The header holds the offset, byte
+# length and array typecode of every section, sections are aligned to 8 bytes so that they can be cast in place.
+_BINARY_MAGIC = b"RSSGRAPH"
+_BINARY_VERSION = 1
+_BINARY_PREFIX = struct.Struct("<IQQ")
+_BINARY_ALIGNMENT = 8
+
+
+class _InternTable:
+    """Map hashable values to dense integer ids and back."""
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: Optional[Hashable]) -> int:
+        if value is None:
+            return _NONE
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def lookup(self, value: Optional[Hashable]) -> Optional[int]:
+        """Return the id of the value without interning it, or None if it is unknown."""
+        if value is None:
+            return _NONE
+        return self.ids.get(value)
+
+    def get(self, value_id: int) -> Optional[Hashable]:
+        return None if value_id == _NONE else self.values[value_id]
+
+
+class _LazyInternTable(_InternTable):
+    """
+    An _InternTable whose values are decoded on demand, e.g. from a memory-mapped file. The reverse mapping from values
+    to ids is only built when a value is looked up or interned.
+    """
+
+    def __init__(self, length: int, decode: Callable[[int], Hashable]):
+        super().__init__()
+        self._length = length
+        self._decode = decode
+        self._decoded: Dict[int, Hashable] = {}
+        self._loaded = False
+
+    def load(self):
+        if not self._loaded:
+            self.values = [self.get(i) for i in range(self._length)]
+            self.ids = {value: i for i, value in enumerate(self.values)}
+            self._decoded.clear()
+            self._decode = None
+            self._loaded = True
+
+    def __len__(self) -> int:
+        return len(self.values) if self._loaded else self._length
+
+    def intern(self, value: Optional[Hashable]) -> int:
+        self.load()
+        return super().intern(value)
+
+    def lookup(self, value: Optional[Hashable]) -> Optional[int]:
+        self.load()
+        return super().lookup(value)
+
+    def get(self, value_id: int) -> Optional[Hashable]:
+        if self._loaded or value_id == _NONE:
+            return super().get(value_id)
+        value = self._decoded.get(value_id)
+        if value is None:
+            value = self._decoded[value_id] = self._decode(value_id)
+        return value
+
+
+def _build_csr(nodes: Sequence[int]) -> Tuple[array, array]:
+    """
+    Build the CSR offsets of the given edge endpoints and the edge indices sorted by endpoint. The counting sort is
+    stable, so that the edges of an endpoint keep their insertion order.
+    """
+    number_of_nodes = max(nodes, default=-1) + 1
+    offsets = array("i", bytes(4 * (number_of_nodes + 1)))
+    for node in nodes:
+        offsets[node + 1] += 1
+    for i in range(number_of_nodes):
+        offsets[i + 1] += offsets[i]
+
+    cursor = offsets[:-1]
+    order = array("i", bytes(4 * len(nodes)))
+    for i, node in enumerate(nodes):
+        order[cursor[node]] = i
+        cursor[node] += 1
+    return offsets, order
+
+
+def _csr_edges(
+    offsets: Sequence[int], order: Sequence[int], node: int
+) -> Iterable[int]:
+    if node >= len(offsets) - 1:
+        return
+    for i in range(offsets[node], offsets[node + 1]):
+        yield order[i]
+
+
+class _EdgeColumns:
+    """
+    The edges of a single relation. Edges are appended to parallel arrays (COO format). A CSR index sorted by the
+    source node and one sorted by the target node are built lazily on the first adjacency query after a modification.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[int] = None,
+        targets: Sequence[int] = None,
+        locations: Sequence[int] = None,
+        offsets: Sequence[int] = None,
+    ):
+        """
+        The columns are empty by default. Read-only columns sorted by source node can be given with their CSR offsets,
+        e.g. memoryviews of a memory-mapped file, they are copied by make_mutable before any modification.
+        """
+        self.sources = array("i") if sources is None else sources
+        self.targets = array("i") if targets is None else targets
+        self.locations = array("i") if locations is None else locations
+        self._offsets: Optional[Sequence[int]] = offsets
+        self._order: Optional[Sequence[int]] = (
+            None if offsets is None else range(len(self.sources))
+        )
+        self._in_offsets: Optional[Sequence[int]] = None
+        self._in_order: Optional[Sequence[int]] = None
+
+    def make_mutable(self):
+        if not isinstance(self.sources, array):
+            self.sources = array("i", self.sources)
+            self.targets = array("i", self.targets)
+            self.locations = array("i", self.locations)
+            self._offsets = self._order = None
+            self._in_offsets = self._in_order = None
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def append(self, source: int, target: int, location: int):
+        self.sources.append(source)
+        self.targets.append(target)
+        self.locations.append(location)
+        self._offsets = self._order = None
+        self._in_offsets = self._in_order = None
+
+    def csr(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """Return the CSR offsets by source node and the edge indices in that order"""
+        if self._offsets is None:
+            self._offsets, self._order = _build_csr(self.sources)
+        return self._offsets, self._order
+
+    def out_edges(self, source: int) -> Iterable[int]:
+        """Yield the edge indices going out of the source node"""
+        return _csr_edges(*self.csr(), source)
+
+    def in_edges(self, target: int) -> Iterable[int]:
+        """Yield the edge indices coming into the target node"""
+        if self._in_offsets is None:
+            self._in_offsets, self._in_order = _build_csr(self.targets)
+        return _csr_edges(self._in_offsets, self._in_order, target)
+
+
+class CompactDependencyGraph(DependencyGraph):
+    """
+    A DependencyGraph backed by compact array storage instead of a `networkx.MultiDiGraph`.
+
+    Paths, names and locations are interned to integer ids, node attributes are held in parallel columns and the edges
+    of each EdgeRelation are stored in their own arrays with a lazily built CSR adjacency index. It exposes the same API
+    as DependencyGraph but uses a fraction of the memory for large graphs.
+
+    Accessing `graph` materializes an equivalent `networkx.MultiDiGraph`, which is expensive and is only provided for
+    compatibility.
+    """
+
+    def __init__(self, repo_path: PathLike, *languages: Language) -> None:
+        self._clear()
+        super().__init__(repo_path, *languages)
+
+    def _clear(self):
+        self._paths = _InternTable()
+        self._names = _InternTable()
+        self._locations = _InternTable()
+        # Location columns
+        self._location_path = array("i")
+        self._location_start_line = array("i")
+        self._location_start_column = array("i")
+        self._location_end_line = array("i")
+        self._location_end_column = array("i")
+        # Node columns, the mapping from node keys to ids is built lazily
+        self._node_id_map: Optional[Dict[Tuple[int, int, int], int]] = {}
+        self._node_type = array("b")
+        self._node_name = array("i")
+        self._node_location = array("i")
+        # The ids of the nodes located in each file by path id, built lazily
+        self._nodes_by_path: Optional[Dict[int, array]] = None
+        # Edge columns per relation
+        self._edges: Dict[EdgeRelation, _EdgeColumns] = {}
+        self._in_degrees: Optional[array] = None
+        # The memory-mapped file the columns are read from, see from_binary
+        self._mmap: Optional[mmap.mmap] = None
+        self._binary_path: Optional[Path] = None
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        G = nx.MultiDiGraph()
+        G.add_nodes_from(self.get_nodes())
+        for u, v, edge in self.get_edges():
+            G.add_edge(u, v, relation=edge)
+        return G
+
+    @graph.setter
+    def graph(self, G: nx.MultiDiGraph):
+        """Replace the content of this graph by the given networkx graph"""
+        self._clear()
+        self._add_nodes(G.nodes())
+        for u, v, edge in G.edges(data="relation"):
+            self._add_edge(u, v, edge)
+
+    @property
+    def _node_ids(self) -> Dict[Tuple[int, int, int], int]:
+        if self._node_id_map is None:
+            self._node_id_map = {
+                key: node_id
+                for node_id, key in enumerate(
+                    zip(self._node_type, self._node_name, self._node_location)
+                )
+            }
+        return self._node_id_map
+
+    def _make_mutable(self):
+        """Copy the columns read from a memory-mapped file into arrays before modifying them"""
+        if self._mmap is None:
+            return
+
+        for table in (self._paths, self._names, self._locations):
+            table.load()
+        self._location_path = array("i", self._location_path)
+        self._location_start_line = array("i", self._location_start_line)
+        self._location_start_column = array("i", self._location_start_column)
+        self._location_end_line = array("i", self._location_end_line)
+        self._location_end_column = array("i", self._location_end_column)
+        self._node_type = array("b", self._node_type)
+        self._node_name = array("i", self._node_name)
+        self._node_location = array("i", self._node_location)
+        for columns in self._edges.values():
+            columns.make_mutable()
+        self._mmap = self._binary_path = None
+
+    def __reduce_ex__(self, protocol):
+        # A graph still backed by its memory-mapped file is pickled as a reference to the file
+        if self._mmap is not None:
+            return type(self).from_binary, (self._binary_path,)
+        return super().__reduce_ex__(protocol)
+
+    # Encoding/decoding between the dataclasses and the columns
+    def _intern_location(self, location: Optional[Location]) -> int:
+        if location is None:
+            return _NONE
+
+        columns = (
+            self._paths.intern(location.file_path),
+            _NONE if location.start_line is None else location.start_line,
+            _NONE if location.start_column is None else location.start_column,
+            _NONE if location.end_line is None else location.end_line,
+            _NONE if location.end_column is None else location.end_column,
+        )
+        number_of_locations = len(self._locations)
+        location_id = self._locations.intern(columns)
+        if location_id == number_of_locations:
+            self._location_path.append(columns[0])
+            self._location_start_line.append(columns[1])
+            self._location_start_column.append(columns[2])
+            self._location_end_line.append(columns[3])
+            self._location_end_column.append(columns[4])
+        return location_id
+
+    def _lookup_location(self, location: Optional[Location]) -> Optional[int]:
+        if location is None:
+            return _NONE
+
+        path_id = self._paths.lookup(location.file_path)
+        if path_id is None:
+            return None
+        return self._locations.lookup(
+            (
+                path_id,
+                _NONE if location.start_line is None else location.start_line,
+                _NONE if location.start_column is None else location.start_column,
+                _NONE if location.end_line is None else location.end_line,
+                _NONE if location.end_column is None else location.end_column,
+            )
+        )
+
+    def _decode_location(self, location_id: int) -> Optional[Location]:
+        if location_id == _NONE:
+            return None
+
+        def _value(column: array) -> Optional[int]:
+            value = column[location_id]
+            return None if value == _NONE else value
+
+        return Location(
+            file_path=self._paths.get(self._location_path[location_id]),
+            start_line=_value(self._location_start_line),
+            start_column=_value(self._location_start_column),
+            end_line=_value(self._location_end_line),
+            end_column=_value(self._location_end_column),
+        )
+
+    def _intern_node(self, node: Node) -> int:
+        key = (
+            _NODE_TYPE_IDS.get(node.type, _NONE),
+            self._names.intern(node.name),
+            self._intern_location(node.location),
+        )
+        node_id = self._node_ids.get(key)
+        if node_id is None:
+            node_id = len(self._node_type)
+            self._node_ids[key] = node_id
+            self._node_type.append(key[0])
+            self._node_name.append(key[1])
+            self._node_location.append(key[2])
+            if self._nodes_by_path is not None:
+                self._nodes_by_path.setdefault(
+                    self._node_path(node_id), array("i")
+                ).append(node_id)
+        return node_id
+
+    def _lookup_node(self, node: Node) -> Optional[int]:
+        name_id = self._names.lookup(node.name)
+        location_id = self._lookup_location(node.location)
+        if name_id is None or location_id is None:
+            return None
+        return self._node_ids.get(
+            (_NODE_TYPE_IDS.get(node.type, _NONE), name_id, location_id)
+        )
+
+    def _decode_node(self, node_id: int) -> Node:
+        node_type = self._node_type[node_id]
+        return Node(
+            type=None if node_type == _NONE else _NODE_TYPES[node_type],
+            name=self._names.get(self._node_name[node_id]),
+            location=self._decode_location(self._node_location[node_id]),
+        )
+
+    def _decode_edge(
+        self,
+        relation: EdgeRelation,
+        columns: _EdgeColumns,
+        index: int,
+        nodes: Optional[Dict[int, Node]] = None,
+    ) -> Tuple[Node, Node, Edge]:
+        """Decode an edge, the nodes already decoded can be given to be reused"""
+        if nodes is None:
+            source = self._decode_node(columns.sources[index])
+            target = self._decode_node(columns.targets[index])
+        else:
+            source, target = columns.sources[index], columns.targets[index]
+            if source not in nodes:
+                nodes[source] = self._decode_node(source)
+            if target not in nodes:
+                nodes[target] = self._decode_node(target)
+            source, target = nodes[source], nodes[target]
+        return (
+            source,
+            target,
+            Edge(
+                relation=relation,
+                location=self._decode_location(columns.locations[index]),
+            ),
+        )
+
+    # Mutations
+    def _add_nodes(self, nodes: Iterable[Node]) -> bool:
+        self._make_mutable()
+        number_of_nodes = len(self._node_type)
+        for node in nodes:
+            self._intern_node(node)
+        return len(self._node_type) != number_of_nodes
+
+    def _add_edge(self, n1: Node, n2: Node, edge: Edge):
+        self._make_mutable()
+        self._in_degrees = None
+        columns = self._edges.get(edge.relation)
+        if columns is None:
+            columns = self._edges[edge.relation] = _EdgeColumns()
+        columns.append(
+            self._intern_node(n1),
+            self._intern_node(n2),
+            self._intern_location(edge.location),
+        )
+
+    def add_node(self, node: Node):
+        if self._add_nodes((node,)):
+            self._notify_update()
+
+    def add_nodes_from(self, nodes: Iterable[Node]):
+        self._add_nodes(nodes)
+        self._notify_update()
+
+    def add_relational_edge(
+        self, n1: Node, n2: Node, r1: Edge, r2: Optional[Edge] = None
+    ):
+        """Add a relational edge between two nodes.
+        r2 can be None to indicate this is a unidirectional edge."""
+        self._add_edge(n1, n2, r1)
+        if r2 is not None:
+            self._add_edge(n2, n1, r2)
+        self._notify_update()
+
+    def remove_file(self, file_path: PathLike):
+        """
+        Remove every node located in the file and every edge whose location belongs to the file, together with the
+        edges connected to the removed nodes. The nodes of other files that are left without any edge are removed too.
+        The columns are rebuilt from the remaining nodes and edges.
+        """
+        path_id = self._paths.lookup(_to_path(file_path))
+        if path_id is None:
+            return
+
+        def _in_file(node_id: int) -> bool:
+            return self._node_path(node_id) == path_id
+
+        def _edge_in_file(columns: _EdgeColumns, index: int) -> bool:
+            location_id = columns.locations[index]
+            if location_id == _NONE:
+                location_in_file = _in_file(columns.sources[index])
+            else:
+                location_in_file = self._location_path[location_id] == path_id
+            return (
+                location_in_file
+                or _in_file(columns.sources[index])
+                or _in_file(columns.targets[index])
+            )
+
+        edges, removed_endpoints, kept_endpoints = [], set(), set()
+        for relation, columns in self._edges.items():
+            for index in range(len(columns)):
+                endpoints = (columns.sources[index], columns.targets[index])
+                if _edge_in_file(columns, index):
+                    removed_endpoints.update(endpoints)
+                else:
+                    kept_endpoints.update(endpoints)
+                    edges.append(self._decode_edge(relation, columns, index))
+        isolated_nodes = removed_endpoints - kept_endpoints
+        nodes = [
+            self._decode_node(node_id)
+            for node_id in range(len(self._node_type))
+            if not _in_file(node_id) and node_id not in isolated_nodes
+        ]
+        self._clear()
+        self._add_nodes(nodes)
+        for edge in edges:
+            self._add_edge(*edge)
+        self._notify_update()
+
+    def compose_all(self, *graphs: "DependencyGraph"):
+        """Merge the given graphs into this graph."""
+        for graph in graphs:
+            self._add_nodes(graph.get_nodes())
+            for u, v, edge in graph.get_edges():
+                self._add_edge(u, v, edge)
+
+        language_set = set(self.languages)
+        for graph in graphs:
+            language_set.update(graph.languages)
+        self.languages = tuple(language_set)
+
+        self._notify_update()
+
+    # Queries
+    def get_related_edges_by_node(
+        self, node: Node, *relations: EdgeRelation
+    ) -> Optional[List[Tuple[Node, Node, Edge]]]:
+        """Get the related edges of the given node by the given relations.
+        If the given node is not in the graph, return None."""
+        node_id = self._lookup_node(node)
+        if node_id is None:
+            return None
+
+        edge_list = []
+        for relation in relations:
+            columns = self._edges.get(relation)
+            if columns is None:
+                continue
+            for index in columns.out_edges(node_id):
+                edge_list.append(self._decode_edge(relation, columns, index))
+        return edge_list
+
+    def get_edges(
+        self,
+        edge_filter: Callable[[Node, Node, Edge], bool] = None,
+    ) -> List[Tuple[Node, Node, Edge]]:
+        edge_list = []
+        for relation, columns in self._edges.items():
+            for index in range(len(columns)):
+                edge = self._decode_edge(relation, columns, index)
+                if edge_filter is None or edge_filter(*edge):
+                    edge_list.append(edge)
+        return edge_list
+
+    def get_nodes(
+        self,
+        node_filter: Callable[[Node], bool] = None,
+    ) -> List[Node]:
+        nodes = map(self._decode_node, range(len(self._node_type)))
+        if node_filter is None:
+            return list(nodes)
+        return list(filter(node_filter, nodes))
+
+    def _node_path(self, node_id: int) -> int:
+        location_id = self._node_location[node_id]
+        return _NONE if location_id == _NONE else self._location_path[location_id]
+
+    def _lookup_paths(
+        self, file_paths: Optional[Iterable[PathLike]]
+    ) -> Optional[Set[int]]:
+        if file_paths is None:
+            return None
+        path_ids = map(self._paths.lookup, map(_to_path, file_paths))
+        return {path_id for path_id in path_ids if path_id is not None}
+
+    def _nodes_in_paths(
+        self, path_ids: Set[int], type_ids: Optional[Set[int]]
+    ) -> List[int]:
+        """Get the ids of the nodes located in the given files and of the given types, in insertion order"""
+        if self._nodes_by_path is None:
+            nodes_by_path: Dict[int, array] = {}
+            for node_id in range(len(self._node_type)):
+                nodes_by_path.setdefault(self._node_path(node_id), array("i")).append(
+                    node_id
+                )
+            self._nodes_by_path = nodes_by_path
+
+        node_ids = [
+            node_id
+            for path_id in path_ids
+            for node_id in self._nodes_by_path.get(path_id, ())
+            if type_ids is None or self._node_type[node_id] in type_ids
+        ]
+        if len(path_ids) > 1:
+            node_ids.sort()
+        return node_ids
+
+    @staticmethod
+    def _lookup_types(node_types: Optional[Iterable[NodeType]]) -> Optional[Set[int]]:
+        if node_types is None:
+            return None
+        return {_NODE_TYPE_IDS.get(node_type, _NONE) for node_type in node_types}
+
+    def query_edges(
+        self,
+        relations: Optional[Iterable[EdgeRelation]] = None,
+        source_files: Optional[Iterable[PathLike]] = None,
+        target_files: Optional[Iterable[PathLike]] = None,
+        source_types: Optional[Iterable[NodeType]] = None,
+        target_types: Optional[Iterable[NodeType]] = None,
+    ) -> List[Tuple[Node, Node, Edge]]:
+        """
+        Get the edges matching all the given filters. A filter that is None matches everything.
+        Unlike DependencyGraph.query_edges, the edges are grouped by relation, in the order the relations were first
+        added or given, and are in insertion order within a relation.
+        When source_files or target_files is given, only the edges of the nodes located in these files are visited,
+        through the CSR indexes of the relations. The other filters are matched against the integer columns, only the
+        matching edges are decoded.
+        """
+        source_paths = self._lookup_paths(source_files)
+        target_paths = self._lookup_paths(target_files)
+        source_type_ids = self._lookup_types(source_types)
+        target_type_ids = self._lookup_types(target_types)
+
+        def _match(
+            node_id: int, paths: Optional[Set[int]], type_ids: Optional[Set[int]]
+        ):
+            return (paths is None or self._node_path(node_id) in paths) and (
+                type_ids is None or self._node_type[node_id] in type_ids
+            )
+
+        # The endpoints whose CSR index is used to find the candidate edges
+        if source_paths is not None:
+            endpoints = self._nodes_in_paths(source_paths, source_type_ids)
+            get_edges = _EdgeColumns.out_edges
+        elif target_paths is not None:
+            endpoints = self._nodes_in_paths(target_paths, target_type_ids)
+            get_edges = _EdgeColumns.in_edges
+        else:
+            endpoints = get_edges = None
+
+        # The nodes of the matching edges are decoded once
+        nodes: Dict[int, Node] = {}
+        edge_list = []
+        for relation in self._edges if relations is None else dict.fromkeys(relations):
+            columns = self._edges.get(relation)
+            if columns is None:
+                continue
+            if endpoints is None:
+                indices = range(len(columns))
+            else:
+                indices = sorted(
+                    index
+                    for node_id in endpoints
+                    for index in get_edges(columns, node_id)
+                )
+            for index in indices:
+                if _match(
+                    columns.sources[index], source_paths, source_type_ids
+                ) and _match(columns.targets[index], target_paths, target_type_ids):
+                    edge_list.append(self._decode_edge(relation, columns, index, nodes))
+        return edge_list
+
+    def query_nodes(
+        self,
+        node_types: Optional[Iterable[NodeType]] = None,
+        file_paths: Optional[Iterable[PathLike]] = None,
+    ) -> List[Node]:
+        """
+        Get the nodes matching all the given filters, in insertion order. A filter that is None matches everything.
+        The nodes of the given files are found by the index of the nodes by file.
+        """
+        paths = self._lookup_paths(file_paths)
+        type_ids = self._lookup_types(node_types)
+        if paths is not None:
+            return list(map(self._decode_node, self._nodes_in_paths(paths, type_ids)))
+        return [
+            self._decode_node(node_id)
+            for node_id in range(len(self._node_type))
+            if type_ids is None or self._node_type[node_id] in type_ids
+        ]
+
+    def get_edge(self, n1: Node, n2: Node) -> Optional[List[Edge]]:
+        source, target = self._lookup_node(n1), self._lookup_node(n2)
+        if source is None or target is None:
+            return None
+
+        edges = [
+            Edge(
+                relation=relation,
+                location=self._decode_location(columns.locations[index]),
+            )
+            for relation, columns in self._edges.items()
+            for index in columns.out_edges(source)
+            if columns.targets[index] == target
+        ]
+        return edges or None
+
+    def get_related_edges(
+        self, *relations: EdgeRelation
+    ) -> List[Tuple[Node, Node, Edge]]:
+        edge_list = [
+            self._decode_edge(relation, self._edges[relation], index)
+            for relation in relations
+            if relation in self._edges
+            for index in range(len(self._edges[relation]))
+        ]
+        # Sort by edge's location
+        return sorted(edge_list, key=lambda e: e[2].location.__str__())
+
+    def get_topological_sorting(self, relation: EdgeRelation = None) -> Iterable[Node]:
+        """
+        Get the topological sorting of the graph.
+        """
+        # Sorting a multigraph of the integer node ids with the string of the decoded node as the key yields the same
+        # order as sorting the networkx graph of Node objects.
+        G = nx.MultiDiGraph()
+        if relation is None:
+            G.add_nodes_from(range(len(self._node_type)))
+            edge_columns = self._edges.values()
+        else:
+            edge_columns = [self._edges[relation]] if relation in self._edges else []
+
+        for columns in edge_columns:
+            G.add_edges_from(zip(columns.sources, columns.targets))
+
+        node_keys = {node_id: str(self._decode_node(node_id)) for node_id in G}
+        yield from map(
+            self._decode_node,
+            lexicographical_cyclic_topological_sort(G, key=node_keys.__getitem__),
+        )
+
+    def in_degree(self, node: Node) -> int:
+        node_id = self._lookup_node(node)
+        if node_id is None:
+            return 0
+        if self._in_degrees is None:
+            in_degrees = array("i", bytes(4 * len(self._node_type)))
+            for columns in self._edges.values():
+                for target in columns.targets:
+                    in_degrees[target] += 1
+            self._in_degrees = in_degrees
+        return self._in_degrees[node_id]
+
+    # Binary serialization
+    def to_binary(self, file_path: PathLike):
+        # Overwriting the memory-mapped file would truncate the columns read from it
+        if (
+            self._mmap is not None
+            and os.path.exists(file_path)
+            and os.path.samefile(file_path, self._binary_path)
+        ):
+            self._make_mutable()
+        # The values of a graph read from a binary file may not be decoded yet, get them by id
+        strings = [
+            str(self._paths.get(i)).encode() for i in range(len(self._paths))
+        ] + [self._names.get(i).encode() for i in range(len(self._names))]
+        string_offsets = array("q", [0])
+        for string in strings:
+            string_offsets.append(string_offsets[-1] + len(string))
+
+        sections = {
+            "strings": b"".join(strings),
+            "string_offsets": string_offsets,
+            "location_path": self._location_path,
+            "location_start_line": self._location_start_line,
+            "location_start_column": self._location_start_column,
+            "location_end_line": self._location_end_line,
+            "location_end_column": self._location_end_column,
+            "node_type": self._node_type,
+            "node_name": self._node_name,
+            "node_location": self._node_location,
+        }
+        for relation, columns in self._edges.items():
+            # Write the edges sorted by source node along with the CSR offsets, so that no index is built on load
+            offsets, order = columns.csr()
+            sections[f"{relation.name}.sources"] = array(
+                "i", (columns.sources[i] for i in order)
+            )
+            sections[f"{relation.name}.targets"] = array(
+                "i", (columns.targets[i] for i in order)
+            )
+            sections[f"{relation.name}.locations"] = array(
+                "i", (columns.locations[i] for i in order)
+            )
+            sections[f"{relation.name}.offsets"] = array("i", offsets)
+
+        header = {
+            "byteorder": sys.byteorder,
+            "repo_path": str(self.repo_path),
+            "languages": [str(language) for language in self.languages],
+            "node_types": [node_type.value for node_type in _NODE_TYPES],
+            "relations": [relation.name for relation in self._edges],
+            "number_of_paths": len(self._paths),
+            "number_of_names": len(self._names),
+            "sections": {},
+        }
+        with open(file_path, "wb") as f:
+            f.write(_BINARY_MAGIC + bytes(_BINARY_PREFIX.size))
+            for name, section in sections.items():
+                f.write(bytes(-f.tell() % _BINARY_ALIGNMENT))
+                if isinstance(section, array):
+                    typecode = section.typecode
+                elif isinstance(section, memoryview):
+                    # A column still read from the memory-mapped file
+                    typecode = section.format
+                else:
+                    typecode = "B"
+                header["sections"][name] = (
+                    f.tell(),
+                    memoryview(section).nbytes,
+                    typecode,
+                )
+                f.write(section)
+
+            header_bytes = json.dumps(header).encode()
+            header_offset = f.tell()
+            f.write(header_bytes)
+            f.seek(len(_BINARY_MAGIC))
+            f.write(
+                _BINARY_PREFIX.pack(_BINARY_VERSION, header_offset, len(header_bytes))
+            )
+
+    @classmethod
+    def from_binary(cls, file_path: PathLike) -> "CompactDependencyGraph":
+        """
+        Open a graph written by to_binary. The file is memory-mapped and only the header is parsed, nodes, edges and
+        strings are decoded when they are accessed. The columns are copied into memory on the first modification.
+        The file paths are loaded as `pathlib.Path`.
+        """
+        with open(file_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[: len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+            raise ValueError(f"{file_path} is not a binary dependency graph file")
+        version, header_offset, header_length = _BINARY_PREFIX.unpack_from(
+            mapped, len(_BINARY_MAGIC)
+        )
+        if version != _BINARY_VERSION:
+            raise ValueError(
+                f"Unsupported binary dependency graph version {version} in {file_path}"
+            )
+        header = json.loads(mapped[header_offset : header_offset + header_length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(
+                f"{file_path} was written on a {header['byteorder']}-endian machine"
+            )
+
+        buffer = memoryview(mapped)
+
+        def _section(name: str) -> memoryview:
+            offset, length, typecode = header["sections"][name]
+            return buffer[offset : offset + length].cast(typecode)
+
+        graph = cls(header["repo_path"], *header["languages"])
+        graph._mmap = mapped
+        graph._binary_path = Path(file_path)
+
+        strings, string_offsets = _section("strings"), _section("string_offsets")
+        number_of_paths = header["number_of_paths"]
+
+        def _decode_string(string_id: int) -> str:
+            return bytes(
+                strings[string_offsets[string_id] : string_offsets[string_id + 1]]
+            ).decode()
+
+        graph._paths = _LazyInternTable(
+            number_of_paths, lambda path_id: Path(_decode_string(path_id))
+        )
+        graph._names = _LazyInternTable(
+            header["number_of_names"],
+            lambda name_id: _decode_string(number_of_paths + name_id),
+        )
+
+        graph._location_path = _section("location_path")
+        graph._location_start_line = _section("location_start_line")
+        graph._location_start_column = _section("location_start_column")
+        graph._location_end_line = _section("location_end_line")
+        graph._location_end_column = _section("location_end_column")
+        location_columns = (
+            graph._location_path,
+            graph._location_start_line,
+            graph._location_start_column,
+            graph._location_end_line,
+            graph._location_end_column,
+        )
+        graph._locations = _LazyInternTable(
+            len(graph._location_path),
+            lambda location_id: tuple(
+                column[location_id] for column in location_columns
+            ),
+        )
+
+        graph._node_type = _section("node_type")
+        if header["node_types"] != [node_type.value for node_type in _NODE_TYPES]:
+            # The node types have changed since the file was written, remap their ids
+            node_type_ids = [
+                _NODE_TYPE_IDS.get(NodeType(value), _NONE)
+                for value in header["node_types"]
+            ]
+            graph._node_type = array(
+                "b",
+                (
+                    _NONE if node_type == _NONE else node_type_ids[node_type]
+                    for node_type in graph._node_type
+                ),
+            )
+        graph._node_name = _section("node_name")
+        graph._node_location = _section("node_location")
+        graph._node_id_map = None
+
+        for name in header["relations"]:
+            graph._edges[EdgeRelation[name]] = _EdgeColumns(
+                _section(f"{name}.sources"),
+                _section(f"{name}.targets"),
+                _section(f"{name}.locations"),
+                _section(f"{name}.offsets"),
+            )
+        return graph
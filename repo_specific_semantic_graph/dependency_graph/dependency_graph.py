@@ -1,15 +1,41 @@
+import gzip
+import heapq
 import json
 import sys
-from functools import lru_cache
+from array import array
+from collections import Counter, defaultdict
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional, Set, Tuple
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import networkx as nx
 from dependency_graph.models import PathLike, VirtualPath
-from dependency_graph.models.graph_data import Edge, EdgeRelation, Node, NodeType
+from dependency_graph.models.graph_data import (
+    Edge,
+    EdgeRelation,
+    Interner,
+    Node,
+    NodeType,
+)
 from dependency_graph.models.language import Language
 from dependency_graph.utils.digraph import lexicographical_cyclic_topological_sort
-from dependency_graph.utils.intervals import find_innermost_interval
+from dependency_graph.utils.intervals import InnermostIntervalIndex
+
+T = TypeVar("T")
 
 if sys.version_info < (3, 9):
 
@@ -24,6 +50,139 @@ if sys.version_info < (3, 9):
     Path.is_relative_to = is_relative_to
 
 
+def _file_path_of(node: Node) -> Optional[Path]:
+    return node.location.file_path if node.location else None
+
+
+def _edge_file_path_of(u: Node, edge: Edge) -> Optional[Path]:
+    """The file an edge comes from: the file of its location, or the file of its source node if it has no location"""
+    if edge.location:
+        return edge.location.file_path
+    return _file_path_of(u)
+
+
+def _to_path(file_path: PathLike) -> Path:
+    return Path(file_path) if isinstance(file_path, str) else file_path
+
+
+def _open_text(file_path: PathLike, mode: str) -> TextIO:
+    """Open a text file, which is gzip-compressed if its suffix is .gz"""
+    if str(file_path).endswith(".gz"):
+        return gzip.open(file_path, mode + "t", encoding="utf-8")
+    return open(file_path, mode, encoding="utf-8")
+
+
+class _GraphIndex:
+    """
+    Secondary indexes of the nodes and edges of a DependencyGraph, maintained on insert.
+
+    Nodes and edges are appended to lists in insertion order, each index maps a key to the ascending positions in
+    these lists so that the results of a query are always in insertion order, whichever index is used.
+    Removed nodes and edges are replaced by None in the lists and skipped by the queries.
+    """
+
+    def __init__(self):
+        self.nodes: List[Node] = []
+        self.edges: List[Tuple[Node, Node, Edge]] = []
+        self.nodes_by_type: Dict[NodeType, Sequence[int]] = defaultdict(
+            partial(array, "i")
+        )
+        self.nodes_by_file: Dict[Path, Sequence[int]] = defaultdict(partial(array, "i"))
+        self.edges_by_relation: Dict[EdgeRelation, Sequence[int]] = defaultdict(
+            partial(array, "i")
+        )
+        self.edges_by_source_file: Dict[Path, Sequence[int]] = defaultdict(
+            partial(array, "i")
+        )
+        self.edges_by_target_file: Dict[Path, Sequence[int]] = defaultdict(
+            partial(array, "i")
+        )
+        self.edges_by_location_file: Dict[Path, Sequence[int]] = defaultdict(
+            partial(array, "i")
+        )
+        self.number_of_removed = 0
+
+    def add_node(self, node: Node):
+        position = len(self.nodes)
+        self.nodes.append(node)
+        self.nodes_by_type[node.type].append(position)
+        self.nodes_by_file[_file_path_of(node)].append(position)
+
+    def add_edge(self, u: Node, v: Node, edge: Edge):
+        position = len(self.edges)
+        self.edges.append((u, v, edge))
+        self.edges_by_relation[edge.relation].append(position)
+        self.edges_by_source_file[_file_path_of(u)].append(position)
+        self.edges_by_target_file[_file_path_of(v)].append(position)
+        self.edges_by_location_file[_edge_file_path_of(u, edge)].append(position)
+
+    def remove_file(
+        self, file_path: Path
+    ) -> Tuple[List[Node], List[Tuple[Node, Node, Edge]]]:
+        """
+        Remove the nodes located in the file and the edges connected to them or located in the file.
+        Return the removed nodes and edges.
+        """
+        node_positions = self.nodes_by_file.pop(file_path, ())
+        edge_positions = sorted(
+            set().union(
+                self.edges_by_source_file.pop(file_path, []),
+                self.edges_by_target_file.pop(file_path, []),
+                self.edges_by_location_file.pop(file_path, []),
+            )
+        )
+        nodes = [self.nodes[p] for p in node_positions if self.nodes[p] is not None]
+        edges = [self.edges[p] for p in edge_positions if self.edges[p] is not None]
+        for p in node_positions:
+            self.nodes[p] = None
+        for p in edge_positions:
+            self.edges[p] = None
+        self.number_of_removed += len(nodes) + len(edges)
+        return nodes, edges
+
+    def remove_nodes(self, nodes: Iterable[Node]):
+        for node in nodes:
+            for p in self.nodes_by_file.get(_file_path_of(node), []):
+                if self.nodes[p] == node:
+                    self.nodes[p] = None
+                    self.number_of_removed += 1
+                    break
+
+    @staticmethod
+    def select(
+        items: List[T],
+        criteria: List[Tuple[Dict[Hashable, Sequence[int]], Set[Hashable], Callable]],
+    ) -> List[T]:
+        """
+        Select the items matching all the criteria. Each criterion is a tuple of an index, the set of keys to match and
+        a function returning the key of an item. The positions of the most selective index are looked up, and the items
+        are checked against the remaining criteria directly.
+        """
+        if not criteria:
+            return [item for item in items if item is not None]
+
+        candidates = []
+        for criterion in criteria:
+            index, keys, _ = criterion
+            position_lists = [index[key] for key in keys if key in index]
+            candidates.append(
+                (sum(map(len, position_lists)), position_lists, criterion)
+            )
+        _, position_lists, best = min(candidates, key=lambda c: c[0])
+        others = [criterion for criterion in criteria if criterion is not best]
+
+        if len(position_lists) == 1:
+            positions = position_lists[0]
+        else:
+            positions = heapq.merge(*position_lists)
+        return [
+            items[p]
+            for p in positions
+            if items[p] is not None
+            and all(key_of(items[p]) in keys for _, keys, key_of in others)
+        ]
+
+
 class DependencyGraph:
     def __init__(self, repo_path: PathLike, *languages: Language) -> None:
         # See https://networkx.org/documentation/stable/reference/classes/multidigraph.html
@@ -33,12 +192,15 @@ class DependencyGraph:
         # De-duplicate the languages and convert to tuple
         self.languages = tuple(set([Language(lang) for lang in languages]))
 
+        self._index = _GraphIndex()
         self._update_callbacks: Set[Callable] = set()
-        # Clear the cache of self.get_edges when the graph is updated
-        self.register_update_callback(self.get_edges.cache_clear)
+        self._retriever: Optional["DependencyGraphContextRetriever"] = None
 
     def as_retriever(self) -> "DependencyGraphContextRetriever":
-        return DependencyGraphContextRetriever(graph=self)
+        # Reuse the retriever so that its indexes are not rebuilt on every call
+        if self._retriever is None:
+            self._retriever = DependencyGraphContextRetriever(graph=self)
+        return self._retriever
 
     def register_update_callback(self, callback):
         if callback not in self._update_callbacks:
@@ -52,10 +214,14 @@ class DependencyGraph:
         if self.graph.has_node(node):
             return
         self.graph.add_node(node)
+        self._index.add_node(node)
         self._notify_update()
 
     def add_nodes_from(self, nodes: Iterable[Node]):
-        self.graph.add_nodes_from(nodes)
+        for node in nodes:
+            if not self.graph.has_node(node):
+                self.graph.add_node(node)
+                self._index.add_node(node)
         self._notify_update()
 
     def add_relational_edge(
@@ -66,8 +232,10 @@ class DependencyGraph:
         self.add_node(n1)
         self.add_node(n2)
         self.graph.add_edge(n1, n2, relation=r1)
+        self._index.add_edge(n1, n2, r1)
         if r2 is not None:
             self.graph.add_edge(n2, n1, relation=r2)
+            self._index.add_edge(n2, n1, r2)
 
     def add_relational_edges_from(
         self, edges: Iterable[Tuple[Node, Node, Edge, Optional[Edge]]]
@@ -78,12 +246,62 @@ class DependencyGraph:
             assert len(e) in (3, 4), f"Invalid edges length: {e}, should be 3 or 4"
             self.add_relational_edge(*e)
 
+    def remove_file(self, file_path: PathLike):
+        """
+        Remove every node located in the file and every edge whose location belongs to the file, together with the
+        edges connected to the removed nodes. The nodes of other files that are left without any edge are removed too.
+        """
+        file_path = _to_path(file_path)
+        nodes, edges = self._index.remove_file(file_path)
+        endpoints = {n for u, v, _ in edges for n in (u, v)}
+        for u, v, edge in edges:
+            # The edges connected to the removed nodes are removed along with them
+            if _file_path_of(u) == file_path or _file_path_of(v) == file_path:
+                continue
+            for key, relation in list(self.graph[u][v].items()):
+                if relation["relation"] == edge:
+                    self.graph.remove_edge(u, v, key)
+                    break
+        self.graph.remove_nodes_from(nodes)
+        isolated_nodes = [
+            n for n in endpoints if n in self.graph and self.graph.degree(n) == 0
+        ]
+        self.graph.remove_nodes_from(isolated_nodes)
+        self._index.remove_nodes(isolated_nodes)
+
+        # Drop the removed entries from the indexes once they take up too much space
+        if (
+            self._index.number_of_removed
+            > (len(self._index.nodes) + len(self._index.edges)) // 2
+        ):
+            self._reindex(self)
+        self._notify_update()
+
+    def replace_file(self, file_path: PathLike, subgraph: "DependencyGraph"):
+        """
+        Replace the nodes and edges of the file by the ones in the given subgraph, which is usually generated for the
+        new content of the file.
+        """
+        self.remove_file(file_path)
+        self.add_nodes_from(subgraph.get_nodes())
+        self.add_relational_edges_from(subgraph.get_edges())
+
+    def get_dependent_files(self, file_paths: Iterable[PathLike]) -> Set[Path]:
+        """
+        Get the files, other than the given ones, whose edges point into the given files. An edge comes from the file of
+        its location, or the file of its source node if it has no location.
+        """
+        file_paths = set(map(_to_path, file_paths))
+        edges = self.query_edges(target_files=file_paths) + self.query_edges(
+            source_files=file_paths
+        )
+        dependent_files = {_edge_file_path_of(u, edge) for u, v, edge in edges}
+        return dependent_files - file_paths - {None}
+
     def get_related_edges(
         self, *relations: EdgeRelation
     ) -> List[Tuple[Node, Node, Edge]]:
-        filtered_edges = self.get_edges(
-            edge_filter=lambda in_node, out_node, edge: edge.relation in relations
-        )
+        filtered_edges = self.query_edges(relations=relations)
         # Sort by edge's location
         return sorted(filtered_edges, key=lambda e: e[2].location.__str__())
 
@@ -105,14 +323,12 @@ class DependencyGraph:
         """Get a subgraph that contains all the nodes and edges that are related to the given relations.
         This subgraph is a new sub-copy of the original graph."""
         edges = self.get_related_edges(*relations)
-        sub_graph = DependencyGraph(self.repo_path, *self.languages)
+        sub_graph = type(self)(self.repo_path, *self.languages)
         sub_graph.add_relational_edges_from(edges)
         return sub_graph
 
-    @lru_cache(maxsize=128)
     def get_edges(
         self,
-        # the edge_filter parameter should also be hashable
         edge_filter: Callable[[Node, Node, Edge], bool] = None,
     ) -> List[Tuple[Node, Node, Edge]]:
         # self.graph.edges(data="relation") is something like:
@@ -124,10 +340,8 @@ class DependencyGraph:
             edge for edge in self.graph.edges(data="relation") if edge_filter(*edge)
         ]
 
-    @lru_cache(maxsize=128)
     def get_nodes(
         self,
-        # the node_filter parameter should also be hashable
         node_filter: Callable[[Node], bool] = None,
     ) -> List[Node]:
         if node_filter is None:
@@ -135,10 +349,86 @@ class DependencyGraph:
 
         return list(filter(node_filter, self.graph.nodes()))
 
+    def query_edges(
+        self,
+        relations: Optional[Iterable[EdgeRelation]] = None,
+        source_files: Optional[Iterable[PathLike]] = None,
+        target_files: Optional[Iterable[PathLike]] = None,
+        source_types: Optional[Iterable[NodeType]] = None,
+        target_types: Optional[Iterable[NodeType]] = None,
+    ) -> List[Tuple[Node, Node, Edge]]:
+        """
+        Get the edges matching all the given filters, in insertion order. A filter that is None matches everything.
+        The source/target file of an edge is the file path of the location of its source/target node.
+        Unlike get_edges, the filters are looked up in indexes instead of scanning the whole graph.
+        """
+        criteria = []
+        if relations is not None:
+            criteria.append(
+                (
+                    self._index.edges_by_relation,
+                    set(relations),
+                    lambda e: e[2].relation,
+                )
+            )
+        if source_files is not None:
+            criteria.append(
+                (
+                    self._index.edges_by_source_file,
+                    set(map(_to_path, source_files)),
+                    lambda e: _file_path_of(e[0]),
+                )
+            )
+        if target_files is not None:
+            criteria.append(
+                (
+                    self._index.edges_by_target_file,
+                    set(map(_to_path, target_files)),
+                    lambda e: _file_path_of(e[1]),
+                )
+            )
+        edge_list = _GraphIndex.select(self._index.edges, criteria)
+
+        # The node types are not indexed for the edges, filter them afterward
+        if source_types is not None:
+            source_types = set(source_types)
+            edge_list = [e for e in edge_list if e[0].type in source_types]
+        if target_types is not None:
+            target_types = set(target_types)
+            edge_list = [e for e in edge_list if e[1].type in target_types]
+        return edge_list
+
+    def query_nodes(
+        self,
+        node_types: Optional[Iterable[NodeType]] = None,
+        file_paths: Optional[Iterable[PathLike]] = None,
+    ) -> List[Node]:
+        """
+        Get the nodes matching all the given filters, in insertion order. A filter that is None matches everything.
+        """
+        criteria = []
+        if node_types is not None:
+            criteria.append(
+                (self._index.nodes_by_type, set(node_types), lambda n: n.type)
+            )
+        if file_paths is not None:
+            criteria.append(
+                (
+                    self._index.nodes_by_file,
+                    set(map(_to_path, file_paths)),
+                    _file_path_of,
+                )
+            )
+        return _GraphIndex.select(self._index.nodes, criteria)
+
     def get_edge(self, n1: Node, n2: Node) -> Optional[List[Edge]]:
         if self.graph.has_edge(n1, n2):
             return [data["relation"] for data in self.graph[n1][n2].values()]
 
+    def in_degree(self, node: Node) -> int:
+        """Get the number of edges pointing to the node, 0 if the node is not in the graph"""
+        return self.graph.in_degree(node) if node in self.graph else 0
+
     def get_topological_sorting(self, relation: EdgeRelation = None) -> Iterable[Node]:
         """
         Get the topological sorting of the graph.
@@ -150,9 +440,13 @@ class DependencyGraph:
         yield from lexicographical_cyclic_topological_sort(G, key=lambda n: str(n))
 
     def compose_all(self, *graphs: "DependencyGraph"):
-        """Merge the given graphs into this graph and return ."""
+        """
+        Merge the given graphs into this graph. The nodes and edges of this graph keep their insertion order, followed
+        by the new ones of the given graphs in their order.
+        """
         all_graphs = [self.graph] + [graph.graph for graph in graphs]
         self.graph = nx.compose_all(all_graphs)
+        self._reindex(self, *graphs)
 
         language_set = set(self.languages)
         for graph in graphs:
@@ -161,6 +455,25 @@ class DependencyGraph:
 
         self._notify_update()
 
+    def _reindex(self, *graphs: "DependencyGraph"):
+        """
+        Rebuild the indexes from self.graph, without the removed entries. The nodes and edges are indexed in the
+        insertion order of the given graphs self.graph is made of, the ones missing from them come last.
+        """
+        index = _GraphIndex()
+        nodes = chain.from_iterable(graph.query_nodes() for graph in graphs)
+        for node in dict.fromkeys(chain(nodes, self.graph.nodes())):
+            index.add_node(node)
+
+        # An edge of the given graphs may have been replaced by nx.compose_all, count the edges that are left
+        remaining_edges = Counter(self.graph.edges(data="relation"))
+        edges = chain.from_iterable(graph.query_edges() for graph in graphs)
+        for edge in chain(edges, self.graph.edges(data="relation")):
+            if remaining_edges[edge] > 0:
+                remaining_edges[edge] -= 1
+                index.add_edge(*edge)
+        self._index = index
+
     def to_dict(self) -> dict:
         edge_list = self.get_edges()
         return {
@@ -175,20 +488,95 @@ class DependencyGraph:
     def to_json(self, indent=None) -> str:
         return json.dumps(self.to_dict(), indent=indent)
 
-    @staticmethod
-    def from_dict(obj_dict: dict) -> "DependencyGraph":
+    @classmethod
+    def from_dict(cls, obj_dict: dict) -> "DependencyGraph":
+        # The nodes are repeated in every edge they belong to, intern them to create and hash them once
+        intern = Interner()
         edges = [
-            (Node.from_dict(edge[0]), Node.from_dict(edge[1]), Edge.from_dict(edge[2]))
+            (
+                intern(Node.from_dict(edge[0])),
+                intern(Node.from_dict(edge[1])),
+                intern(Edge.from_dict(edge[2])),
+            )
             for edge in obj_dict["edges"]
         ]
-        graph = DependencyGraph(obj_dict["repo_path"], *obj_dict["languages"])
+        graph = cls(obj_dict["repo_path"], *obj_dict["languages"])
         graph.add_relational_edges_from(edges)
         return graph
 
-    @staticmethod
-    def from_json(json_str: str) -> "DependencyGraph":
+    @classmethod
+    def from_json(cls, json_str: str) -> "DependencyGraph":
         obj_dict = json.loads(json_str)
-        return DependencyGraph.from_dict(obj_dict)
+        return cls.from_dict(obj_dict)
+
+    def to_ndjson(self, file: Union[PathLike, TextIO]):
+        """
+        Write the graph as newline-delimited JSON: the first line holds the repo_path and the languages, then every
+        line holds an edge in the same format as the edges of to_dict. The edges are written one by one, so the whole
+        document is never held in memory. The file is gzip-compressed if its suffix is .gz.
+        """
+        if not isinstance(file, (str, Path)):
+            header = {"repo_path": str(self.repo_path), "languages": self.languages}
+            file.write(json.dumps(header) + "\n")
+            for u, v, edge in self.get_edges():
+                file.write(
+                    json.dumps((u.to_dict(), v.to_dict(), edge.to_dict())) + "\n"
+                )
+            return
+
+        with _open_text(file, "w") as f:
+            self.to_ndjson(f)
+
+    @classmethod
+    def from_ndjson(cls, file: Union[PathLike, Iterable[str]]) -> "DependencyGraph":
+        """
+        Load a graph written by to_ndjson, from a file path or an iterable of lines. The edges are added line by line
+        without loading the whole document.
+        """
+        if not isinstance(file, (str, Path)):
+            lines = iter(file)
+            header = json.loads(next(lines))
+            graph = cls(header["repo_path"], *header["languages"])
+            intern = Interner()
+            for line in lines:
+                if not line.strip():
+                    continue
+                edge = json.loads(line)
+                graph.add_relational_edge(
+                    intern(Node.from_dict(edge[0])),
+                    intern(Node.from_dict(edge[1])),
+                    intern(Edge.from_dict(edge[2])),
+                )
+            return graph
+
+        with _open_text(file, "r") as f:
+            return cls.from_ndjson(f)
+
+    def to_binary(self, file_path: PathLike):
+        """
+        Write the graph to a binary file, which holds a string table of the paths and names, the node table and the
+        edge arrays of each relation. See CompactDependencyGraph.from_binary for how it is loaded.
+        """
+        from dependency_graph.compact_dependency_graph import CompactDependencyGraph
+
+        graph = CompactDependencyGraph(self.repo_path, *self.languages)
+        graph.add_nodes_from(self.get_nodes())
+        graph.add_relational_edges_from(self.get_edges())
+        graph.to_binary(file_path)
+
+    @classmethod
+    def from_binary(cls, file_path: PathLike) -> "DependencyGraph":
+        """
+        Load a graph written by to_binary. Use CompactDependencyGraph.from_binary instead to memory-map the file and
+        decode the nodes lazily, this method loads every node and edge into a new graph.
+        """
+        from dependency_graph.compact_dependency_graph import CompactDependencyGraph
+
+        compact_graph = CompactDependencyGraph.from_binary(file_path)
+        graph = cls(compact_graph.repo_path, *compact_graph.languages)
+        graph.add_nodes_from(compact_graph.get_nodes())
+        graph.add_relational_edges_from(compact_graph.get_edges())
+        return graph
 
 
 class DependencyGraphContextRetriever:
@@ -200,6 +588,45 @@ class DependencyGraphContextRetriever:
 
     def __init__(self, graph: DependencyGraph):
         self.graph = graph
+        # Lazily built per-file indexes of the graph nodes, they are cleared whenever the graph is updated
+        self._file_index: Dict[
+            Path, Tuple[Optional[InnermostIntervalIndex], List[Node]]
+        ] = {}
+        self.graph.register_update_callback(self._clear_file_index)
+
+    def _clear_file_index(self):
+        self._file_index = {}
+
+    def _get_file_index(
+        self, file_path: Path
+    ) -> Tuple[Optional[InnermostIntervalIndex], List[Node]]:
+        """Get the index of the scope nodes and the module nodes located in the file"""
+        if file_path not in self._file_index:
+            scope_intervals = []
+            module_nodes = []
+            for node in self.graph.query_nodes(file_paths=[file_path]):
+                if node.type == NodeType.MODULE:
+                    module_nodes.append(node)
+                # Statement nodes are not taken into account for now
+                if (
+                    node.type != NodeType.STATEMENT
+                    and node.location.start_line
+                    and node.location.end_line
+                ):
+                    scope_intervals.append(
+                        (node.location.start_line, node.location.end_line, node)
+                    )
+            scope_index = (
+                InnermostIntervalIndex(scope_intervals) if scope_intervals else None
+            )
+            self._file_index[file_path] = (scope_index, module_nodes)
+        return self._file_index[file_path]
+
+    def _get_scope_index(self, file_path: Path) -> Optional[InnermostIntervalIndex]:
+        return self._get_file_index(file_path)[0]
+
+    def _get_module_nodes(self, file_path: Path) -> List[Node]:
+        return self._get_file_index(file_path)[1]
 
     def _Path(self, file_path: PathLike) -> Path:
         if isinstance(self.graph.repo_path, VirtualPath):
@@ -214,19 +641,11 @@ class DependencyGraphContextRetriever:
         file_path: PathLike,
         start_line: int,
     ) -> Optional[Node]:
-        # Statement nodes are not taken into account for now
         file_path = self._Path(file_path)
-        nodes = self.graph.get_nodes(
-            node_filter=lambda n: n.location
-            and n.location.file_path == file_path
-            and n.type != NodeType.STATEMENT
-        )
-        intervals = [
-            (node.location.start_line, node.location.end_line, node)
-            for node in nodes
-            if node.location.start_line and node.location.end_line
-        ]
-        innermost_interval = find_innermost_interval(intervals, start_line)
+        scope_index = self._get_scope_index(file_path)
+        if scope_index is None:
+            return None
+        innermost_interval = scope_index.find_innermost_interval(start_line)
         return innermost_interval[2] if innermost_interval else None
 
     def get_related_edges_by_innermost_node_between_line(
@@ -271,16 +690,12 @@ class DependencyGraphContextRetriever:
         - The out node should be in the same file
         """
         file_path = self._Path(file_path)
-        # Don't feel guilty, self.graph.get_edges is cached!
-        edge_list = self.graph.get_edges(
-            edge_filter=lambda in_node, out_node, edge: self.is_node_from_cross_file(
-                in_node, file_path
-            )
-            and self.is_node_from_in_file(out_node, file_path)
-        )
+        edge_list = [
+            edge
+            for edge in self.graph.query_edges(target_files=[file_path])
+            if self.is_node_from_cross_file(edge[0], file_path)
+        ]
 
-        # This custom edge_filter is applied after the edge_list is constructed by self.graph.get_edges
-        # because we want more cache hits on the filter called above.
         if edge_filter is not None:
             return [edge for edge in edge_list if edge_filter(*edge)]
 
@@ -315,12 +730,7 @@ class DependencyGraphContextRetriever:
             edge_list += related_edge_list
 
         # Find the module node that is related to the file
-        module_node = self.graph.get_nodes(
-            node_filter=lambda n: n.location
-            and n.location.file_path
-            and n.location.file_path == file_path
-            and n.type == NodeType.MODULE
-        )
+        module_node = self._get_module_nodes(file_path)
         # assert (
         #     len(module_node) <= 1
         # ), f"There should be at most 1 module node related to the file: {file_path}"
@@ -396,9 +806,4 @@ class DependencyGraphContextRetriever:
         Get all related edges of a file and return them
         """
         file_path = self._Path(file_path)
-        return self.graph.get_edges(
-            edge_filter=lambda in_node, out_node, edge: self.is_node_from_in_file(
-                in_node, file_path
-            )
-            and edge.relation in relations
-        )
+        return self.graph.query_edges(relations=relations, source_files=[file_path])
@@ -1,10 +1,11 @@
 import enum
 from abc import ABC, abstractmethod, ABCMeta
 from functools import wraps
-from typing import Tuple
+from pathlib import Path
+from typing import Iterable, Set, Tuple
 
 from dependency_graph.dependency_graph import DependencyGraph
-from dependency_graph.models import PathLike
+from dependency_graph.models import PathLike, VirtualPath
 from dependency_graph.models.language import Language
 from dependency_graph.models.repository import Repository
 
@@ -20,12 +21,13 @@ class GraphGeneratorType(str, enum.Enum):
 
 def validate_language(method):
     """
-    Decorator to validate that the language of the repository as the first argument is validated.
+    Decorator to validate that the languages of the repository as the first argument are validated.
     """
 
     @wraps(method)
     def wrapper(self, repo: Repository, *args, **kwargs):
-        self._validate_language(repo.language)
+        for language in repo.languages:
+            self._validate_language(language)
         return method(self, repo, *args, **kwargs)
 
     return wrapper
@@ -34,11 +36,11 @@ def validate_language(method):
 class BaseDependencyGraphGeneratorMeta(ABCMeta):
     def __new__(mcs, name, bases, namespace, **kwargs):
         """
-        This metaclass ensures that any implementation of 'generate_file'/'generate' in a subclass
+        This metaclass ensures that any implementation of 'generate_file'/'generate'/'update' in a subclass
         will automatically have the 'validate_language' decorator applied to it.
         """
         for attr, value in namespace.items():
-            if attr in ("generate_file", "generate") and callable(value):
+            if attr in ("generate_file", "generate", "update") and callable(value):
                 namespace[attr] = validate_language(value)
         return super().__new__(mcs, name, bases, namespace, **kwargs)
 
@@ -66,4 +68,83 @@ class BaseDependencyGraphGenerator(ABC, metaclass=BaseDependencyGraphGeneratorMe
         ...
 
     @abstractmethod
-    def generate(self, repo: Repository) -> DependencyGraph: ...
+    def generate(self, repo: Repository) -> DependencyGraph:
+        ...
+
+    def _Path(self, repo: Repository, file_path: PathLike) -> Path:
+        """
+        Convert the str file path to handle both physical and virtual paths
+        """
+        if isinstance(file_path, Path):
+            return file_path
+        if isinstance(repo.repo_path, VirtualPath):
+            return VirtualPath(repo.repo_path.fs, file_path)
+        return Path(file_path)
+
+    def _update_repository_files(
+        self, repo: Repository, changed_files: Set[Path]
+    ) -> Set[Path]:
+        """
+        Keep the files of the repository in sync with the added and deleted files and return the changed files that
+        still exist in the repository.
+        """
+        existing_files = {
+            file_path
+            for file_path in changed_files
+            if repo.get_file_language(file_path) and file_path.is_file()
+        }
+        repo.files = [
+            file_path for file_path in repo.files if file_path not in changed_files
+        ] + list(existing_files)
+        return existing_files
+
+    def _get_unresolved_importers(
+        self, repo: Repository, added_files: Set[Path]
+    ) -> Set[Path]:
+        """
+        Get the files with imports that were not resolved in the last run and may resolve to the added files. The base
+        generator does not keep them.
+        """
+        return set()
+
+    def update(
+        self,
+        repo: Repository,
+        changed_files: Iterable[PathLike],
+        graph: DependencyGraph,
+    ) -> DependencyGraph:
+        """
+        Update the Repo-Specific Semantic Graph of the repository in place after the given files are added, modified or
+        deleted, and return it.
+        Only the changed files, the files whose edges point into them and, when files are added, the files with
+        unresolved imports are re-analyzed by generate_file. The edges of a dependent file that are not connected to the
+        changed files are still in the graph, so they are not added again.
+        """
+        changed_files = {self._Path(repo, file_path) for file_path in changed_files}
+        dependent_files = graph.get_dependent_files(changed_files)
+        previous_files = set(repo.files)
+        existing_files = self._update_repository_files(repo, changed_files)
+        added_files = existing_files - previous_files
+        if added_files:
+            dependent_files |= self._get_unresolved_importers(repo, added_files)
+        dependent_files &= set(repo.files)
+
+        for file_path in changed_files:
+            graph.remove_file(file_path)
+
+        for file_path in sorted(existing_files):
+            # Don't use graph.replace_file here, it would drop the edges added by the other changed files
+            subgraph = self.generate_file(repo, file_path=file_path)
+            graph.add_nodes_from(subgraph.get_nodes())
+            graph.add_relational_edges_from(subgraph.get_edges())
+
+        for file_path in sorted(dependent_files - existing_files):
+            subgraph = self.generate_file(repo, file_path=file_path)
+            edges = subgraph.query_edges(target_files=changed_files) + [
+                (u, v, edge)
+                for u, v, edge in subgraph.query_edges(source_files=changed_files)
+                if not (v.location and v.location.file_path in changed_files)
+            ]
+            graph.add_relational_edges_from(edges)
+
+        return graph
@@ -1,10 +1,20 @@
+import gc
+import math
+import multiprocessing
 import re
 import sys
 import traceback
-from typing import Dict, Tuple, Optional, List
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Tuple, Optional, List, Iterable, Callable, Set
 
 import jedi
 from jedi.api.classes import Name, BaseName, Completion
+from jedi.cache import clear_time_caches
+from jedi.file_io import FileIO
+from jedi.inference import references as jedi_references
 from parso.python.tree import Name as ParsoTreeName
 from parso.tree import BaseNode
 from tqdm import tqdm
@@ -14,6 +24,9 @@ from dependency_graph.graph_generator import (
     BaseDependencyGraphGenerator,
     GraphGeneratorType,
 )
+from dependency_graph.graph_generator.tree_sitter_generator import (
+    TreeSitterDependencyGraphGenerator,
+)
 from dependency_graph.models import PathLike
 from dependency_graph.models.graph_data import (
     Location,
@@ -21,12 +34,14 @@ from dependency_graph.models.graph_data import (
     EdgeRelation,
     Edge,
     NodeType,
+    Interner,
 )
 from dependency_graph.models.language import Language
 from dependency_graph.models.repository import Repository
 from dependency_graph.models.virtual_fs.virtual_importlib import VirtualFSFinder
 from dependency_graph.models.virtual_fs.virtual_repository import VirtualRepository
 from dependency_graph.utils.log import setup_logger
+from dependency_graph.utils.memory import get_rss, format_size
 from dependency_graph.utils.read_file import read_file_to_string
 
 # Initialize logging
@@ -46,10 +61,356 @@ _JEDI_API_TYPES_dict: Optional[Dict[str, NodeType]] = {
     "namespace": NodeType.MODULE,
 }
 
+# The relational edges of a file in a compact picklable form: the table of the locations as tuples of plain values,
+# the table of the nodes referencing their location by index, and the relational edges referencing their nodes by
+# index, with the relation and the location index of the edge and of its inverse edge
+EncodedEdges = Tuple[
+    List[
+        Tuple[Optional[str], Optional[int], Optional[int], Optional[int], Optional[int]]
+    ],
+    List[Tuple[str, str, int]],
+    List[Tuple[int, int, str, int, Optional[str], int]],
+]
+
+# The maximum number of files sent to a worker process at once
+MAX_CHUNK_SIZE = 16
+
+
+class _EdgeRecorder:
+    """Record the relational edges added by _generate_file in a worker process, in the order they are added"""
+
+    def __init__(self):
+        self.edges: List[Tuple[Node, Node, Edge, Optional[Edge]]] = []
+
+    def add_relational_edge(
+        self, n1: Node, n2: Node, r1: Edge, r2: Optional[Edge] = None
+    ):
+        self.edges.append((n1, n2, r1, r2))
+
+
+def _encode_edges(
+    edges: Iterable[Tuple[Node, Node, Edge, Optional[Edge]]]
+) -> EncodedEdges:
+    """Encode relational edges, which are decoded in the same order by _decode_edges"""
+    locations: Dict[Optional[Location], int] = {None: -1}
+    nodes: Dict[Node, int] = {}
+    location_table, node_table, edge_table = [], [], []
+
+    def encode_location(location: Optional[Location]) -> int:
+        index = locations.get(location)
+        if index is None:
+            index = locations[location] = len(location_table)
+            location_table.append(
+                (
+                    None if location.file_path is None else str(location.file_path),
+                    location.start_line,
+                    location.start_column,
+                    location.end_line,
+                    location.end_column,
+                )
+            )
+        return index
+
+    def encode_node(node: Node) -> int:
+        index = nodes.get(node)
+        if index is None:
+            index = nodes[node] = len(node_table)
+            node_table.append(
+                (node.type.value, node.name, encode_location(node.location))
+            )
+        return index
+
+    for u, v, edge, inverse_edge in edges:
+        edge_table.append(
+            (
+                encode_node(u),
+                encode_node(v),
+                edge.relation.name,
+                encode_location(edge.location),
+                None if inverse_edge is None else inverse_edge.relation.name,
+                -1 if inverse_edge is None else encode_location(inverse_edge.location),
+            )
+        )
+    return location_table, node_table, edge_table
+
+
+def _decode_edges(
+    encoded: EncodedEdges, intern: Interner
+) -> List[Tuple[Node, Node, Edge, Optional[Edge]]]:
+    """Decode the edges encoded by _encode_edges, the equal nodes and locations of all the files are interned"""
+    location_table, node_table, edge_table = encoded
+    locations = [
+        intern(
+            Location(
+                file_path=None if file_path is None else Path(file_path),
+                start_line=start_line,
+                start_column=start_column,
+                end_line=end_line,
+                end_column=end_column,
+            )
+        )
+        for file_path, start_line, start_column, end_line, end_column in location_table
+    ]
+    nodes = [
+        intern(
+            Node(
+                type=NodeType(node_type),
+                name=name,
+                location=locations[location] if location >= 0 else None,
+            )
+        )
+        for node_type, name, location in node_table
+    ]
+
+    def decode_edge(relation: Optional[str], location: int) -> Optional[Edge]:
+        if relation is None:
+            return None
+        return intern(
+            Edge(
+                relation=EdgeRelation[relation],
+                location=locations[location] if location >= 0 else None,
+            )
+        )
+
+    return [
+        (
+            nodes[u],
+            nodes[v],
+            decode_edge(relation, location),
+            decode_edge(inverse_relation, inverse_location),
+        )
+        for u, v, relation, location, inverse_relation, inverse_location in edge_table
+    ]
+
+
+class _NameResolver:
+    """
+    Memoize the Jedi resolutions of the names of a file, so that every name is resolved once however many relation
+    extractors need it. The lookups and the actual Jedi calls are counted.
+    """
+
+    def __init__(
+        self, script: jedi.Script, reference_search_files: Optional[List[Path]] = None
+    ):
+        self.script = script
+        # The files other than the modules of the definitions in which the scoped references are searched, None to
+        # search all the files of the project
+        self.reference_search_files = reference_search_files
+        self._cache: Dict[tuple, object] = {}
+        self.lookups = 0
+        self.calls = 0
+
+    def _resolve(self, key: tuple, resolve: Callable):
+        self.lookups += 1
+        try:
+            return self._cache[key]
+        except KeyError:
+            self.calls += 1
+            result = self._cache[key] = resolve()
+            return result
+
+    def goto(
+        self,
+        name: BaseName,
+        follow_imports: bool = False,
+        follow_builtin_imports: bool = False,
+    ) -> List[Name]:
+        return self._resolve(
+            ("goto", name, follow_imports, follow_builtin_imports),
+            lambda: name.goto(
+                follow_imports=follow_imports,
+                follow_builtin_imports=follow_builtin_imports,
+            ),
+        )
+
+    def parent(self, name: BaseName) -> Optional[Name]:
+        return self._resolve(("parent", name), name.parent)
+
+    def infer(self, name: BaseName) -> List[Name]:
+        return self._resolve(("infer", name), name.infer)
+
+    def goto_position(self, line: int, column: int) -> List[Name]:
+        return self._resolve(
+            ("goto_position", line, column), lambda: self.script.goto(line, column)
+        )
+
+    def get_references(
+        self, line: int, column: int, scoped: bool = False
+    ) -> List[Name]:
+        """Get the references of the name at a position, in the reference search files if scoped is True"""
+        if not scoped or self.reference_search_files is None:
+            return self._resolve(
+                ("get_references", line, column),
+                lambda: self.script.get_references(line, column),
+            )
+
+        def get_scoped_references():
+            with _restrict_reference_search(self.reference_search_files):
+                return self.script.get_references(line, column)
+
+        return self._resolve(
+            ("get_scoped_references", line, column), get_scoped_references
+        )
+
+
+@contextmanager
+def _restrict_reference_search(file_paths: List[Path]):
+    """
+    Make Jedi search the references of a name in the given files instead of walking all the files of its project. The
+    modules in which the name is defined are still searched.
+    """
+    find_project_modules = jedi_references._find_project_modules
+
+    def find_modules(inference_state, module_contexts):
+        except_paths = {
+            module_context.py__file__() for module_context in module_contexts
+        }
+        for file_path in file_paths:
+            if file_path not in except_paths:
+                yield FileIO(file_path)
+
+    jedi_references._find_project_modules = find_modules
+    try:
+        yield
+    finally:
+        jedi_references._find_project_modules = find_project_modules
+
+
+def _find_importers(repo: Repository) -> Dict[Path, List[Path]]:
+    """Map every file of the repository to the files importing it, from the module-level import graph of Tree-sitter"""
+    import_graph = TreeSitterDependencyGraphGenerator().generate(repo)
+    importers: Dict[Path, Set[Path]] = defaultdict(set)
+    for importer, importee, _ in import_graph.query_edges(
+        relations=[EdgeRelation.Imports]
+    ):
+        if importer.location.file_path != importee.location.file_path:
+            importers[importee.location.file_path].add(importer.location.file_path)
+    return {
+        file_path: sorted(file_paths) for file_path, file_paths in importers.items()
+    }
+
+
+def _get_import_neighborhood(
+    importers: Dict[Path, List[Path]], file_path: Path, depth: int
+) -> List[Path]:
+    """Get the files importing a file directly or through at most depth - 1 other files, in breadth-first order"""
+    neighborhood: List[Path] = []
+    visited = {file_path}
+    frontier = [file_path]
+    for _ in range(depth):
+        next_frontier = []
+        for importee in frontier:
+            for importer in importers.get(importee, ()):
+                if importer not in visited:
+                    visited.add(importer)
+                    next_frontier.append(importer)
+        neighborhood.extend(next_frontier)
+        frontier = next_frontier
+    return neighborhood
+
+
+def _clear_jedi_caches():
+    """Drop the caches of Jedi and the modules parsed by parso, which grow with every file analyzed in a process"""
+    clear_time_caches(delete_all=True)
+    gc.collect()
+
+
+# The generator and the Jedi project of a worker process, see _init_worker
+_worker_state: Optional[Tuple["JediDependencyGraphGenerator", jedi.Project]] = None
+
+
+def _init_worker(
+    repo_path: Path,
+    reference_search_depth: Optional[int],
+    importers: Optional[Dict[Path, List[Path]]],
+):
+    """Build the Jedi project of a worker process once, Jedi keeps its inference caches per process"""
+    global _worker_state
+    generator = JediDependencyGraphGenerator(
+        reference_search_depth=reference_search_depth
+    )
+    generator._importers = importers
+    _worker_state = (
+        generator,
+        jedi.Project(repo_path, load_unsafe_extensions=False),
+    )
+
+
+def _generate_files_in_worker(
+    file_paths: List[Path],
+) -> Tuple[List[EncodedEdges], Optional[int], int, int]:
+    """
+    Generate the relational edges of a chunk of files in a worker process, with the RSS of the worker afterwards and
+    the number of name lookups and Jedi calls of the chunk
+    """
+    generator, project = _worker_state
+    lookups, jedi_calls = generator._name_lookups, generator._jedi_calls
+    batch = []
+    for file_path in file_paths:
+        recorder = _EdgeRecorder()
+        # Use read_file_to_string here to avoid non-UTF8 decoding issue
+        content = read_file_to_string(file_path)
+        generator._generate_file(content, file_path, recorder, project)
+        batch.append(_encode_edges(recorder.edges))
+    return (
+        batch,
+        get_rss(),
+        generator._name_lookups - lookups,
+        generator._jedi_calls - jedi_calls,
+    )
+
 
 class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
     supported_languages: Tuple[Language] = (Language.Python,)
 
+    def __init__(
+        self,
+        jobs: int = 1,
+        reference_search_depth: Optional[int] = None,
+        max_files_per_epoch: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+    ):
+        """
+        Initialize JediDependencyGraphGenerator
+        :param jobs: The number of worker processes among which generate partitions the files. Every worker has its own
+            Jedi project and caches, and the edges of the files are merged in the order of the files, so the graph is the
+            same as the one generated in this process. Default is 1, the files are analyzed in this process.
+        :param reference_search_depth: Restrict the search of the references of the definitions of a file to the files
+            importing it, directly or through at most reference_search_depth - 1 other files, instead of all the files
+            of the project. The imports are found by Tree-sitter beforehand, so the references reached through an
+            import it cannot resolve are missed. 0 searches the file and the modules of the definitions only. Default
+            is None, all the files are searched.
+        :param max_files_per_epoch: The number of files analyzed by a process before the caches of Jedi and parso are
+            dropped, or the worker processes are replaced by new ones when jobs > 1. The graph built so far is kept.
+            Default is None, the caches are kept for the whole run.
+        :param memory_budget: The resident memory in bytes of the process analyzing the files, this process or any
+            worker process, beyond which its caches are dropped or the worker processes are replaced, e.g. `8 * 2**30`.
+            Default is None, no limit.
+        The RSS is logged at the end of every epoch when either limit is set.
+        """
+        self.jobs = max(1, jobs)
+        self.reference_search_depth = reference_search_depth
+        self.max_files_per_epoch = max_files_per_epoch
+        self.memory_budget = memory_budget
+        # The files importing every file of the repository, found when reference_search_depth is set
+        self._importers: Optional[Dict[Path, List[Path]]] = None
+        self._importers_repo: Optional[Repository] = None
+        # The nodes built during a run by their module path, the position of their definition name, their type and
+        # their name, see _convert_name_to_node
+        self._nodes: Dict[
+            Tuple[Optional[Path], Optional[Tuple[int, int]], NodeType, str], Node
+        ] = {}
+        self._intern = Interner()
+        # The name lookups of the relation extractors and the Jedi calls they needed during a run, see _NameResolver
+        self._name_lookups = 0
+        self._jedi_calls = 0
+        super().__init__()
+
+    def _reset_node_cache(self):
+        """Drop the nodes built by the previous run, the files they were built from may have changed since"""
+        self._nodes = {}
+        self._intern = Interner()
+
     def _convert_name_pos_to_location(
         self, name: Name, node_type: Optional[NodeType] = None
     ) -> Optional[Location]:
@@ -82,7 +443,12 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
         return Location(**location_params)
 
     def _convert_name_to_node(self, name: Name, node_type: NodeType) -> Node:
-        """helper function for creating nodes"""
+        """helper function for creating nodes, every node is built once per run and interned"""
+        key = (name.module_path, name._name.start_pos, node_type, name.name)
+        node = self._nodes.get(key)
+        if node is not None:
+            return node
+
         location = self._convert_name_pos_to_location(name, node_type)
 
         node_name = name.name
@@ -90,11 +456,14 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
         if name.type == "function" and name.parent() and name.parent().type == "class":
             node_name = f"{name.parent().name}.{name.name}"
 
-        return Node(
-            type=node_type,
-            name=node_name,
-            location=location,
+        node = self._nodes[key] = self._intern(
+            Node(
+                type=node_type,
+                name=node_name,
+                location=location,
+            )
         )
+        return node
 
     def _update_graph(
         self,
@@ -123,7 +492,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_parent_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -136,19 +505,19 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 # ):
                 #     continue
 
-                definitions = name.goto(
-                    follow_imports=True, follow_builtin_imports=False
+                definitions = resolver.goto(
+                    name, follow_imports=True, follow_builtin_imports=False
                 )
                 if not definitions:
                     continue
 
-                parent = name.parent()
+                parent = resolver.parent(name)
                 for definition in definitions:
                     # Skip builtin
                     # Skip definition that are not in the same file
                     if (
                         definition.in_builtin_module()
-                        or not definition.module_path == script.path
+                        or not definition.module_path == resolver.script.path
                     ):
                         continue
 
@@ -171,21 +540,22 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_import_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
         for name in all_names:
             try:
-                definitions = name.goto(
-                    follow_imports=True, follow_builtin_imports=False
+                definitions = resolver.goto(
+                    name, follow_imports=True, follow_builtin_imports=False
                 )
                 if not definitions:
                     continue
 
                 for definition in definitions:
                     # If the definition's parent is not a module, it means it is not importable
-                    if definition.parent() and definition.parent().type not in (
+                    definition_parent = resolver.parent(definition)
+                    if definition_parent and definition_parent.type not in (
                         "module",
                         "namespace",
                     ):
@@ -196,13 +566,13 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                         continue
 
                     # Skip definition that are in the same file
-                    if definition.module_path == script.path:
+                    if definition.module_path == resolver.script.path:
                         continue
 
                     # Use the helper function to update the graph
                     self._update_graph(
                         D=D,
-                        from_name=script.get_context(),
+                        from_name=resolver.script.get_context(),
                         from_type=NodeType.MODULE,
                         to_name=definition,
                         to_type=(
@@ -222,13 +592,20 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_call_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
         for name in all_names:
             try:
-                callers = name.goto(follow_imports=True, follow_builtin_imports=True)
+                # Find caller, caller should be a function, or a module (call under `if __name__ == "__main__"`)
+                caller = resolver.parent(name)
+                if caller.type not in ("function", "module", "namespace"):
+                    continue
+
+                callers = resolver.goto(
+                    name, follow_imports=True, follow_builtin_imports=True
+                )
                 if not callers:
                     continue
 
@@ -236,11 +613,6 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                     if callee.type != "function":
                         continue
 
-                    # Find caller, caller should be a function, or a module (call under `if __name__ == "__main__"`)
-                    if name.parent().type not in ("function", "module", "namespace"):
-                        continue
-                    caller = name.parent()
-
                     # Use the helper function to update the graph
                     self._update_graph(
                         D=D,
@@ -260,7 +632,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_instantiate_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -273,7 +645,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 if name.name == "self":
                     continue
 
-                if name.parent().type not in (
+                if resolver.parent(name).type not in (
                     "class",
                     "module",
                     "function",
@@ -281,7 +653,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 ):
                     continue
 
-                instance_type_names = name.goto()
+                instance_type_names = resolver.goto(name)
                 if not instance_type_names:
                     continue
 
@@ -290,7 +662,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 for instance_type in instance_type_names:
                     # Resolve the instance_type if it is an import statement
                     if instance_type._name and instance_type._name.is_import():
-                        tmp_names = instance_type.goto()
+                        tmp_names = resolver.goto(instance_type)
                         if not tmp_names:
                             continue
                         instance_types.extend(tmp_names)
@@ -309,7 +681,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                     if instance_type.type not in ("class",):
                         continue
 
-                    instance_owner = name.parent()
+                    instance_owner = resolver.parent(name)
                     if instance_owner.type == "module":
                         # the instance owner is a module, try to find if the actual owner is a global variable
                         expr_stmt_node: BaseNode = name._name.tree_name.search_ancestor(
@@ -319,7 +691,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                             if isinstance(expr_stmt_node.children[0], ParsoTreeName):
                                 instance_owner = BaseName(
                                     instance_type._inference_state,
-                                    script._get_module_context().create_name(
+                                    resolver.script._get_module_context().create_name(
                                         expr_stmt_node.children[0]
                                     ),
                                 )
@@ -348,7 +720,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_def_use_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -357,7 +729,9 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 if name._name.is_import():
                     continue
 
-                references = script.get_references(name.line, name.column)
+                references = resolver.get_references(
+                    name.line, name.column, scoped=True
+                )
                 for ref in references:  # type: Name
                     if ref == name:
                         continue
@@ -389,7 +763,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_class_hierarchy_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -434,18 +808,19 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 )
 
                 for column_index in parent_classes_with_columns.values():
-                    references = script.get_references(name.line, column_index)
+                    references = resolver.get_references(name.line, column_index)
 
-                    edge_names = script.goto(name.line, column_index)
+                    edge_names = resolver.goto_position(name.line, column_index)
                     edge_name = None
                     if edge_names:
                         edge_name = edge_names[0]
 
-                    # Deduplicate the references
-                    ref_set = set()
+                    # Deduplicate the references, in the order they are found. The hash of a Jedi name depends on the
+                    # address of its inference state, so the order of a set of names would change from run to run
+                    ref_set = {}
                     for ref in references:  # type: Name
                         if ref.type == "class":
-                            ref_set.update(ref.goto())
+                            ref_set.update(dict.fromkeys(resolver.goto(ref)))
 
                     for ref in ref_set:
                         self._update_graph(
@@ -466,7 +841,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_method_override_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -474,8 +849,8 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
             try:
                 if (
                     name.type != "function"
-                    or name.parent() is None
-                    or name.parent().type != "class"
+                    or resolver.parent(name) is None
+                    or resolver.parent(name).type != "class"
                 ):
                     continue
 
@@ -486,7 +861,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                     continue
 
                 column = name.get_line_code().index("(")
-                completions = script.complete(line, column)
+                completions = resolver.script.complete(line, column)
 
                 for completion in completions:  # type: Completion
                     override_method_list = completion.infer()
@@ -511,7 +886,7 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
 
     def _extract_field_use_relation(
         self,
-        script: jedi.Script,
+        resolver: _NameResolver,
         all_names: List[Name],
         D: DependencyGraph,
     ):
@@ -521,12 +896,12 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
                 if not name.is_side_effect():
                     continue
 
-                instance_type_names = name.infer()
-                instance_owner = name.parent()
+                instance_type_names = resolver.infer(name)
+                instance_owner = resolver.parent(name)
                 while instance_owner is not None:
                     if instance_owner.type == "class":
                         break
-                    instance_owner = instance_owner.parent()
+                    instance_owner = resolver.parent(instance_owner)
 
                 if instance_owner is None:
                     continue
@@ -586,18 +961,25 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
             all_ref_names = script.get_names(
                 all_scopes=True, definitions=False, references=True
             )
-            self._extract_call_relation(script, all_ref_names, D)
-            self._extract_instantiate_relation(script, all_ref_names, D)
+            # The extractors share the resolutions of the names, e.g. the parent and the import relations go to the
+            # same definitions
+            resolver = _NameResolver(
+                script, self._get_reference_search_files(file_path)
+            )
+            self._extract_call_relation(resolver, all_ref_names, D)
+            self._extract_instantiate_relation(resolver, all_ref_names, D)
 
             all_def_names = script.get_names(
                 all_scopes=True, definitions=True, references=False
             )
-            self._extract_parent_relation(script, all_def_names, D)
-            self._extract_import_relation(script, all_def_names, D)
-            self._extract_def_use_relation(script, all_def_names, D)
-            self._extract_class_hierarchy_relation(script, all_def_names, D)
-            self._extract_method_override_relation(script, all_def_names, D)
-            self._extract_field_use_relation(script, all_def_names, D)
+            self._extract_parent_relation(resolver, all_def_names, D)
+            self._extract_import_relation(resolver, all_def_names, D)
+            self._extract_def_use_relation(resolver, all_def_names, D)
+            self._extract_class_hierarchy_relation(resolver, all_def_names, D)
+            self._extract_method_override_relation(resolver, all_def_names, D)
+            self._extract_field_use_relation(resolver, all_def_names, D)
+            self._name_lookups += resolver.lookups
+            self._jedi_calls += resolver.calls
         except Exception as e:
             tb_str = "\n".join(traceback.format_tb(e.__traceback__))
             logger.error(
@@ -607,6 +989,26 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
             # Restore the original sys.path
             sys.path = sys_path
 
+    def _find_reference_search_scope(self, repo: Repository):
+        """Find the files importing every file of the repository if the reference search is restricted"""
+        if self.reference_search_depth is None:
+            self._importers, self._importers_repo = None, None
+        elif isinstance(repo, VirtualRepository):
+            logger.warning(
+                "The reference search cannot be restricted in a virtual repository, searching all the files"
+            )
+            self._importers, self._importers_repo = None, None
+        elif self._importers is None or self._importers_repo is not repo:
+            self._importers, self._importers_repo = _find_importers(repo), repo
+
+    def _get_reference_search_files(self, file_path: PathLike) -> Optional[List[Path]]:
+        """Get the files in which the references of the definitions of a file are searched, None for all the files"""
+        if self._importers is None:
+            return None
+        return _get_import_neighborhood(
+            self._importers, Path(file_path), self.reference_search_depth
+        )
+
     def generate_file(
         self,
         repo: Repository,
@@ -616,17 +1018,21 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
         if code is None and file_path is None:
             raise ValueError("Must provide at least one of code or file_path")
 
+        # The import graph is kept for the next files of the same repository, e.g. during an update
+        self._find_reference_search_scope(repo)
         project = jedi.Project(repo.repo_path, load_unsafe_extensions=False)
+        self._install_virtual_fs_finder(repo)
+        if code is None:
+            # Use read_file_to_string here to avoid non-UTF8 decoding issue
+            code = read_file_to_string(file_path)
 
         D = DependencyGraph(repo.repo_path, repo.language)
-        self._generate_file(code, file_path, D, project)
+        self._reset_node_cache()
+        self._generate_file(code, file_path, D, project, repo)
         return D
 
-    def generate(self, repo: Repository) -> DependencyGraph:
-        project = jedi.Project(repo.repo_path, load_unsafe_extensions=False)
-
-        D = DependencyGraph(repo.repo_path, repo.language)
-
+    @staticmethod
+    def _install_virtual_fs_finder(repo: Repository):
         if isinstance(repo, VirtualRepository):
             """
             When in virtual file system, we need Jedi to be able to import the module in the virtual fs.
@@ -638,12 +1044,190 @@ class JediDependencyGraphGenerator(BaseDependencyGraphGenerator):
             We should use `jedi.Interpreter` because it seems the only way to consume the sys.meta_path.
             We also should update sys.path to make sure the search path in fs can be found.
             """
-            finder = VirtualFSFinder(repo.fs)
-            sys.meta_path.insert(0, finder)
+            if not any(
+                isinstance(finder, VirtualFSFinder) and finder.fs is repo.fs
+                for finder in sys.meta_path
+            ):
+                sys.meta_path.insert(0, VirtualFSFinder(repo.fs))
+
+    @property
+    def _is_bounded(self) -> bool:
+        """Whether the run is split into epochs, at the end of which the memory of the Jedi caches is released"""
+        return self.max_files_per_epoch is not None or self.memory_budget is not None
+
+    def _is_over_budget(self, rss: Optional[int]) -> bool:
+        return (
+            self.memory_budget is not None
+            and rss is not None
+            and rss >= self.memory_budget
+        )
+
+    def _warn_budget_too_low(self, rss: Optional[int]):
+        logger.warning(
+            f"The RSS {format_size(rss)} is over the memory budget {format_size(self.memory_budget)} right after the "
+            f"Jedi caches are released, the budget is ignored for the rest of the run"
+        )
+
+    def _generate_in_parallel(self, repo: Repository, D: DependencyGraph):
+        """
+        Generate the files on the worker processes and add their edges to the graph in the order of the files. Every
+        epoch runs on new worker processes, so that the memory of the previous ones is released.
+        """
+        files = repo.files
+        chunk_size = min(MAX_CHUNK_SIZE, max(1, math.ceil(len(files) / self.jobs)))
+        if self.max_files_per_epoch is not None:
+            chunk_size = min(chunk_size, max(1, self.max_files_per_epoch))
+        # The consecutive files, which are usually in the same package, are analyzed by the same worker
+        chunks = [files[i : i + chunk_size] for i in range(0, len(files), chunk_size)]
+        max_workers = min(self.jobs, len(chunks))
+        intern = Interner()
+        # Jedi talks to its own subprocesses, which must not be shared with forked workers
+        context = multiprocessing.get_context("spawn")
+        next_chunk, epoch, check_memory = 0, 0, True
+        with tqdm(total=len(files), desc="Generating graph") as progress:
+            while next_chunk < len(chunks):
+                epoch += 1
+                files_in_epoch, max_worker_rss, is_epoch_over = 0, None, False
+                chunks_in_epoch, is_over_budget = 0, False
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(
+                        repo.repo_path,
+                        self.reference_search_depth,
+                        self._importers,
+                    ),
+                ) as executor:
+                    pending = deque()
+                    while True:
+                        # Keep the workers busy until the epoch is over, the results are taken in the order of the files
+                        while (
+                            not is_epoch_over
+                            and next_chunk < len(chunks)
+                            and len(pending) < 2 * max_workers
+                        ):
+                            chunk = chunks[next_chunk]
+                            next_chunk += 1
+                            pending.append(
+                                executor.submit(_generate_files_in_worker, chunk)
+                            )
+                            files_in_epoch += len(chunk)
+                            is_epoch_over = (
+                                self.max_files_per_epoch is not None
+                                and files_in_epoch >= self.max_files_per_epoch
+                            )
+                        if not pending:
+                            break
+
+                        (
+                            batch,
+                            worker_rss,
+                            lookups,
+                            jedi_calls,
+                        ) = pending.popleft().result()
+                        self._name_lookups += lookups
+                        self._jedi_calls += jedi_calls
+                        for encoded in batch:
+                            D.add_relational_edges_from(_decode_edges(encoded, intern))
+                        progress.update(len(batch))
+                        chunks_in_epoch += 1
+                        if worker_rss is not None:
+                            max_worker_rss = max(max_worker_rss or 0, worker_rss)
+                        if (
+                            check_memory
+                            and not is_over_budget
+                            and self._is_over_budget(worker_rss)
+                        ):
+                            is_epoch_over = is_over_budget = True
+                            # New workers reach the budget with their first chunks, replacing them does not help
+                            if chunks_in_epoch <= max_workers:
+                                self._warn_budget_too_low(worker_rss)
+                                check_memory = False
+
+                if self._is_bounded:
+                    recycling = (
+                        ", replacing the worker processes"
+                        if next_chunk < len(chunks)
+                        else ""
+                    )
+                    logger.info(
+                        f"Epoch {epoch}: {files_in_epoch} files, RSS {format_size(get_rss())}, largest worker RSS "
+                        f"{format_size(max_worker_rss)}{recycling}"
+                    )
 
+    def _end_epoch(self, epoch: int, files_in_epoch: int, rss: Optional[int]) -> bool:
+        """
+        Drop the Jedi caches of this process at the end of an epoch and log its memory. Returns whether the memory is
+        still worth checking against the budget, it is not if it is over the budget without the caches.
+        """
+        _clear_jedi_caches()
+        rss_after = get_rss()
+        logger.info(
+            f"Epoch {epoch}: {files_in_epoch} files, RSS {format_size(rss)}, {format_size(rss_after)} after dropping "
+            f"the Jedi caches"
+        )
+        if self._is_over_budget(rss_after):
+            self._warn_budget_too_low(rss_after)
+            return False
+        return True
+
+    def update(
+        self,
+        repo: Repository,
+        changed_files: Iterable[PathLike],
+        graph: DependencyGraph,
+    ) -> DependencyGraph:
+        # The imports of the changed files may have changed
+        self._importers = None
+        return super().update(repo, changed_files, graph)
+
+    def _log_resolution_counts(self, number_of_files: int):
+        """Log the Jedi calls of a run, which are fewer than the name lookups of the relation extractors"""
+        if number_of_files:
+            logger.info(
+                f"Resolved the names of {number_of_files} files with {self._jedi_calls} Jedi calls for "
+                f"{self._name_lookups} lookups, {self._jedi_calls / number_of_files:.1f} calls per file"
+            )
+
+    def generate(self, repo: Repository) -> DependencyGraph:
+        D = DependencyGraph(repo.repo_path, repo.language)
+        self._importers = None
+        self._name_lookups, self._jedi_calls = 0, 0
+        self._find_reference_search_scope(repo)
+        if self.jobs > 1 and len(repo.files) > 1:
+            if not isinstance(repo, VirtualRepository):
+                self._generate_in_parallel(repo, D)
+                self._log_resolution_counts(len(repo.files))
+                return D
+            logger.warning(
+                "The files of a virtual repository are not shared with the worker processes, generating in this process"
+            )
+
+        project = jedi.Project(repo.repo_path, load_unsafe_extensions=False)
+        self._install_virtual_fs_finder(repo)
+        self._reset_node_cache()
+
+        epoch, files_in_epoch, check_memory = 1, 0, True
         for file_path in tqdm(repo.files, desc="Generating graph"):
             # Use read_file_to_string here to avoid non-UTF8 decoding issue
             content = read_file_to_string(file_path)
             self._generate_file(content, file_path, D, project, repo)
 
+            files_in_epoch += 1
+            if self._is_bounded:
+                rss = get_rss()
+                if (
+                    self.max_files_per_epoch is not None
+                    and files_in_epoch >= self.max_files_per_epoch
+                ) or (check_memory and self._is_over_budget(rss)):
+                    check_memory = self._end_epoch(epoch, files_in_epoch, rss)
+                    project = jedi.Project(repo.repo_path, load_unsafe_extensions=False)
+                    epoch, files_in_epoch = epoch + 1, 0
+
+        if self._is_bounded and files_in_epoch:
+            logger.info(
+                f"Epoch {epoch}: {files_in_epoch} files, RSS {format_size(get_rss())}"
+            )
+        self._log_resolution_counts(len(repo.files))
         return D
@@ -1,7 +1,10 @@
+import os
+import re
 import traceback
 from collections import defaultdict
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple, Dict, Union
+from typing import List, Tuple, Dict, Union, Iterable, Iterator, Optional, Set
 
 from tqdm import tqdm
 
@@ -11,9 +14,13 @@ from dependency_graph.graph_generator.tree_sitter_generator.import_finder import
     ImportFinder,
 )
 from dependency_graph.graph_generator.tree_sitter_generator.info import (
+    FileFacts,
     RegexInfo,
     ParseTreeInfo,
 )
+from dependency_graph.graph_generator.tree_sitter_generator.module_registry import (
+    ModuleRegistry,
+)
 from dependency_graph.graph_generator.tree_sitter_generator.resolve_import import (
     ImportResolver,
 )
@@ -34,6 +41,93 @@ from dependency_graph.utils.text import get_position
 # Initialize logging
 logger = setup_logger()
 
+# The number of files sent to the parse workers at once
+BATCH_SIZE = 256
+
+# The languages whose files import each other, they share the same module map in a polyglot repository
+INTEROPERABLE_LANGUAGES = (
+    (Language.TypeScript, Language.JavaScript),
+    (Language.Java, Language.Kotlin),
+    (Language.C, Language.CPP),
+)
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    batch = list(islice(iterator, n))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, n))
+
+
+def _get_words(text: str) -> Set[str]:
+    """Split an import or a module name into its words, e.g. `com.example.Foo` into com, example and Foo"""
+    return set(re.findall(r"\w+", text))
+
+
+def _log_error(e: Exception, message: str):
+    """Log an exception raised in this process or returned by the parse workers with its traceback"""
+    tb_str = "\n".join(traceback.format_tb(e.__traceback__))
+    logger.error(f"Error {e} {message}, will ignore: {tb_str}")
+
+
+def _create_module_maps(
+    languages: Iterable[Language],
+) -> Dict[Language, ModuleRegistry]:
+    """Create the module maps of the languages of a repository, the interoperable languages share the same one"""
+    languages = tuple(languages)
+    module_maps: Dict[Language, ModuleRegistry] = {}
+    for language in languages:
+        if language in module_maps:
+            continue
+        module_map = ModuleRegistry()
+        module_maps[language] = module_map
+        for group in INTEROPERABLE_LANGUAGES:
+            if language in group:
+                for other_language in group:
+                    if other_language in languages:
+                        module_maps[other_language] = module_map
+    return module_maps
+
+
+def _group_files_by_language(
+    repo: Repository, file_paths: Iterable[Path]
+) -> Dict[Language, List[Path]]:
+    """Dispatch the code files to their languages by extension, in the order of the languages of the repository"""
+    files_by_language: Dict[Language, List[Path]] = {
+        language: [] for language in repo.languages
+    }
+    for file_path in file_paths:
+        language = repo.get_file_language(file_path)
+        if language is not None:
+            files_by_language[language].append(file_path)
+    return {
+        language: language_files
+        for language, language_files in files_by_language.items()
+        if language_files
+    }
+
+
+class _ImportFinders(dict):
+    """
+    The ImportFinders of the languages of a repository, created on demand and sharing the same parse workers. Closing
+    them stops the workers, they are started again if the ImportFinders are used again.
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__()
+        self.pool = ImportFinder.create_pool(max_workers)
+
+    def __missing__(self, language: Language) -> ImportFinder:
+        finder = self[language] = ImportFinder(language, pool=self.pool)
+        return finder
+
+    def __enter__(self) -> "_ImportFinders":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pool.close()
+
 
 class TreeSitterDependencyGraphGenerator(BaseDependencyGraphGenerator):
     supported_languages: Tuple[Language] = (
@@ -55,16 +149,49 @@ class TreeSitterDependencyGraphGenerator(BaseDependencyGraphGenerator):
         Language.R,
     )
 
-    def __init__(self, max_lines_to_read: int = None):
+    def __init__(self, max_lines_to_read: int = None, max_workers: int = None):
         """
         Initialize TreeSitterDependencyGraphGenerator
         :param max_lines_to_read: The maximum number of lines to read from a file. Default is None.
         Tree-sitter parser may fail and more seriously, causes memory leak or deadlock if the file is too large.
         So if max_lines_to_read is set, the file is read by limited line to workaround ths.
+        :param max_workers: The maximum number of the Tree-sitter parse worker processes. Default is the number of CPUs.
         """
         self.max_lines_to_read = max_lines_to_read
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # The module maps by language and the import resolver of the last generated repository, they are reused by
+        # generate_file and update
+        self._module_maps: Optional[Dict[Language, ModuleRegistry]] = None
+        self._import_resolver: Optional[ImportResolver] = None
+        self._module_map_repo: Optional[Repository] = None
+        # The words of the imports that were not resolved by importer file, see _get_unresolved_importers
+        self._unresolved_imports: Dict[Path, Set[str]] = {}
+        # The extents of the files read, to build the module nodes without reading the files again
+        self._file_extents: Dict[Path, Tuple[Tuple[int, int], Tuple[int, int]]] = {}
+        # The ImportFinders shared by all the runs, see _get_import_finders
+        self._import_finders: Optional[_ImportFinders] = None
         super().__init__()
 
+    def _get_import_finders(self) -> _ImportFinders:
+        """
+        Get the ImportFinders of the generator. Their parse workers are stopped at the end of generate and update, but
+        they are kept between the calls of generate_file until close.
+        """
+        if self._import_finders is None:
+            self._import_finders = _ImportFinders(self.max_workers)
+        return self._import_finders
+
+    def close(self):
+        """Stop the parse workers kept by generate_file"""
+        if self._import_finders is not None:
+            self._import_finders.pool.close()
+
+    def __enter__(self) -> "TreeSitterDependencyGraphGenerator":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def read_file_to_string_with_limited_line(self, file_path: PathLike) -> str:
         # Use read_file_to_string here to avoid non-UTF8 decoding issue
         content = read_file_to_string(
@@ -72,47 +199,235 @@ class TreeSitterDependencyGraphGenerator(BaseDependencyGraphGenerator):
         )
         return content
 
+    @staticmethod
+    def _add_to_module_map(
+        finder: ImportFinder,
+        file_paths: Iterable[Path],
+        module_map: ModuleRegistry,
+    ):
+        """Find the module names of the files and add them to the module map"""
+        for batch in _batched(file_paths, BATCH_SIZE):
+            for file_path, name in zip(batch, finder.find_module_names(batch)):
+                if isinstance(name, Exception):
+                    _log_error(name, f"finding module name of {file_path}")
+                elif name:
+                    module_map.add(name, file_path)
+
+    def _add_facts(
+        self,
+        file_path: Path,
+        facts: FileFacts,
+        module_map: ModuleRegistry,
+        import_map: Dict[Tuple[Path, str], Union[List[ParseTreeInfo], List[RegexInfo]]],
+    ):
+        """Add the module name and the imports extracted from a file to the module map and the import map"""
+        if facts.extent:
+            self._file_extents[file_path] = facts.extent
+        if facts.module_name:
+            module_map.add(facts.module_name, file_path)
+        if facts.error is not None:
+            _log_error(facts.error, f"finding import in {file_path}")
+            return
+        import_map[(file_path, facts.module_name)].extend(facts.imports)
+
+    def _get_file_extent(
+        self, file_path: Path
+    ) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Get the extent of a file, it is only read if it has not been read while finding the imports"""
+        extent = self._file_extents.get(file_path)
+        if extent is None:
+            extent = get_position(self.read_file_to_string_with_limited_line(file_path))
+            self._file_extents[file_path] = extent
+        return extent
+
+    def _get_module_maps(
+        self, repo: Repository, finders: _ImportFinders
+    ) -> Dict[Language, ModuleRegistry]:
+        """Get the module maps of the repository, which are kept from the last generation of the same repository"""
+        if self._module_maps is None or self._module_map_repo is not repo:
+            self._module_maps = _create_module_maps(repo.languages)
+            self._import_resolver = ImportResolver(repo)
+            self._module_map_repo = repo
+            for language, file_paths in _group_files_by_language(
+                repo, repo.files
+            ).items():
+                self._add_to_module_map(
+                    finders[language],
+                    tqdm(file_paths, desc=f"Finding module names of {language}"),
+                    self._module_maps[language],
+                )
+        return self._module_maps
+
     def generate_file(
         self,
         repo: Repository,
         code: str = None,
         file_path: PathLike = None,
     ) -> DependencyGraph:
-        raise NotImplementedError("generate_file is not implemented")
+        """
+        Generate the import edges of a file. The imports are resolved against the module map of the whole repository,
+        so file_path is required.
+        """
+        if file_path is None:
+            raise ValueError("file_path is required to resolve the imports of the file")
+
+        file_path = self._Path(repo, file_path)
+        if code is None:
+            code = self.read_file_to_string_with_limited_line(file_path)
+        language = repo.get_file_language(file_path) or repo.language
+
+        import_map: Dict[
+            Tuple[Path, str], Union[List[ParseTreeInfo], List[RegexInfo]]
+        ] = defaultdict(list)
+        finders = self._get_import_finders()
+        module_maps = self._get_module_maps(repo, finders)
+        facts = finders[language].extract_facts(file_path, code)
+        # The file is already in the module map
+        self._add_facts(file_path, facts, ModuleRegistry(), import_map)
+
+        D = DependencyGraph(repo.repo_path, *repo.languages)
+        self._resolve_imports(repo, module_maps, import_map, D)
+        return D
+
+    def update(
+        self,
+        repo: Repository,
+        changed_files: Iterable[PathLike],
+        graph: DependencyGraph,
+    ) -> DependencyGraph:
+        changed_files = {self._Path(repo, file_path) for file_path in changed_files}
+        # The changed and dependent files are all parsed by the same parse workers
+        with self._get_import_finders() as finders:
+            if self._module_maps is not None and self._module_map_repo is repo:
+                # Refresh the module names of the changed files in the kept module maps
+                for file_path in changed_files:
+                    self._file_extents.pop(file_path, None)
+                    for module_map in self._module_maps.values():
+                        module_map.remove(file_path)
+                self._import_resolver.invalidate(changed_files)
+                for file_path in changed_files:
+                    self._unresolved_imports.pop(file_path, None)
+
+                for language, file_paths in _group_files_by_language(
+                    repo,
+                    sorted(
+                        file_path for file_path in changed_files if file_path.is_file()
+                    ),
+                ).items():
+                    self._add_to_module_map(
+                        finders[language], file_paths, self._module_maps[language]
+                    )
+
+            return super().update(repo, changed_files, graph)
+
+    def _get_unresolved_importers(
+        self, repo: Repository, added_files: Set[Path]
+    ) -> Set[Path]:
+        """
+        Get the files with an unresolved import sharing a word with the path or the module name of an added file, e.g.
+        `import b` and `b.py`. The imports of the standard and third-party libraries are never re-analyzed.
+        """
+        words = set()
+        for file_path in added_files:
+            if file_path.is_relative_to(repo.repo_path):
+                relative_path = str(file_path.relative_to(repo.repo_path))
+            else:
+                relative_path = file_path.name
+            # Without the extension, e.g. the `h` of `#include <stdio.h>` would match every header
+            words |= _get_words(os.path.splitext(relative_path)[0])
+            for module_map in (self._module_maps or {}).values():
+                module_name = module_map.get_module_name(file_path)
+                if module_name:
+                    words |= _get_words(module_name)
+        return {
+            file_path
+            for file_path, import_words in self._unresolved_imports.items()
+            if not import_words.isdisjoint(words)
+        }
 
     def generate(self, repo: Repository) -> DependencyGraph:
-        D = DependencyGraph(repo.repo_path, repo.language)
-        module_map: Dict[str, List[Path]] = defaultdict(list)
+        D = DependencyGraph(repo.repo_path, *repo.languages)
+        self._file_extents = {}
+        module_maps = _create_module_maps(repo.languages)
         # The key is (file_path, class_name)
         import_map: Dict[
             Tuple[Path, str], Union[List[ParseTreeInfo], List[RegexInfo]]
         ] = defaultdict(list)
 
-        finder = ImportFinder(repo.language)
-        resolver = ImportResolver(repo)
-
-        for file_path in tqdm(repo.files, desc="Finding imports"):
-            try:
-                content = self.read_file_to_string_with_limited_line(file_path)
-                name = finder.find_module_name(file_path)
-                if name:
-                    module_map[name].append(file_path)
-                nodes = finder.find_imports(content)
-                import_map[(file_path, name)].extend(nodes)
-            except Exception as e:
-                tb_str = "\n".join(traceback.format_tb(e.__traceback__))
-                logger.error(
-                    f"Error {e} finding import in {file_path}, will ignore: {tb_str}"
+        # The files of all the languages are found by the same scan and parsed by the same parse workers
+        with self._get_import_finders() as finders, tqdm(
+            total=len(repo.files), desc="Finding imports"
+        ) as progress:
+            for language, language_files in _group_files_by_language(
+                repo, repo.files
+            ).items():
+                finder, module_map = finders[language], module_maps[language]
+                # The files are sent to the parse workers by batch
+                for batch in _batched(language_files, BATCH_SIZE):
+                    file_paths, contents = [], []
+                    for file_path in batch:
+                        try:
+                            contents.append(
+                                self.read_file_to_string_with_limited_line(file_path)
+                            )
+                            file_paths.append(file_path)
+                        except Exception as e:
+                            _log_error(e, f"finding import in {file_path}")
+
+                    batch_facts = finder.extract_facts_batch(file_paths, contents)
+                    for file_path, facts in zip(file_paths, batch_facts):
+                        self._add_facts(file_path, facts, module_map, import_map)
+                    progress.update(len(batch))
+
+        # Keep the module maps and the import resolver for generate_file and update
+        self._module_maps, self._module_map_repo = module_maps, repo
+        self._import_resolver = ImportResolver(repo)
+        self._unresolved_imports = {}
+        self._resolve_imports(repo, module_maps, import_map, D)
+        return D
+
+    def _resolve_imports(
+        self,
+        repo: Repository,
+        module_maps: Dict[Language, ModuleRegistry],
+        import_map: Dict[Tuple[Path, str], Union[List[ParseTreeInfo], List[RegexInfo]]],
+        D: DependencyGraph,
+    ):
+        resolver = self._import_resolver
+        # The module node of every file, built once
+        module_nodes: Dict[Tuple[Path, Optional[str]], Node] = {}
+
+        def get_module_node(file_path: Path, module_name: Optional[str]) -> Node:
+            node = module_nodes.get((file_path, module_name))
+            if node is None:
+                (start_line, start_column), (
+                    end_line,
+                    end_column,
+                ) = self._get_file_extent(file_path)
+                node = module_nodes[(file_path, module_name)] = Node(
+                    type=NodeType.MODULE,
+                    name=module_name,
+                    location=Location(
+                        file_path=file_path,
+                        start_line=start_line,
+                        start_column=start_column,
+                        end_line=end_line,
+                        end_column=end_column,
+                    ),
                 )
+            return node
 
         for (
             importer_file_path,
             importer_module_name,
         ), import_symbol_nodes in tqdm(import_map.items(), desc="Resolving imports"):
+            language = repo.get_file_language(importer_file_path) or repo.language
+            module_map = module_maps[language]
+            self._unresolved_imports.pop(importer_file_path, None)
             for import_symbol_node in import_symbol_nodes:
                 try:
                     resolved = resolver.resolve_import(
-                        import_symbol_node, module_map, importer_file_path
+                        import_symbol_node, module_map, importer_file_path, language
                     )
                 except Exception as e:
                     tb_str = "\n".join(traceback.format_tb(e.__traceback__))
@@ -121,47 +436,21 @@ class TreeSitterDependencyGraphGenerator(BaseDependencyGraphGenerator):
                     )
                     continue
 
+                if not resolved:
+                    self._unresolved_imports.setdefault(
+                        importer_file_path, set()
+                    ).update(_get_words(import_symbol_node.text))
                 for importee_file_path in resolved:
-                    # Use read_file_to_string here to avoid non-UTF8 decoding issue
-                    importer_file_location = get_position(
-                        read_file_to_string(
-                            importer_file_path, max_lines_to_read=self.max_lines_to_read
-                        )
-                    )
-
-                    importee_file_location = get_position(
-                        read_file_to_string(
-                            importee_file_path, max_lines_to_read=self.max_lines_to_read
-                        )
+                    from_node = get_module_node(
+                        importer_file_path, importer_module_name
                     )
-
-                    importee_module_name = None
-                    for module_name, file_paths in module_map.items():
-                        if importee_file_path in file_paths:
-                            importee_module_name = module_name
-                            break
-
-                    from_node = Node(
-                        type=NodeType.MODULE,
-                        name=importer_module_name,
-                        location=Location(
-                            file_path=importer_file_path,
-                            start_line=importer_file_location[0][0],
-                            start_column=importer_file_location[0][1],
-                            end_line=importer_file_location[1][0],
-                            end_column=importer_file_location[1][1],
-                        ),
+                    # The importee may be a file of another language, e.g. a JavaScript file imported by TypeScript
+                    importee_module_map = module_maps.get(
+                        repo.get_file_language(importee_file_path), module_map
                     )
-                    to_node = Node(
-                        type=NodeType.MODULE,
-                        name=importee_module_name,
-                        location=Location(
-                            file_path=importee_file_path,
-                            start_line=importee_file_location[0][0],
-                            start_column=importee_file_location[0][1],
-                            end_line=importee_file_location[1][0],
-                            end_column=importee_file_location[1][1],
-                        ),
+                    to_node = get_module_node(
+                        importee_file_path,
+                        importee_module_map.get_module_name(importee_file_path),
                     )
                     import_location = Location(
                         file_path=importer_file_path,
@@ -182,5 +471,3 @@ class TreeSitterDependencyGraphGenerator(BaseDependencyGraphGenerator):
                             location=import_location,
                         ),
                     )
-
-        return D
@@ -0,0 +1,223 @@
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from dependency_graph.utils.file_index import FileIndex
+from dependency_graph.utils.log import setup_logger
+from dependency_graph.utils.read_file import read_file_to_string
+
+# Initialize logging
+logger = setup_logger()
+
+# The target of a replace directive, a local directory or another module path
+ReplaceTarget = Union[Path, str]
+
+
+@dataclass
+class GoModule:
+    """A module declared by a go.mod file"""
+
+    path: str
+    directory: Path
+    replacements: Dict[str, ReplaceTarget] = field(default_factory=dict)
+
+
+def _strip_comment(line: str) -> str:
+    return line.split("//", 1)[0].strip()
+
+
+def _iter_directives(text: str):
+    """
+    Yield the verb and the arguments of every directive of a go.mod or go.work file, the directives of a block such as
+    `replace ( ... )` are yielded with the verb of the block
+    """
+    block_verb = None
+    for line in text.splitlines():
+        line = _strip_comment(line)
+        if not line:
+            continue
+        if block_verb is not None:
+            if line == ")":
+                block_verb = None
+            else:
+                yield block_verb, line.split()
+            continue
+
+        verb, _, arguments = line.partition(" ")
+        arguments = arguments.strip()
+        if arguments == "(":
+            block_verb = verb
+        else:
+            yield verb, arguments.split()
+
+
+def _parse_replacement(
+    arguments: List[str], directory: Path
+) -> Optional[Tuple[str, ReplaceTarget]]:
+    """Parse `old [version] => new [version]`, a local target is relative to the directory of the file"""
+    if "=>" not in arguments:
+        return None
+    index = arguments.index("=>")
+    if index == 0 or index == len(arguments) - 1:
+        return None
+    old, new = arguments[0], arguments[index + 1]
+    if new.startswith(("./", "../")) or new in (".", "..") or os.path.isabs(new):
+        return old, directory / new
+    return old, new
+
+
+def parse_go_mod(go_mod_path: Path) -> Optional[GoModule]:
+    """Parse the module path and the replacements of a go.mod file"""
+    module = GoModule(path="", directory=go_mod_path.parent)
+    for verb, arguments in _iter_directives(read_file_to_string(go_mod_path)):
+        if verb == "module" and arguments:
+            module.path = arguments[0].strip('"')
+        elif verb == "replace":
+            replacement = _parse_replacement(arguments, module.directory)
+            if replacement:
+                module.replacements[replacement[0]] = replacement[1]
+    return module if module.path else None
+
+
+def parse_go_work(go_work_path: Path) -> Tuple[List[Path], Dict[str, ReplaceTarget]]:
+    """Parse the module directories used by a go.work file and its replacements"""
+    directory = go_work_path.parent
+    used_directories, replacements = [], {}
+    for verb, arguments in _iter_directives(read_file_to_string(go_work_path)):
+        if verb == "use" and arguments:
+            used_directories.append(directory / arguments[0].strip('"'))
+        elif verb == "replace":
+            replacement = _parse_replacement(arguments, directory)
+            if replacement:
+                replacements[replacement[0]] = replacement[1]
+    return used_directories, replacements
+
+
+def _match_prefix(import_path: str, prefixes: Dict[str, object]) -> Optional[str]:
+    """Find the longest prefix that is the import path or one of its parent import paths"""
+    candidate = import_path
+    while candidate:
+        if candidate in prefixes:
+            return candidate
+        candidate = candidate.rpartition("/")[0]
+    return None
+
+
+class GoPackageIndex:
+    """
+    The Go modules of a repository found from the go.mod and go.work files on disk, and the map from the import path of
+    every package of these modules to the Go files of its directory. A directory belongs to the module of the nearest
+    go.mod above it, as nested modules are excluded from their parent module.
+    """
+
+    def __init__(self, repo_path: Path, file_index: FileIndex):
+        self.repo_path = repo_path
+        self.file_index = file_index
+        # The modules by the string of their directory
+        self.modules: Dict[str, GoModule] = {}
+        # The replacements of the go.work files by the string of the workspace directory
+        self.workspace_replacements: Dict[str, Dict[str, ReplaceTarget]] = {}
+        self.packages: Dict[str, List[Path]] = {}
+        self._replacements: Dict[Path, Dict[str, ReplaceTarget]] = {}
+
+        for go_mod_path in sorted(file_index.files_with_name("go.mod")):
+            self._add_module(go_mod_path)
+        for go_work_path in sorted(file_index.files_with_name("go.work")):
+            try:
+                used_directories, replacements = parse_go_work(go_work_path)
+            except Exception as e:
+                logger.warning(f"Error {e} parsing {go_work_path}, will ignore")
+                continue
+            self.workspace_replacements[str(go_work_path.parent)] = replacements
+            for directory in used_directories:
+                directory = file_index.normalize(directory)
+                if str(directory) not in self.modules:
+                    self._add_module(directory / "go.mod")
+
+        # The module of each directory, looked up once per directory
+        directory_modules: Dict[Path, Optional[GoModule]] = {}
+        for go_file in sorted(file_index.files_with_suffix(".go")):
+            directory = go_file.parent
+            if directory not in directory_modules:
+                directory_modules[directory] = self.get_module(directory)
+            module = directory_modules[directory]
+            if module is None:
+                continue
+            relative_path = directory.relative_to(module.directory).as_posix()
+            package_path = (
+                module.path
+                if relative_path == "."
+                else f"{module.path}/{relative_path}"
+            )
+            self.packages.setdefault(package_path, []).append(go_file)
+
+    def _add_module(self, go_mod_path: Path):
+        if not self.file_index.is_file(go_mod_path):
+            return
+        try:
+            module = parse_go_mod(go_mod_path)
+        except Exception as e:
+            logger.warning(f"Error {e} parsing {go_mod_path}, will ignore")
+            return
+        if module is not None:
+            self.modules[str(module.directory)] = module
+
+    def get_module(self, directory: Path) -> Optional[GoModule]:
+        """Get the module of the nearest go.mod in the directory or above it"""
+        for parent in (directory, *directory.parents):
+            module = self.modules.get(str(parent))
+            if module is not None:
+                return module
+        return None
+
+    def _get_replacements(self, directory: Path) -> Dict[str, ReplaceTarget]:
+        """Get the replacements applying to a directory, the ones of the workspace override the ones of the module"""
+        replacements = self._replacements.get(directory)
+        if replacements is None:
+            replacements = {}
+            module = self.get_module(directory)
+            if module is not None:
+                replacements.update(module.replacements)
+            for parent in reversed((directory, *directory.parents)):
+                replacements.update(self.workspace_replacements.get(str(parent), {}))
+            self._replacements[directory] = replacements
+        return replacements
+
+    def _get_directory_files(self, directory: Path) -> List[Path]:
+        return sorted(self.file_index.glob_suffix(directory, ".go"))
+
+    def resolve(self, import_path: str, importer_file_path: Path) -> List[Path]:
+        """Resolve the import path of a package to its Go files"""
+        replacements = self._get_replacements(importer_file_path.parent)
+        replaced = _match_prefix(import_path, replacements)
+        if replaced is not None:
+            target = replacements[replaced]
+            subpath = import_path[len(replaced) + 1 :]
+            if isinstance(target, str):
+                # Replaced by another module, which may be in the repository
+                import_path = f"{target}/{subpath}" if subpath else target
+            else:
+                return self._get_directory_files(
+                    target / subpath if subpath else target
+                )
+
+        files = self.packages.get(import_path)
+        if files is not None:
+            return files
+
+        # Fallback: Try to resolve based on project directory structure
+        found_files = []
+        relative_path = import_path.replace("/", os.sep)
+        for base_path in (
+            self.repo_path,
+            self.repo_path / "src",
+            self.repo_path / "vendor",
+            self.repo_path / "pkg",
+        ):
+            path = base_path / relative_path
+            if self.file_index.is_dir(path):
+                found_files.extend(self._get_directory_files(path))
+            elif self.file_index.is_file(path.with_suffix(".go")):
+                found_files.append(path.with_suffix(".go"))
+        return found_files
@@ -2,11 +2,12 @@ import re
 from functools import lru_cache
 from pathlib import Path
 from textwrap import dedent
-from typing import List, Union, Optional
+from typing import Dict, Iterable, List, Tuple, Union, Optional
 
-from tree_sitter import Parser, Language as TS_Language, Tree
+from tree_sitter import Parser, Language as TS_Language, Query, Tree
 
 from dependency_graph.graph_generator.tree_sitter_generator.info import (
+    FileFacts,
     RegexInfo,
     ParseTreeInfo,
 )
@@ -15,7 +16,8 @@ from dependency_graph.graph_generator.tree_sitter_generator.load_lib import (
 )
 from dependency_graph.models.language import Language
 from dependency_graph.utils.read_file import read_file_to_string
-from dependency_graph.utils.run_in_subprocess import SubprocessRunner
+from dependency_graph.utils.run_in_subprocess import SubprocessPool
+from dependency_graph.utils.text import get_position
 
 """
 Tree-sitter query to find all the imports in a code. The captured import name should be named as `import_name`.
@@ -238,17 +240,73 @@ REGEX_FIND_IMPORT_PATTERN = {
 }
 
 
+def _parse_and_query_in_worker(
+    finders: Dict[Language, "ImportFinder"],
+    language: Language,
+    code: str,
+    queries: Tuple[Tuple[str, str], ...],
+) -> Dict[str, List[ParseTreeInfo]]:
+    """Run ImportFinder._parse_and_query in a parse worker, which keeps an ImportFinder per language"""
+    finder = finders.get(language)
+    if finder is None:
+        finder = finders[language] = ImportFinder(language)
+    return finder._parse_and_query(code, queries)
+
+
 class ImportFinder:
     languages_using_regex = tuple(REGEX_FIND_IMPORT_PATTERN.keys())
 
-    def __init__(self, language: Language):
+    def __init__(
+        self,
+        language: Language,
+        max_workers: int = 1,
+        pool: Optional[SubprocessPool] = None,
+    ):
+        """
+        :param language: The language of the files
+        :param max_workers: The maximum number of the parse worker processes, which are started on demand and kept
+            until close is called
+        :param pool: The parse workers shared with the ImportFinders of the other languages, see create_pool. They are
+            not stopped by close. Default is None, the ImportFinder starts its own parse workers.
+        """
         lib_path = get_builtin_lib_path()
         self.language = language
         # Initialize the Tree-sitter language
         self.parser = Parser()
         self.ts_language = TS_Language(str(lib_path.absolute()), str(language))
         self.parser.set_language(self.ts_language)
+        self._queries: Dict[str, Query] = {}
         self._timeout = 5  # seconds
+        self._max_workers = max_workers
+        self._pool: Optional[SubprocessPool] = pool
+        self._owns_pool = pool is None
+
+    def __enter__(self) -> "ImportFinder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stop the parse workers if they are not shared"""
+        if self._pool is not None and self._owns_pool:
+            self._pool.close()
+
+    @staticmethod
+    def create_pool(max_workers: int = 1) -> SubprocessPool:
+        """
+        Create a pool of parse workers, which can be shared by the ImportFinders of several languages. Every worker
+        keeps an ImportFinder per language, i.e. its Tree-sitter parser and compiled queries, to run _parse_and_query.
+        """
+        return SubprocessPool(
+            _parse_and_query_in_worker, initializer=dict, max_workers=max_workers
+        )
+
+    def _get_pool(self) -> SubprocessPool:
+        """Get the pool of the parse workers, which is created on first use if it is not shared"""
+        if self._pool is None:
+            self._pool = self.create_pool(self._max_workers)
+        return self._pool
 
     def _query_and_captures(
         self, code: str, query: str, capture_name: str = "import_name"
@@ -260,34 +318,75 @@ class ImportFinder:
         :param capture_name: The name of the capture group to be matched
         :return: The nodes that match the query
         """
+        return self._parse_and_query(code, ((query, capture_name),))[capture_name]
+
+    def _parse_and_query(
+        self, code: str, queries: Tuple[Tuple[str, str], ...]
+    ) -> Dict[str, List[ParseTreeInfo]]:
+        """
+        Parse the code once and run all the queries against the same tree. The queries are compiled once.
+        :param code: The code to be parsed
+        :param queries: The queries to be matched and the names of their capture groups to be matched
+        :return: The nodes that match the queries by the names of their capture groups
+        """
         tree: Tree = self.parser.parse(code.encode())
-        query = self.ts_language.query(query)
-        captures = query.captures(tree.root_node)
-        nodes = [node for node, captured in captures if captured == capture_name]
-        info_list = []
-        for n in nodes:
-            info = ParseTreeInfo(n.start_point, n.end_point, n.text.decode(), n.type)
-            if n.parent:
-                info.parent = ParseTreeInfo(
-                    n.parent.start_point,
-                    n.parent.end_point,
-                    n.parent.text.decode(),
-                    n.parent.type,
+        info_lists = {}
+        for query, capture_name in queries:
+            if query not in self._queries:
+                self._queries[query] = self.ts_language.query(query)
+            captures = self._queries[query].captures(tree.root_node)
+            nodes = [node for node, captured in captures if captured == capture_name]
+            info_list = info_lists.setdefault(capture_name, [])
+            for n in nodes:
+                info = ParseTreeInfo(
+                    n.start_point, n.end_point, n.text.decode(), n.type
                 )
-            info_list.append(info)
-        return info_list
+                if n.parent:
+                    info.parent = ParseTreeInfo(
+                        n.parent.start_point,
+                        n.parent.end_point,
+                        n.parent.text.decode(),
+                        n.parent.type,
+                    )
+                info_list.append(info)
+        return info_lists
 
     def _query_and_captures_in_subprocess(
         self, code: str, query: str, capture_name: str = "import_name"
     ):
         """
-        Use SubprocessRunner to query the Tree-sitter language and get the nodes that match the query
+        Use the parse workers to query the Tree-sitter language and get the nodes that match the query
         to avoid the Tree-sitter deadlock/segmentation fault issue
         """
-        captures = SubprocessRunner(
-            self._query_and_captures, code, query, capture_name
-        ).run(self._timeout)
-        return captures
+        captures = self._get_pool().run(
+            self.language, code, ((query, capture_name),), timeout=self._timeout
+        )
+        return captures[capture_name]
+
+    def _query_and_captures_in_subprocess_batch(
+        self, codes: Iterable[str], query: str, capture_name: str = "import_name"
+    ) -> List[Union[List[ParseTreeInfo], Exception]]:
+        """
+        Query a batch of codes on the parse workers, the result of a code that fails, crashes or times out its worker
+        is its exception
+        """
+        batch_captures = self._get_pool().map(
+            [(self.language, code, ((query, capture_name),)) for code in codes],
+            timeout=self._timeout,
+        )
+        return [
+            captures if isinstance(captures, Exception) else captures[capture_name]
+            for captures in batch_captures
+        ]
+
+    def _get_queries(self) -> Tuple[Tuple[str, str], ...]:
+        """Get the Tree-sitter queries of the language and the names of their capture groups"""
+        queries = []
+        if self.language not in self.languages_using_regex:
+            queries.append((FIND_IMPORT_QUERY[self.language], "import_name"))
+        if self.language in FIND_PACKAGE_QUERY:
+            queries.append((FIND_PACKAGE_QUERY[self.language], "package_name"))
+        return tuple(queries)
 
     def _regex_find_imports(self, code: str, pattern: str) -> List[RegexInfo]:
         matches = []
@@ -326,6 +425,68 @@ class ImportFinder:
                 code, FIND_IMPORT_QUERY[self.language]
             )
 
+    def find_imports_batch(
+        self, codes: List[str]
+    ) -> List[Union[List[RegexInfo], List[ParseTreeInfo], Exception]]:
+        """
+        Find the imports of a batch of codes, which are parsed in parallel by the parse workers.
+        The result of a code that fails is its exception, the other codes are not affected.
+        """
+        if self.language in self.languages_using_regex:
+            return [self.find_imports(code) for code in codes]
+        return self._query_and_captures_in_subprocess_batch(
+            codes, FIND_IMPORT_QUERY[self.language]
+        )
+
+    def extract_facts(self, file_path: Path, code: str) -> FileFacts:
+        """Extract the facts of a file, see extract_facts_batch"""
+        return self.extract_facts_batch([file_path], [code])[0]
+
+    def extract_facts_batch(
+        self, file_paths: List[Path], codes: List[str]
+    ) -> List[FileFacts]:
+        """
+        Extract the facts of a batch of files: their module names, imports and extents. Every file is decoded once by the
+        caller and parsed once by the parse workers, which run all the queries of the language against the same tree.
+        If the parse of a file fails, crashes or times out its worker, the error is kept in its facts and the other
+        files are not affected.
+
+        :param file_paths: The paths of the files
+        :param codes: The contents of the files
+        """
+        queries = self._get_queries()
+        if queries:
+            batch_captures = self._get_pool().map(
+                [(self.language, code, queries) for code in codes],
+                timeout=self._timeout,
+            )
+        else:
+            batch_captures = [{} for _ in codes]
+
+        batch_facts = []
+        for file_path, code, captures in zip(file_paths, codes, batch_captures):
+            facts = FileFacts(extent=get_position(code))
+            try:
+                if isinstance(captures, Exception):
+                    # The module names that do not need parsing are still found
+                    facts.error = captures
+                    if self.language not in FIND_PACKAGE_QUERY:
+                        facts.module_name = self._get_module_name(file_path, None)
+                else:
+                    facts.module_name = self._get_module_name(
+                        file_path, captures.get("package_name")
+                    )
+                    if self.language in self.languages_using_regex:
+                        facts.imports = self._regex_find_imports(
+                            code, REGEX_FIND_IMPORT_PATTERN[self.language]
+                        )
+                    else:
+                        facts.imports = captures["import_name"]
+            except Exception as e:
+                facts.error = e
+            batch_facts.append(facts)
+        return batch_facts
+
     @lru_cache(maxsize=256)
     def find_module_name(self, file_path: Path) -> Optional[str]:
         """
@@ -335,13 +496,49 @@ class ImportFinder:
         In C#, it is the name of the namespace.
         In JavaScript/TypeScript, it is the name of the file.
         """
-        # Use read_file_to_string here to avoid non-UTF8 decoding issue
-        code = read_file_to_string(file_path)
-        if self.language in (Language.Java, Language.Kotlin):
+        captures = None
+        if self.language in FIND_PACKAGE_QUERY:
+            # Use read_file_to_string here to avoid non-UTF8 decoding issue
+            code = read_file_to_string(file_path)
             captures = self._query_and_captures_in_subprocess(
                 code, FIND_PACKAGE_QUERY[self.language], "package_name"
             )
+        return self._get_module_name(file_path, captures)
+
+    def find_module_names(
+        self, file_paths: List[Path]
+    ) -> List[Union[Optional[str], Exception]]:
+        """
+        Find the module names of a batch of files like find_module_name, the packages are parsed in parallel by the
+        parse workers. The result of a file that fails is its exception, the other files are not affected.
+        """
+        if self.language not in FIND_PACKAGE_QUERY:
+            return [self._get_module_name(file_path, None) for file_path in file_paths]
+
+        results: List[Union[Optional[str], Exception]] = [None] * len(file_paths)
+        indexes, codes = [], []
+        for i, file_path in enumerate(file_paths):
+            try:
+                codes.append(read_file_to_string(file_path))
+                indexes.append(i)
+            except Exception as e:
+                results[i] = e
+
+        batch_captures = self._query_and_captures_in_subprocess_batch(
+            codes, FIND_PACKAGE_QUERY[self.language], "package_name"
+        )
+        for i, captures in zip(indexes, batch_captures):
+            if isinstance(captures, Exception):
+                results[i] = captures
+            else:
+                results[i] = self._get_module_name(file_paths[i], captures)
+        return results
 
+    def _get_module_name(
+        self, file_path: Path, captures: Optional[List[ParseTreeInfo]]
+    ) -> Optional[str]:
+        """Get the module name of a file from the captures of FIND_PACKAGE_QUERY if the language has packages"""
+        if self.language in (Language.Java, Language.Kotlin):
             if len(captures) > 0:
                 node = captures[0]
                 package_name = node.text
@@ -349,10 +546,6 @@ class ImportFinder:
                 return module_name
 
         elif self.language in (Language.CSharp, Language.Go):
-            captures = self._query_and_captures_in_subprocess(
-                code, FIND_PACKAGE_QUERY[self.language], "package_name"
-            )
-
             if len(captures) > 0:
                 node = captures[0]
                 package_name = node.text
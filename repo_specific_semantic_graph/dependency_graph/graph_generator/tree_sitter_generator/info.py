@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Tuple, Optional
+from dataclasses import dataclass, field
+from typing import List, Tuple, Optional, Union
 
 
 @dataclass
@@ -16,3 +16,15 @@ class RegexInfo:
     start_point: Tuple[int, int]
     end_point: Tuple[int, int]
     text: str
+
+
+@dataclass
+class FileFacts:
+    """The facts extracted from a file by a single parse"""
+
+    module_name: Optional[str] = None
+    imports: List[Union[ParseTreeInfo, RegexInfo]] = field(default_factory=list)
+    extent: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+    """The start and end line numbers and column numbers of the file, starting from 1"""
+    error: Optional[Exception] = None
+    """The error raised while parsing the file, the facts found by parsing are then missing"""
@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class ModuleRegistry:
+    """
+    A bidirectional map between the module names and the files of a repository, with an index of the modules of each
+    package, e.g. the package of the Java module `com.example.Foo` is `com.example`.
+    A file has at most one module name, while several files can have the same module name, e.g. a C# namespace.
+    """
+
+    def __init__(self):
+        self._module_paths: Dict[str, List[Path]] = {}
+        self._path_modules: Dict[Path, str] = {}
+        # The module names of each package, in the order they are added
+        self._package_modules: Dict[str, Dict[str, None]] = {}
+
+    @staticmethod
+    def get_package_name(module_name: str) -> str:
+        # Use rpartition to split the string at the rightmost '.'
+        package_name, _, _ = module_name.rpartition(".")
+        return package_name
+
+    def add(self, module_name: str, file_path: Path):
+        """Add a file with its module name, replacing the module name it was added with before"""
+        if self._path_modules.get(file_path) == module_name:
+            return
+        self.remove(file_path)
+        self._path_modules[file_path] = module_name
+        file_paths = self._module_paths.get(module_name)
+        if file_paths is None:
+            self._module_paths[module_name] = [file_path]
+            package_name = self.get_package_name(module_name)
+            self._package_modules.setdefault(package_name, {})[module_name] = None
+        else:
+            file_paths.append(file_path)
+
+    def remove(self, file_path: Path):
+        """Remove a file, dropping its module name if no other file has it"""
+        module_name = self._path_modules.pop(file_path, None)
+        if module_name is None:
+            return
+        file_paths = self._module_paths[module_name]
+        file_paths.remove(file_path)
+        if not file_paths:
+            del self._module_paths[module_name]
+            package_name = self.get_package_name(module_name)
+            package_modules = self._package_modules[package_name]
+            del package_modules[module_name]
+            if not package_modules:
+                del self._package_modules[package_name]
+
+    def get(self, module_name: str, default: List[Path] = None) -> List[Path]:
+        """Get the files of a module name"""
+        return self._module_paths.get(module_name, default)
+
+    def get_module_name(self, file_path: Path) -> Optional[str]:
+        """Get the module name of a file"""
+        return self._path_modules.get(file_path)
+
+    def get_package_modules(self, package_name: str) -> List[str]:
+        """Get the module names directly in a package, e.g. for the Java star import `import com.example.*`"""
+        return list(self._package_modules.get(package_name, ()))
+
+    def get_package_paths(self, package_name: str) -> List[Path]:
+        """Get the files of the module names directly in a package"""
+        return [
+            file_path
+            for module_name in self._package_modules.get(package_name, ())
+            for file_path in self._module_paths[module_name]
+        ]
+
+    def items(self) -> Iterable[Tuple[str, List[Path]]]:
+        return self._module_paths.items()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._module_paths)
+
+    def __len__(self) -> int:
+        return len(self._module_paths)
+
+    def __contains__(self, module_name: str) -> bool:
+        return module_name in self._module_paths
+
+    def __getitem__(self, module_name: str) -> List[Path]:
+        return self._module_paths[module_name]
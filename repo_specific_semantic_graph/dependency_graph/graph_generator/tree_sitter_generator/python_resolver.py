@@ -8,14 +8,22 @@ from importlab.resolve import (
     ImportException,
 )
 
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.file_index import FileIndex
+
 
 class Resolver:
     """
     Inspired and modified from importlab.resolve.Resolver to support Path/VirtualPath
     """
 
-    def __init__(self, repo_path: Path, current_module: Path):
-        self.repo_path = repo_path
+    def __init__(
+        self, repo: Repository, current_module: Path, file_index: FileIndex = None
+    ):
+        self.repo_path = repo.repo_path
+        if file_index is None:
+            file_index = FileIndex(repo.repo_path, repo)
+        self.file_index = file_index
         self.current_module = current_module
         self.current_directory = self.current_module.parent
 
@@ -26,7 +34,7 @@ class Resolver:
             return None
         py = name.with_suffix(".py")
         for file in [init, py]:
-            if file.exists():
+            if self.file_index.exists(file):
                 return file
         return None
 
@@ -2,22 +2,36 @@ import os
 import re
 import sys
 from pathlib import Path
-from typing import List, Tuple, Dict, Union, Optional
+from typing import List, Tuple, Dict, Union, Optional, Iterable
 
 from importlab.parsepy import ImportStatement
 from importlab.resolve import ImportException
 
 from dependency_graph.graph_generator.tree_sitter_generator import ImportFinder
+from dependency_graph.graph_generator.tree_sitter_generator.go_modules import (
+    GoPackageIndex,
+)
 from dependency_graph.graph_generator.tree_sitter_generator.info import (
     RegexInfo,
     ParseTreeInfo,
 )
+from dependency_graph.graph_generator.tree_sitter_generator.module_registry import (
+    ModuleRegistry,
+)
 from dependency_graph.graph_generator.tree_sitter_generator.python_resolver import (
     Resolver,
 )
+from dependency_graph.graph_generator.tree_sitter_generator.rust_crates import (
+    RustCrateIndex,
+    expand_use_tree,
+)
+from dependency_graph.graph_generator.tree_sitter_generator.swift_modules import (
+    SwiftModuleIndex,
+)
 from dependency_graph.models import VirtualPath, PathLike
 from dependency_graph.models.language import Language
 from dependency_graph.models.repository import Repository
+from dependency_graph.utils.file_index import FileIndex
 from dependency_graph.utils.log import setup_logger
 
 # Initialize logging
@@ -37,8 +51,50 @@ if sys.version_info < (3, 9):
 
 
 class ImportResolver:
-    def __init__(self, repo: Repository):
+    def __init__(self, repo: Repository, file_index: FileIndex = None):
+        """
+        :param repo: The repository of the imports
+        :param file_index: The index of the files of the repository, which the imports are resolved against instead of
+            the file system. It is built from the files of the repository if not given.
+        """
         self.repo = repo
+        if file_index is None:
+            file_index = FileIndex(repo.repo_path, repo)
+        self.file_index = file_index
+        # The indexes derived from the file index, built on first use
+        self._go_package_index: Optional[GoPackageIndex] = None
+        self._rust_crate_index: Optional[RustCrateIndex] = None
+        self._swift_module_index: Optional[SwiftModuleIndex] = None
+
+    def invalidate(self, file_paths: Iterable[PathLike] = None):
+        """
+        Refresh the file index for the given changed files, or for the whole repository if no file is given, and drop
+        the indexes derived from it
+        """
+        self.file_index.invalidate(file_paths)
+        self._go_package_index = None
+        self._rust_crate_index = None
+        self._swift_module_index = None
+
+    @property
+    def go_package_index(self) -> GoPackageIndex:
+        if self._go_package_index is None:
+            self._go_package_index = GoPackageIndex(
+                self.repo.repo_path, self.file_index
+            )
+        return self._go_package_index
+
+    @property
+    def rust_crate_index(self) -> RustCrateIndex:
+        if self._rust_crate_index is None:
+            self._rust_crate_index = RustCrateIndex(self.file_index)
+        return self._rust_crate_index
+
+    @property
+    def swift_module_index(self) -> SwiftModuleIndex:
+        if self._swift_module_index is None:
+            self._swift_module_index = SwiftModuleIndex(self.file_index)
+        return self._swift_module_index
 
     def _Path(self, file_path: PathLike) -> Path:
         """
@@ -54,108 +110,115 @@ class ImportResolver:
     def resolve_import(
         self,
         import_symbol_node: Union[ParseTreeInfo, RegexInfo],
-        module_map: Dict[str, List[Path]],
+        module_map: ModuleRegistry,
         importer_file_path: Path,
+        language: Language = None,
     ) -> List[Path]:
+        """
+        Resolve an import to the files it imports.
+        :param language: The language of the importer, default is the language of the repository. The imports of a
+            TypeScript file can resolve to JavaScript files and vice versa, same for Java/Kotlin and C/C++.
+        """
+        if language is None:
+            language = self.repo.language
         resolved_path_list = []
         if isinstance(import_symbol_node, RegexInfo):
             assert (
-                self.repo.language in ImportFinder.languages_using_regex
-            ), f"import_symbol_node {import_symbol_node} of type RegexInfo is only supported for {ImportFinder.languages_using_regex}, not {self.repo.language}"
+                language in ImportFinder.languages_using_regex
+            ), f"import_symbol_node {import_symbol_node} of type RegexInfo is only supported for {ImportFinder.languages_using_regex}, not {language}"
 
-        if self.repo.language in (Language.Java, Language.Kotlin):
+        if language in (Language.Java, Language.Kotlin):
             import_symbol_name = import_symbol_node.text
             # Deal with star import: `import xxx.*`
             if ".*" in import_symbol_node.parent.text:
-                for module_name, path_list in module_map.items():
-                    # Use rpartition to split the string at the rightmost '.'
-                    package_name, _, _ = module_name.rpartition(".")
-                    if package_name == import_symbol_name:
-                        resolved_path_list.extend(path_list)
+                resolved_path_list.extend(
+                    module_map.get_package_paths(import_symbol_name)
+                )
             else:
                 resolved_path_list.extend(module_map.get(import_symbol_name, []))
-        elif self.repo.language == Language.CSharp:
+        elif language == Language.CSharp:
             import_symbol_name = import_symbol_node.text
             resolved_path_list.extend(module_map.get(import_symbol_name, []))
-        elif self.repo.language in (Language.TypeScript, Language.JavaScript):
+        elif language in (Language.TypeScript, Language.JavaScript):
             resolved_path_list.extend(
                 self.resolve_ts_js_import(
                     import_symbol_node, module_map, importer_file_path
                 )
             )
-        elif self.repo.language == Language.Python:
+        elif language == Language.Python:
             resolved_path_list.extend(
                 self.resolve_python_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.PHP:
+        elif language == Language.PHP:
             resolved_path_list.extend(
                 self.resolve_php_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.Ruby:
+        elif language == Language.Ruby:
             resolved_path_list.extend(
                 self.resolve_ruby_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language in (Language.C, Language.CPP):
+        elif language in (Language.C, Language.CPP):
             resolved_path_list.extend(
                 self.resolve_cfamily_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.Go:
-            resolved_path_list.extend(self.resolve_go_import(import_symbol_node))
-        elif self.repo.language == Language.Swift:
+        elif language == Language.Go:
+            resolved_path_list.extend(
+                self.resolve_go_import(import_symbol_node, importer_file_path)
+            )
+        elif language == Language.Swift:
             resolved_path_list.extend(
                 self.resolve_swift_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.Rust:
+        elif language == Language.Rust:
             resolved_path_list.extend(
                 self.resolve_rust_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.Lua:
+        elif language == Language.Lua:
             resolved_path_list.extend(
                 self.resolve_lua_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.Bash:
+        elif language == Language.Bash:
             resolved_path_list.extend(
                 self.resolve_bash_import(import_symbol_node, importer_file_path)
             )
-        elif self.repo.language == Language.R:
+        elif language == Language.R:
             resolved_path_list.extend(
                 self.resolve_r_import(import_symbol_node, importer_file_path)
             )
         else:
-            raise NotImplementedError(f"Language {self.repo.language} is not supported")
+            raise NotImplementedError(f"Language {language} is not supported")
 
         # Resolve the path so that relative file path is normalized. This is important for the node identification in the graph
-        resolved_path_list = [path.resolve() for path in resolved_path_list]
+        # The paths which are not files are dropped
+        path_list = filter(None, map(self.file_index.resolve, resolved_path_list))
         # De-duplicate the resolved path
-        path_list = set(resolved_path_list)
-        resolved_path_list = []
+        path_list = dict.fromkeys(path_list)
         # Remove file not in the repo
-        for resolved_path in path_list:
-            if (
-                resolved_path.is_relative_to(self.repo.repo_path)
-                and resolved_path.is_file()
-            ):
-                resolved_path_list.append(resolved_path)
-
-        return resolved_path_list
+        return [
+            resolved_path
+            for resolved_path in path_list
+            if resolved_path.is_relative_to(self.repo.repo_path)
+        ]
 
     def resolve_ts_js_import(
         self,
         import_symbol_node: ParseTreeInfo,
-        module_map: Dict[str, List[Path]],
+        module_map: ModuleRegistry,
         importer_file_path: Path,
     ) -> List[Path]:
         def _search_file(search_path: Path, module_name: str) -> List[Path]:
             result_path = []
             for ext in extension_list:
-                if (search_path / f"{module_name}{ext}").exists():
+                if self.file_index.exists(search_path / f"{module_name}{ext}"):
                     result_path.append(search_path / f"{module_name}{ext}")
-                elif (search_path / f"{module_name}").is_dir():
+                elif self.file_index.is_dir(search_path / f"{module_name}"):
                     """
                     In case the module is a directory, we should search for the `module_dir/index.{js|ts}` file
                     """
                     for ext in extension_list:
-                        if (search_path / f"{module_name}" / f"index{ext}").exists():
+                        if self.file_index.exists(
+                            search_path / f"{module_name}" / f"index{ext}"
+                        ):
                             result_path.append(
                                 search_path / f"{module_name}" / f"index{ext}"
                             )
@@ -180,7 +243,7 @@ class ImportResolver:
             if suffix:
                 """If there is a suffix in the name, then search in the filesystem"""
                 path = importer_file_path.parent / import_symbol_name
-                if path.exists():
+                if self.file_index.exists(path):
                     result_path = [path]
                 else:
                     result_path = _search_file(
@@ -278,7 +341,7 @@ class ImportResolver:
             "import_from_statement",
         ), "import_symbol_node type is not import_statement or import_from_statement"
 
-        resolver = Resolver(self.repo.repo_path, importer_file_path)
+        resolver = Resolver(self.repo, importer_file_path, self.file_index)
         resolved_path_list = []
         is_from_import = import_symbol_node.type == "import_from_statement"
         parsed_items = analyze_import_statement(import_symbol_node.text, is_from_import)
@@ -316,11 +379,11 @@ class ImportResolver:
         # Find the module path
         result_path = []
         import_path = self._Path(import_symbol_name)
-        if import_path.is_absolute() and import_path.exists():
+        if import_path.is_absolute() and self.file_index.exists(import_path):
             result_path.append(import_path)
         else:
             path = importer_file_path.parent / import_symbol_name
-            if path.exists():
+            if self.file_index.exists(path):
                 result_path.append(path)
         return result_path
 
@@ -353,28 +416,94 @@ class ImportResolver:
         # Check if any of these paths exist
         extension_list = Repository.code_file_extensions[Language.Ruby]
         for path in search_paths:
-            if path.exists():
+            if self.file_index.exists(path):
                 result_path.append(path)
             else:
                 """Directly add the extension to the end no matter if it has suffix or not"""
                 for ext in extension_list:
                     path = path.parent / f"{path.name}{ext}"
-                    if path.exists():
+                    if self.file_index.exists(path):
                         result_path.append(path)
 
         return result_path
 
+    def _find_cfamily_include(
+        self, import_path: Path, importer_file_path: Path
+    ) -> Optional[List[Path]]:
+        """
+        Find the files of an include with the index of the file names instead of probing every search path of
+        resolve_cfamily_import. A file matches if its path ends with the included path, or with the included path plus
+        a C/C++ extension when the included path itself does not exist, in one of the searched directories:
+        `include/`, the directory of the including file, `src/`, the working directory, the parents of the including
+        file and their subdirectories. The files are returned in the order of these directories.
+        Returns None if the included path is absolute or not normalized, which is left to the search paths.
+        """
+        parts = import_path.parts
+        if (
+            not parts
+            or import_path.is_absolute()
+            or any(part in (".", "..") for part in parts)
+        ):
+            return None
+
+        repo_path = self.repo.repo_path
+        parents = [
+            parent
+            for parent in importer_file_path.parents
+            if parent.is_relative_to(repo_path)
+        ]
+        # The rank of the searched directories, in the order of the search paths
+        directory_ranks: Dict[Path, int] = {}
+        for directory in (
+            repo_path / "include",
+            importer_file_path.parent,
+            repo_path / "src",
+            self._Path(os.getcwd()),
+            *parents,
+        ):
+            directory_ranks.setdefault(directory, len(directory_ranks))
+        # The subdirectories of the parents are ranked after the other directories
+        parent_ranks = {
+            parent: len(directory_ranks) + rank for rank, parent in enumerate(parents)
+        }
+
+        extension_list = (
+            Repository.code_file_extensions[Language.C]
+            + Repository.code_file_extensions[Language.CPP]
+        )
+        ranked_paths = []
+        for name in (parts[-1], *(f"{parts[-1]}{ext}" for ext in extension_list)):
+            is_extended = name != parts[-1]
+            for file_path in self.file_index.files_with_name(name):
+                if file_path.parts[-len(parts) : -1] != parts[:-1]:
+                    continue
+                directory = file_path.parents[len(parts) - 1]
+                rank = directory_ranks.get(directory)
+                if rank is None:
+                    rank = parent_ranks.get(directory.parent)
+                if rank is None:
+                    continue
+                if is_extended and self.file_index.exists(directory / import_path):
+                    continue
+                ranked_paths.append((rank, str(file_path), file_path))
+
+        ranked_paths.sort()
+        return [file_path for _, _, file_path in ranked_paths]
+
     def resolve_cfamily_import(
         self,
         import_symbol_node: ParseTreeInfo,
         importer_file_path: Path,
     ) -> List[Path]:
-
         import_symbol_name = import_symbol_node.text
         # Strip double quote and angle bracket
         import_symbol_name = import_symbol_name.strip('"').lstrip("<").rstrip(">")
         import_path = self._Path(import_symbol_name)
 
+        result_path = self._find_cfamily_include(import_path, importer_file_path)
+        if result_path is not None:
+            return result_path
+
         # Heuristics to search for the header file
         search_paths = [
             # Common practice to have headers in 'include' directory
@@ -397,8 +526,8 @@ class ImportResolver:
 
         # Add sibling directories of each directory component of importer_file_path
         for parent in importer_file_path.parents:
-            for sibling in parent.iterdir():
-                if sibling.is_dir() and sibling != importer_file_path:
+            for sibling in self.file_index.iter_subdirectories(parent):
+                if sibling != importer_file_path:
                     potential_path = sibling / import_path
                     if potential_path.is_relative_to(
                         self.repo.repo_path
@@ -413,103 +542,42 @@ class ImportResolver:
             + Repository.code_file_extensions[Language.CPP]
         )
         for path in search_paths:
-            if path.exists():
+            if self.file_index.exists(path):
                 result_path.append(path)
             else:
                 """Directly add the extension to the end no matter if it has suffix or not"""
                 for ext in extension_list:
-                    path = path.parent / f"{path.name}{ext}"
-                    if path.exists():
-                        result_path.append(path)
+                    extended_path = path.parent / f"{path.name}{ext}"
+                    if self.file_index.exists(extended_path):
+                        result_path.append(extended_path)
 
         return result_path
 
-    def resolve_go_import(self, import_symbol_node: ParseTreeInfo) -> List[Path]:
-        def parse_go_mod(go_mod_path: Path) -> Tuple[str, Dict[str, Path]]:
-            """
-            Parses the go.mod file and returns the module path and replacements.
-            :param go_mod_path: The path to the go.mod file.
-            :return: A tuple containing the module path and replacements.
-            """
-            module_path = None
-            replacements = {}
-
-            for line in go_mod_path.read_text().splitlines():
-                line = line.strip()
-                if line.startswith("module "):
-                    module_path = line.split()[1]
-                elif line.startswith("replace "):
-                    parts = line.split()
-                    if len(parts) >= 4 and parts[2] == "=>":
-                        replacements[parts[1]] = self._Path(parts[3])
-
-            return module_path, replacements
-
-        def search_fallback_paths(import_stmt: str, base_path: Path):
-            """Searches various fallback paths within the project directory."""
-            search_paths = [
-                base_path / import_stmt.replace("/", os.sep),
-                base_path / "src" / import_stmt.replace("/", os.sep),
-                base_path / "vendor" / import_stmt.replace("/", os.sep),
-                base_path / "pkg" / import_stmt.replace("/", os.sep),
-            ]
-            found_files = []
-
-            for path in search_paths:
-                if path.is_dir():
-                    go_files = list(path.glob("*.go"))
-                    if go_files:
-                        found_files.extend(go_files)
-                elif path.with_suffix(".go").is_file():
-                    found_files.append(path.with_suffix(".go"))
-
-            return found_files
-
-        # Parse the go.mod file
-        go_mod_path = self.repo.repo_path / "go.mod"
-        if go_mod_path.exists():
-            module_path, replacements = parse_go_mod(go_mod_path)
-        else:
-            module_path, replacements = None, {}
-
-        # Find corresponding paths for the imported packages
-        imported_paths = []
-
+    def resolve_go_import(
+        self, import_symbol_node: ParseTreeInfo, importer_file_path: Path
+    ) -> List[Path]:
         import_stmt = import_symbol_node.text
         import_stmt = import_stmt.strip('"')
-
-        # Resolve the import path using replacements or the module path
-        resolved_paths = []
-        if import_stmt in replacements:
-            resolved_path = replacements[import_stmt]
-            resolved_paths.append(resolved_path)
-        elif module_path and import_stmt.startswith(module_path):
-            resolved_path = self.repo.repo_path / import_stmt[len(module_path) + 1 :]
-            resolved_paths.append(resolved_path)
-        else:
-            # Fallback logic: Try to resolve based on project directory structure
-            resolved_paths.extend(
-                search_fallback_paths(import_stmt, self.repo.repo_path)
-            )
-
-        for resolved_path in resolved_paths:
-            if resolved_path and resolved_path.is_dir():
-                # Try to find a .go file in the directory
-                go_files = list(resolved_path.glob("*.go"))
-                if go_files:
-                    imported_paths.extend(go_files)
-
-        return imported_paths
+        # The go.mod and go.work files are parsed once, see GoPackageIndex
+        return self.go_package_index.resolve(import_stmt, importer_file_path)
 
     def resolve_swift_import(
         self, import_symbol_node: ParseTreeInfo, importer_file_path: Path
     ) -> List[Path]:
-        import_symbol_name = import_symbol_node.text
+        # The name may start with a space after an import kind, e.g. `import struct Module.Symbol`
+        import_symbol_name = import_symbol_node.text.strip()
         if "." in import_symbol_name:
             # Handle individual declarations importing such as `import kind module.symbol`
             # In this case, we extract the module name from the import statement
             import_symbol_name = ".".join(import_symbol_name.split(".")[:-1])
 
+        # Look the module up in the targets first
+        result_files = self.swift_module_index.resolve(
+            import_symbol_name, importer_file_path
+        )
+        if result_files is not None:
+            return result_files
+
         import_symbol_name = import_symbol_name.replace(".", os.sep)
         import_path = self._Path(import_symbol_name)
 
@@ -526,23 +594,18 @@ class ImportResolver:
 
         # Add sibling directories of each directory component of importer_file_path
         for parent in importer_file_path.parents:
-            for sibling in parent.iterdir():
-                if sibling.is_dir() and sibling != importer_file_path:
+            for sibling in self.file_index.iter_subdirectories(parent):
+                if sibling != importer_file_path:
                     search_paths.append(sibling / import_path)
 
         # Heuristic search for source files corresponding to the imported modules
         result_files = []
 
         for path in search_paths:
-            extension_list = Repository.code_file_extensions[Language.Swift]
-            if (
-                path.is_relative_to(self.repo.repo_path)
-                and path.exists()
-                and path.is_dir()
+            if path.is_relative_to(self.repo.repo_path) and self.file_index.is_dir(
+                path
             ):
-                for ext in extension_list:
-                    for swift_file in path.glob(f"**/*{ext}"):
-                        result_files.append(swift_file)
+                result_files.extend(self.swift_module_index.get_directory_files(path))
 
         # Return list of Path objects corresponding to the imported files
         return result_files
@@ -587,18 +650,17 @@ class ImportResolver:
                 mod_file_path = dir_path / "mod.rs"
                 file_path = current_dir / f"{part}.rs"
 
-                if (
-                    mod_file_path.is_relative_to(self.repo.repo_path)
-                    and mod_file_path.exists()
-                ):
+                if mod_file_path.is_relative_to(
+                    self.repo.repo_path
+                ) and self.file_index.exists(mod_file_path):
                     current_dir = dir_path
                     # If it is the last part or the next part is star, return the mod.rs
                     if i == len(module_path) - 1 or module_path[i + 1] == "*":
                         return mod_file_path
 
-                elif (
-                    file_path.is_relative_to(self.repo.repo_path) and file_path.exists()
-                ):
+                elif file_path.is_relative_to(
+                    self.repo.repo_path
+                ) and self.file_index.exists(file_path):
                     return file_path
 
                 else:
@@ -615,7 +677,7 @@ class ImportResolver:
                             ):
                                 continue
 
-                            if ancestor_mod_file_path.exists():
+                            if self.file_index.exists(ancestor_mod_file_path):
                                 # If it is the last part or the next part is star, return the mod.rs
                                 if (
                                     i == len(module_path) - 1
@@ -626,7 +688,7 @@ class ImportResolver:
                                 current_dir = ancestor_dir_path
                                 found = True
                                 break
-                            elif ancestor_file_path.exists():
+                            elif self.file_index.exists(ancestor_file_path):
                                 return ancestor_file_path
 
                         if not found:
@@ -639,67 +701,35 @@ class ImportResolver:
                 last_part = module_path[-2]
             # If we reach here, assume the last module part is a file
             final_file = current_dir / f"{last_part}.rs"
-            if final_file.is_relative_to(self.repo.repo_path) and final_file.exists():
+            if final_file.is_relative_to(
+                self.repo.repo_path
+            ) and self.file_index.exists(final_file):
                 return final_file
             else:
                 return None
 
-        if import_symbol_node.type == "scoped_use_list":
-            """
-            Parse the import statement for a scoped use list
-            e.g. Parsing `use super::{sub_module::sub_function as sub, bar::*};`, we should split the use list into
-            the following module_path:
-            - `['super', 'sub_module', 'sub_function']`
-            - `[super', 'bar', '*']`
-
-            Then we can attempt to find the imported file based on heuristics
-            """
-
-            def parse_scoped_use_list(statement):
-                # Deal with multi-line use list
-                statement = statement.replace("\n", "")
-                # Regular expression to match the scoped use list
-                pattern = r"([\w:]+)::({.*})"
-
-                # Find matches
-                matches = re.findall(pattern, statement)
-
-                result = []
-                for base, scoped in matches:
-                    # Remove curly braces and split by comma
-                    scoped_items = scoped.strip("{}").split(", ")
-                    for item in scoped_items:
-                        # Remove alias (e.g. " as sub") and split by "::"
-                        module_path = base.split("::") + [
-                            i.strip().split(" as ")[0] for i in item.split("::")
-                        ]
-                        result.append(module_path)
-
-                return result
-
-            scoped_use_list_module_paths = parse_scoped_use_list(
-                import_symbol_node.text
-            )
+        """
+        Expand the use tree into the paths it imports, e.g. parsing `use super::{sub_module::sub_function as sub, bar::*};`
+        gives the following module paths:
+        - `['super', 'sub_module', 'sub_function']`
+        - `['super', 'bar', '*']`
 
-            imported_files = []
-            # Attempt to find the imported file based on heuristics
-            for module_path in scoped_use_list_module_paths:
+        They are looked up in the module trees of the crates, or found based on heuristics if the importer is in no crate
+        """
+        in_crate = self.rust_crate_index.get_module(importer_file_path) is not None
+        imported_files = []
+        for module_path in expand_use_tree(import_symbol_node.text):
+            if in_crate:
+                imported_file = self.rust_crate_index.resolve(
+                    module_path, importer_file_path
+                )
+            else:
                 imported_file = find_import_path(
                     self.repo.repo_path, importer_file_path, module_path
                 )
-                if imported_file:
-                    imported_files.append(imported_file)
-
-            return imported_files
-        else:
-            # Decode the symbol name and split into module path components
-            import_symbol_name = import_symbol_node.text
-            module_path = import_symbol_name.split("::")
-            # Attempt to find the imported file based on heuristics
-            imported_file = find_import_path(
-                self.repo.repo_path, importer_file_path, module_path
-            )
-            return [imported_file] if imported_file else []
+            if imported_file and imported_file != importer_file_path:
+                imported_files.append(imported_file)
+        return imported_files
 
     def resolve_lua_import(
         self,
@@ -722,12 +752,16 @@ class ImportResolver:
 
         resolved_path = importer_file_path.parent / import_symbol_name
 
-        if resolved_path.is_relative_to(self.repo.repo_path) and resolved_path.exists():
+        if resolved_path.is_relative_to(self.repo.repo_path) and self.file_index.exists(
+            resolved_path
+        ):
             return [resolved_path]
 
         for ext in extension_list:
             path = resolved_path.with_suffix(ext)
-            if path.is_relative_to(self.repo.repo_path) and path.exists():
+            if path.is_relative_to(self.repo.repo_path) and self.file_index.exists(
+                path
+            ):
                 return [resolved_path.with_suffix(ext)]
         return []
 
@@ -738,14 +772,15 @@ class ImportResolver:
     ) -> List[Path]:
         import_symbol_name = import_symbol_node.text
         import_path = self._Path(import_symbol_name)
-        if import_path.is_relative_to(self.repo.repo_path) and import_path.exists():
+        if import_path.is_relative_to(self.repo.repo_path) and self.file_index.exists(
+            import_path
+        ):
             return [self._Path(import_symbol_name)]
         else:
             resolved_path = importer_file_path.parent / import_symbol_name
-            if (
-                resolved_path.is_relative_to(self.repo.repo_path)
-                and resolved_path.exists()
-            ):
+            if resolved_path.is_relative_to(
+                self.repo.repo_path
+            ) and self.file_index.exists(resolved_path):
                 return [resolved_path]
         return []
 
@@ -758,13 +793,14 @@ class ImportResolver:
         import_symbol_name = import_symbol_name.strip('"').strip("'")
 
         import_path = self._Path(import_symbol_name)
-        if import_path.is_relative_to(self.repo.repo_path) and import_path.exists():
+        if import_path.is_relative_to(self.repo.repo_path) and self.file_index.exists(
+            import_path
+        ):
             return [self._Path(import_symbol_name)]
         else:
             resolved_path = importer_file_path.parent / import_symbol_name
-            if (
-                resolved_path.is_relative_to(self.repo.repo_path)
-                and resolved_path.exists()
-            ):
+            if resolved_path.is_relative_to(
+                self.repo.repo_path
+            ) and self.file_index.exists(resolved_path):
                 return [resolved_path]
         return []
@@ -0,0 +1,295 @@
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dependency_graph.utils.file_index import FileIndex
+from dependency_graph.utils.log import setup_logger
+from dependency_graph.utils.read_file import read_file_to_string
+
+# Initialize logging
+logger = setup_logger()
+
+ModulePath = Tuple[str, ...]
+
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_MOD_DECLARATION = re.compile(
+    r"""(?:\#\[path\s*=\s*"(?P<path>[^"]+)"\]\s*)?  # Optional #[path = "..."]
+        (?:pub(?:\s*\([^)]*\))?\s+)?                  # Optional visibility
+        \bmod\s+(?:r\#)?(?P<name>\w+)\s*(?P<end>[;{])""",
+    re.VERBOSE,
+)
+_USE_TREE_TOKEN = re.compile(r"::|[{},*]|(?:r#)?\w+")
+_TOML_SECTION = re.compile(r"^\s*\[\[?\s*([\w.-]+)\s*\]\]?\s*$")
+_TOML_STRING_KEY = re.compile(r'^\s*(name|path)\s*=\s*"([^"]*)"')
+
+
+def expand_use_tree(use_tree: str) -> List[List[str]]:
+    """
+    Expand the use tree of a `use` declaration into the paths it imports, e.g.
+    `super::{sub_module::sub_function as sub, bar::{self, *}}` is expanded into
+    `[["super", "sub_module", "sub_function"], ["super", "bar", "self"], ["super", "bar", "*"]]`
+    """
+    # Drop the aliases, they do not change the imported paths
+    tokens = _USE_TREE_TOKEN.findall(re.sub(r"\s+as\s+\w+", "", use_tree))
+    position = 0
+
+    def parse_tree(prefix: List[str]) -> List[List[str]]:
+        nonlocal position
+        segments = list(prefix)
+        while position < len(tokens):
+            token = tokens[position]
+            position += 1
+            if token == "{":
+                paths = []
+                while position < len(tokens) and tokens[position] != "}":
+                    if tokens[position] == ",":
+                        position += 1
+                        continue
+                    paths.extend(parse_tree(segments))
+                position += 1
+                return paths
+            segments.append(token)
+            if token == "*" or position >= len(tokens) or tokens[position] != "::":
+                break
+            position += 1
+        return [segments] if len(segments) > len(prefix) else []
+
+    paths = []
+    while position < len(tokens):
+        if tokens[position] in (",", "}"):
+            position += 1
+            continue
+        paths.extend(parse_tree([]))
+    return [[segment.replace("r#", "", 1) for segment in path] for path in paths]
+
+
+def _parse_cargo_toml(cargo_toml_path: Path) -> Tuple[Optional[str], List[Path]]:
+    """Get the package name and the explicit paths of the library and binary targets of a Cargo.toml"""
+    package_name, target_paths, section = None, [], None
+    for line in read_file_to_string(cargo_toml_path).splitlines():
+        match = _TOML_SECTION.match(line)
+        if match:
+            section = match.group(1)
+            continue
+        match = _TOML_STRING_KEY.match(line)
+        if not match:
+            continue
+        key, value = match.groups()
+        if section == "package" and key == "name":
+            package_name = value
+        elif section in ("lib", "bin") and key == "path":
+            target_paths.append(cargo_toml_path.parent / value)
+    return package_name, target_paths
+
+
+@dataclass
+class RustCrate:
+    """The module tree of a crate, mapping the module paths to the files defining them"""
+
+    name: Optional[str]
+    root_file: Path
+    modules: Dict[ModulePath, Path] = field(default_factory=dict)
+
+
+class RustCrateIndex:
+    """
+    The crates of a repository and their module trees, built once from the `mod` declarations starting at the crate
+    roots, which are the targets of the Cargo.toml files or the `lib.rs`/`main.rs` files otherwise. The files which are
+    not declared are added by their layout under the directory of the nearest crate root.
+    """
+
+    def __init__(self, file_index: FileIndex):
+        self.file_index = file_index
+        self.crates: List[RustCrate] = []
+        # The library crates of the packages by their names as used in paths, e.g. `my_lib` for `my-lib`
+        self.extern_crates: Dict[str, RustCrate] = {}
+        # The crate and the module path of every file, the first crate wins if a file is in several crates
+        self._file_modules: Dict[Path, Tuple[RustCrate, ModulePath]] = {}
+
+        for cargo_toml_path in sorted(file_index.files_with_name("Cargo.toml")):
+            try:
+                package_name, target_paths = _parse_cargo_toml(cargo_toml_path)
+            except Exception as e:
+                logger.warning(f"Error {e} parsing {cargo_toml_path}, will ignore")
+                continue
+            src_path = cargo_toml_path.parent / "src"
+            root_files = [
+                *target_paths,
+                src_path / "lib.rs",
+                src_path / "main.rs",
+                *sorted(file_index.glob_suffix(src_path / "bin", ".rs")),
+            ]
+            crate_name = package_name.replace("-", "_") if package_name else None
+            for root_file in root_files:
+                crate = self._add_crate(crate_name, root_file)
+                if crate is not None and crate_name:
+                    self.extern_crates.setdefault(crate_name, crate)
+
+        # Crates without Cargo.toml
+        for root_name in ("lib.rs", "main.rs"):
+            for root_file in sorted(file_index.files_with_name(root_name)):
+                if root_file not in self._file_modules:
+                    self._add_crate(None, root_file)
+
+        self._add_undeclared_files()
+
+    def _add_crate(self, name: Optional[str], root_file: Path) -> Optional[RustCrate]:
+        root_file = self.file_index.normalize(root_file)
+        if not self.file_index.is_file(root_file) or any(
+            crate.root_file == root_file for crate in self.crates
+        ):
+            return None
+        crate = RustCrate(name=name, root_file=root_file)
+        self.crates.append(crate)
+        self._add_module(crate, (), root_file, root_file.parent)
+        return crate
+
+    def _add_module(
+        self,
+        crate: RustCrate,
+        module_path: ModulePath,
+        file_path: Path,
+        directory: Path,
+    ):
+        """Add the module of a file and the modules it declares, `directory` is where its submodules are looked for"""
+        if module_path in crate.modules:
+            return
+        crate.modules[module_path] = file_path
+        self._file_modules.setdefault(file_path, (crate, module_path))
+        try:
+            text = _COMMENT.sub("", read_file_to_string(file_path))
+        except Exception as e:
+            logger.warning(f"Error {e} reading {file_path}, will ignore")
+            return
+        self._add_declared_modules(
+            crate, module_path, file_path, directory, text, 0, len(text)
+        )
+
+    def _add_declared_modules(
+        self,
+        crate: RustCrate,
+        module_path: ModulePath,
+        file_path: Path,
+        directory: Path,
+        text: str,
+        start: int,
+        end: int,
+    ):
+        """Add the modules declared between start and end in the text of a file"""
+        position = start
+        while True:
+            match = _MOD_DECLARATION.search(text, position, end)
+            if match is None:
+                return
+            name = match.group("name")
+            if match.group("end") == "{":
+                # An inline module, its declarations are in the same file until the matching brace
+                inline_end = self._find_matching_brace(text, match.end(), end)
+                crate.modules.setdefault((*module_path, name), file_path)
+                self._add_declared_modules(
+                    crate,
+                    (*module_path, name),
+                    file_path,
+                    directory / name,
+                    text,
+                    match.end(),
+                    inline_end,
+                )
+                position = inline_end
+                continue
+
+            position = match.end()
+            if match.group("path"):
+                candidates = [file_path.parent / match.group("path")]
+            else:
+                candidates = [directory / f"{name}.rs", directory / name / "mod.rs"]
+            for candidate in candidates:
+                if self.file_index.is_file(candidate):
+                    candidate = self.file_index.normalize(candidate)
+                    # The submodules of `foo.rs` are in `foo/`, the ones of `foo/mod.rs` are in `foo/` too
+                    if candidate.name == "mod.rs":
+                        submodule_directory = candidate.parent
+                    else:
+                        submodule_directory = candidate.parent / candidate.stem
+                    self._add_module(
+                        crate, (*module_path, name), candidate, submodule_directory
+                    )
+                    break
+
+    @staticmethod
+    def _find_matching_brace(text: str, start: int, end: int) -> int:
+        depth = 1
+        for position in range(start, end):
+            if text[position] == "{":
+                depth += 1
+            elif text[position] == "}":
+                depth -= 1
+                if depth == 0:
+                    return position
+        return end
+
+    def _add_undeclared_files(self):
+        """Add the files not reached by the `mod` declarations by their layout under the nearest crate root"""
+        crate_directories: Dict[Path, RustCrate] = {}
+        for crate in self.crates:
+            crate_directories.setdefault(crate.root_file.parent, crate)
+
+        for file_path in sorted(self.file_index.files_with_suffix(".rs")):
+            if file_path in self._file_modules:
+                continue
+            for directory in file_path.parents:
+                crate = crate_directories.get(directory)
+                if crate is None:
+                    continue
+                module_path = file_path.relative_to(directory).with_suffix("").parts
+                if module_path[-1] == "mod":
+                    module_path = module_path[:-1]
+                crate.modules.setdefault(module_path, file_path)
+                self._file_modules[file_path] = (crate, module_path)
+                break
+
+    def get_module(self, file_path: Path) -> Optional[Tuple[RustCrate, ModulePath]]:
+        """Get the crate and the module path of a file, None if the file is in no crate"""
+        return self._file_modules.get(file_path)
+
+    def resolve(self, use_path: List[str], importer_file_path: Path) -> Optional[Path]:
+        """
+        Resolve a path of a `use` declaration to the file of the deepest module it names, e.g. `crate::foo::bar` is
+        resolved to the file of the module `foo` if `bar` is a function of it.
+        Returns None if the path is not in the crates of the repository, e.g. `std::collections::HashMap`.
+        """
+        located = self.get_module(importer_file_path)
+        if located is None or not use_path:
+            return None
+        crate, module_path = located
+
+        first, rest = use_path[0], use_path[1:]
+        if first == "crate":
+            base: ModulePath = ()
+        elif first in ("self", "super"):
+            base = module_path
+            rest = use_path
+            while rest and rest[0] in ("self", "super"):
+                if rest[0] == "super":
+                    if not base:
+                        return None
+                    base = base[:-1]
+                rest = rest[1:]
+        elif (*module_path, first) in crate.modules:
+            # Since Rust 2018, a path can start with a submodule of the current module
+            base, rest = module_path, use_path
+        elif first in self.extern_crates:
+            crate = self.extern_crates[first]
+            base = ()
+        elif (first,) in crate.modules:
+            base, rest = (), use_path
+        else:
+            return None
+
+        resolved = base
+        for segment in rest:
+            if (*resolved, segment) not in crate.modules:
+                break
+            resolved = (*resolved, segment)
+        return crate.modules.get(resolved)
@@ -0,0 +1,133 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.file_index import FileIndex
+from dependency_graph.utils.log import setup_logger
+from dependency_graph.utils.read_file import read_file_to_string
+
+# Initialize logging
+logger = setup_logger()
+
+# The conventional directories of the targets, e.g. `Sources/MyApp`
+TARGET_PARENT_DIRECTORY_NAMES = ("Sources", "Tests", "Modules")
+
+_TARGET_DECLARATION = re.compile(
+    r"\.(?:target|testTarget|executableTarget|macro|plugin)\s*\("
+)
+_NAME_ARGUMENT = re.compile(r'\bname\s*:\s*"([^"]+)"')
+_PATH_ARGUMENT = re.compile(r'\bpath\s*:\s*"([^"]+)"')
+
+
+def parse_package_swift(package_swift_path: Path) -> List[Tuple[str, Path]]:
+    """Get the names of the targets of a Package.swift with their custom paths"""
+    text = read_file_to_string(package_swift_path)
+    targets = []
+    for match in _TARGET_DECLARATION.finditer(text):
+        # The arguments end at the matching parenthesis
+        depth, end = 1, match.end()
+        while end < len(text) and depth:
+            if text[end] == "(":
+                depth += 1
+            elif text[end] == ")":
+                depth -= 1
+            end += 1
+        arguments = text[match.end() : end]
+        name = _NAME_ARGUMENT.search(arguments)
+        path = _PATH_ARGUMENT.search(arguments)
+        if name and path:
+            targets.append((name.group(1), package_swift_path.parent / path.group(1)))
+    return targets
+
+
+class SwiftModuleIndex:
+    """
+    The Swift targets of a repository and their files, indexed once by module name. The targets are the directories
+    under `Sources/`, `Tests/` and `Modules/`, and the targets with a custom path in the Package.swift files.
+    """
+
+    def __init__(self, file_index: FileIndex):
+        self.file_index = file_index
+        self.extensions = Repository.code_file_extensions[Language.Swift]
+        # The target directories of every module name
+        self.targets: Dict[str, List[Path]] = {}
+        # The package directory of every target directory
+        self._target_packages: Dict[Path, Path] = {}
+        # The files of the target directories, and of the directories globbed by get_directory_files
+        self._directory_files: Dict[Path, List[Path]] = {}
+
+        target_files: Dict[Path, List[Path]] = {}
+        repo_path = file_index.normalize(file_index.repo_path)
+        for ext in self.extensions:
+            for file_path in file_index.files_with_suffix(ext):
+                for directory in file_path.parents:
+                    # The directory of the targets, e.g. `Sources`, must be in the repository
+                    if directory == repo_path or directory.parent == repo_path:
+                        break
+                    if directory.parent.name in TARGET_PARENT_DIRECTORY_NAMES:
+                        target_files.setdefault(directory, []).append(file_path)
+                        break
+
+        for package_swift_path in sorted(file_index.files_with_name("Package.swift")):
+            try:
+                targets = parse_package_swift(package_swift_path)
+            except Exception as e:
+                logger.warning(f"Error {e} parsing {package_swift_path}, will ignore")
+                continue
+            for name, directory in targets:
+                directory = file_index.normalize(directory)
+                if file_index.is_dir(directory) and directory not in target_files:
+                    self.targets.setdefault(name, []).append(directory)
+                    self._target_packages[directory] = package_swift_path.parent
+                    self.get_directory_files(directory)
+
+        for directory, file_paths in sorted(target_files.items()):
+            self.targets.setdefault(directory.name, []).append(directory)
+            self._target_packages[directory] = directory.parent.parent
+            self._directory_files[directory] = sorted(file_paths)
+
+    def get_directory_files(self, directory: Path) -> List[Path]:
+        """Get the Swift files in a directory and its subdirectories, which are globbed only once"""
+        file_paths = self._directory_files.get(directory)
+        if file_paths is None:
+            file_paths = sorted(
+                file_path
+                for ext in self.extensions
+                for file_path in self.file_index.glob_suffix(
+                    directory, ext, recursive=True
+                )
+            )
+            self._directory_files[directory] = file_paths
+        return file_paths
+
+    def resolve(
+        self, module_name: str, importer_file_path: Path
+    ) -> Optional[List[Path]]:
+        """
+        Get the files of a module, e.g. `MyApp`, or of a directory of a module, e.g. `MyApp.Models`.
+        If several targets have the module name, the ones in the package of the importer are preferred.
+        Returns None if no target has the module name.
+        """
+        target_name, *subdirectories = module_name.split(".")
+        directories = self.targets.get(target_name)
+        if directories is None:
+            return None
+
+        if len(directories) > 1:
+            same_package = [
+                directory
+                for directory in directories
+                if importer_file_path.is_relative_to(self._target_packages[directory])
+            ]
+            directories = same_package or directories
+
+        result_files = []
+        for directory in directories:
+            if subdirectories:
+                directory = directory.joinpath(*subdirectories)
+                if not self.file_index.is_dir(directory):
+                    continue
+            result_files.extend(self.get_directory_files(directory))
+        return result_files
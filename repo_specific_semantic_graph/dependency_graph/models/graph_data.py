@@ -1,18 +1,19 @@
 import enum
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple, TypeVar
 
 from dataclasses_json import dataclass_json, config
 
 from dependency_graph.models.language import Language
 from dependency_graph.utils.log import setup_logger
-from dependency_graph.utils.read_file import read_file_to_string
-from dependency_graph.utils.text import slice_text
+from dependency_graph.utils.source_cache import source_cache
 
 # Initialize logging
 logger = setup_logger()
 
+T = TypeVar("T", "Location", "Node", "Edge")
+
 
 class EdgeRelation(enum.Enum):
     """The relation between two nodes"""
@@ -65,9 +66,32 @@ class EdgeRelation(enum.Enum):
         )
 
 
+class _HashedByStr:
+    """
+    Hash and compare by the string representation. The hash is computed once and cached, so the fields must not be
+    modified once the object has been hashed, use dataclasses.replace instead.
+    """
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(self.__str__())
+            return self._hash
+
+    def __eq__(self, other):
+        return self is other or hash(self) == hash(other)
+
+    def __getstate__(self):
+        # The hash of a str is salted per process, so it is not pickled
+        state = self.__dict__.copy()
+        state.pop("_hash", None)
+        return state
+
+
 @dataclass_json
-@dataclass
-class Location:
+@dataclass(eq=False)
+class Location(_HashedByStr):
     def __str__(self) -> str:
         signature = f"{self.file_path}"
         loc = [self.start_line, self.start_column, self.end_line, self.end_column]
@@ -76,23 +100,16 @@ class Location:
 
         return signature
 
-    def __hash__(self) -> int:
-        return hash(self.__str__())
-
-    def __eq__(self, other):
-        return hash(self) == hash(other)
-
     def get_text(self) -> Optional[str]:
         if self.file_path is None:
             return None
 
-        content = read_file_to_string(self.file_path)
         loc = [self.start_line, self.start_column, self.end_line, self.end_column]
         if any([l is None for l in loc]):
             return None
 
-        return slice_text(
-            content, self.start_line, self.start_column, self.end_line, self.end_column
+        return source_cache.get(self.file_path).slice(
+            self.start_line, self.start_column, self.end_line, self.end_column
         )
 
     file_path: Optional[Path] = field(
@@ -126,17 +143,11 @@ class NodeType(str, enum.Enum):
 
 
 @dataclass_json
-@dataclass
-class Node:
+@dataclass(eq=False)
+class Node(_HashedByStr):
     def __str__(self) -> str:
         return f"{self.name}:{self.type.value}@{self.location}"
 
-    def __hash__(self) -> int:
-        return hash(self.__str__())
-
-    def __eq__(self, other):
-        return hash(self) == hash(other)
-
     def get_text(self) -> Optional[str]:
         return self.location.get_text()
 
@@ -186,20 +197,14 @@ class Node:
 
 
 @dataclass_json
-@dataclass
-class Edge:
+@dataclass(eq=False)
+class Edge(_HashedByStr):
     def __str__(self) -> str:
         signature = f"{self.relation}"
         if self.location:
             signature += f"@{self.location}"
         return signature
 
-    def __hash__(self) -> int:
-        return hash(self.__str__())
-
-    def __eq__(self, other):
-        return hash(self) == hash(other)
-
     def get_text(self) -> Optional[str]:
         return self.location.get_text()
 
@@ -215,3 +220,48 @@ class Edge:
     """The relation between two nodes"""
     location: Optional[Location] = None
     """The location of the edge"""
+
+
+class Interner:
+    """
+    Intern the equal locations, nodes and edges, so that each of them is stored once and hashed once. The objects are
+    looked up by a tuple of their fields, which is cheaper to hash than their string representation. Interned objects
+    are kept alive as long as the interner.
+    """
+
+    def __init__(self):
+        self._objects: Dict[Tuple, Any] = {}
+
+    def __call__(self, obj: Optional[T]) -> Optional[T]:
+        """Get the interned object equal to obj, interning obj and its location if there is none"""
+        if obj is None:
+            return None
+
+        if isinstance(obj, Location):
+            key = (
+                obj.file_path,
+                obj.start_line,
+                obj.start_column,
+                obj.end_line,
+                obj.end_column,
+            )
+        else:
+            location = self(obj.location)
+            if isinstance(obj, Node):
+                key = (obj.type, obj.name, location)
+            else:
+                key = (obj.relation, location)
+
+        interned = self._objects.get(key)
+        if interned is None:
+            if not isinstance(obj, Location):
+                # Share the interned location, which is equal and thus keeps the hash of obj unchanged
+                obj.location = location
+            interned = self._objects[key] = obj
+        return interned
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def clear(self):
+        self._objects.clear()
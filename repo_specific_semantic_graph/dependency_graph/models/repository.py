@@ -1,9 +1,10 @@
 from pathlib import Path
-from typing import Iterable, Dict, Tuple, List
+from typing import Iterable, Dict, Tuple, List, Optional, Sequence, Union
 
 from dependency_graph.models import PathLike
 from dependency_graph.models.language import Language
 from dependency_graph.utils.log import setup_logger
+from dependency_graph.utils.scan_files import scan_files
 
 # from git import Repo, InvalidGitRepositoryError, GitCommandError, NoSuchPathError
 
@@ -15,6 +16,7 @@ class Repository:
     # _git_repo: Repo = None
     repo_path: Path = None
     language: Language
+    languages: Tuple[Language, ...]
 
     code_file_extensions: Dict[Language, Tuple[str]] = {
         Language.CSharp: (".cs", ".csx"),
@@ -38,12 +40,22 @@ class Repository:
     def __init__(
         self,
         repo_path: PathLike,
-        language: Language,
+        language: Union[Language, Iterable[Language]],
+        exclude: Sequence[str] = (),
+        respect_gitignore: bool = True,
+        max_file_size: Optional[int] = None,
+        follow_symlinks: bool = False,
     ) -> None:
         """Initialize the repository. It will find the code files in the repository according to the language suffixes.
         Args:
             repo_path: Path to the repository.
-            language: Language of the repository.
+            language: Language of the repository, or its languages if it is polyglot, e.g.
+                `(Language.TypeScript, Language.JavaScript)`. The first language is the main one.
+            exclude: Gitignore-style patterns of the files and directories to skip, relative to the repository, e.g.
+                `("node_modules/", "build/", "*.min.js")`.
+            respect_gitignore: Whether to skip the files ignored by the .gitignore files of the repository.
+            max_file_size: Skip the code files larger than this number of bytes. Default is None, no limit.
+            follow_symlinks: Whether to find the code files in the symbolic links to directories.
         """
         if isinstance(repo_path, str):
             self.repo_path = Path(repo_path).expanduser().absolute().resolve()
@@ -56,12 +68,19 @@ class Repository:
         if not self.repo_path.exists():
             raise FileNotFoundError(f"Repo path {self.repo_path} does not exist")
 
-        if language not in self.code_file_extensions:
-            raise ValueError(f"Language {language} is not supported to get code files")
+        languages = (language,) if isinstance(language, str) else tuple(language)
+        for language in languages:
+            if language not in self.code_file_extensions:
+                raise ValueError(
+                    f"Language {language} is not supported to get code files"
+                )
 
-        self._files: List[Path] = []
-        # This will trigger the computation of files
-        self.language = language
+        self.exclude = tuple(exclude)
+        self.respect_gitignore = respect_gitignore
+        self.max_file_size = max_file_size
+        self.follow_symlinks = follow_symlinks
+        self._files: Optional[List[Path]] = None
+        self.languages = languages
 
         # try:
         #     self._git_repo = Repo(repo_path)
@@ -70,60 +89,62 @@ class Repository:
         #     pass
 
     def _compute_files(self) -> List[Path]:
-        """Compute the files based on the current language."""
-
-        # Loop through the file extensions
-        files = []
-        for extension in self.code_file_extensions[self.language]:
-            # Use rglob() with a pattern to match the file extension
-            rglob_file_list = self.repo_path.rglob(f"*{extension}")
-            rglob_file_list = [file for file in rglob_file_list if file.is_file()]
-
-            # # Get the git-ignored files
-            # ignored_files = []
-
-            # if self._git_repo:
-            #     try:
-            #         ignored_files = self._git_repo.ignored(
-            #             *list(self.repo_path.rglob(f"*{extension}"))
-            #         )
-            #     except OSError:
-            #         # If the git command argument list is too long, it will raise an OSError.
-            #         # In this case, we will invoke the API by iterating through the files one by one
-            #         logger.warn(
-            #             f"git command argument list is too long, invoking the API by iterating through the files one by one"
-            #         )
-            #         for file in rglob_file_list:
-            #             ignored_files.extend(self._git_repo.ignored(file))
-            #     except GitCommandError:
-            #         pass
-
-            # # Add the files to the set filtering out git-ignored files
-            # self._files.extend(
-            #     [file for file in rglob_file_list if str(file) not in ignored_files]
-            # )
-
-            files.extend(rglob_file_list)  # Add all found files
-        return list(set(files))  # Remove duplicates
+        """Compute the files based on the current language, sorted by path."""
+        return scan_files(
+            self.repo_path,
+            self.file_extensions,
+            exclude=self.exclude,
+            respect_gitignore=self.respect_gitignore,
+            max_file_size=self.max_file_size,
+            follow_symlinks=self.follow_symlinks,
+        )
 
     @property
     def files(self) -> List[Path]:
-        if not self._files:  # Compute files if they haven't been computed yet
+        if self._files is None:  # Compute files if they haven't been computed yet
             self._files = self._compute_files()
         return self._files
 
     @property
     def language(self) -> Language:
-        return self._language
+        """The main language of the repository"""
+        return self._languages[0]
 
     @language.setter
     def language(self, value: Language):
-        if value not in self.code_file_extensions:
-            raise ValueError(f"Language {value} is not supported.")
-        self._language = value
-        self._files = self._compute_files()  # Recompute files based on new language
+        self.languages = (value,)
+
+    @property
+    def languages(self) -> Tuple[Language, ...]:
+        return self._languages
+
+    @languages.setter
+    def languages(self, values: Iterable[Language]):
+        # De-duplicate the languages and keep their order
+        values = tuple(dict.fromkeys(Language(value) for value in values))
+        if not values:
+            raise ValueError("At least one language is required.")
+        for value in values:
+            if value not in self.code_file_extensions:
+                raise ValueError(f"Language {value} is not supported.")
+        self._languages = values
+        # The language of every extension, the first language wins if several languages share an extension
+        self._extension_languages: Dict[str, Language] = {}
+        for value in values:
+            for extension in self.code_file_extensions[value]:
+                self._extension_languages.setdefault(extension, value)
+        self._files = None  # Recompute files based on new languages
+
+    @property
+    def file_extensions(self) -> Tuple[str, ...]:
+        """The extensions of the code files of all the languages"""
+        return tuple(self._extension_languages)
+
+    def get_file_language(self, file_path: Path) -> Optional[Language]:
+        """Get the language of a code file by its extension, None if it is not a code file of the repository"""
+        return self._extension_languages.get(file_path.suffix)
 
     @files.setter
     def files(self, file_paths: Iterable[Path]):
         """Setter to update the files in the repository."""
-        self._files = list(set(file_paths))  # Remove duplicates
+        self._files = sorted(set(file_paths))  # Remove duplicates
@@ -1,5 +1,5 @@
 import heapq
-from typing import Iterable
+from typing import Iterable, List
 
 import networkx as nx
 
@@ -44,9 +44,6 @@ def lexicographical_cyclic_topological_sort(G: nx.DiGraph, key=None) -> Iterable
     NetworkXError
         Raised if the graph `G` is undirected.
 
-    RuntimeError
-        If `G` is changed while the returned iterator is being processed.
-
     TypeError
         Raised if node names are un-sortable.
         Consider using the `key` parameter to resolve ambiguities.
@@ -85,7 +82,16 @@ def lexicographical_cyclic_topological_sort(G: nx.DiGraph, key=None) -> Iterable
     Notes
     -----
     This algorithm is adapted from `networkx.algorithms.dag.lexicographical_topological_sort` and extended
-    to support cyclic directed graphs by handling strongly connected components.
+    to support cyclic directed graphs by condensing the strongly connected components:
+
+    1. The components are sorted topologically, breaking ties by emitting the acyclic components (single nodes
+       without self-loops) first in the lexicographical order of their node, then the cyclic components in the order
+       of the nodes they are entered from.
+    2. A cyclic component is entered from its node with the fewest in-edges from within the component, ties broken
+       lexicographically. Its nodes are then sorted topologically and lexicographically while ignoring the in-edges
+       of the nodes already emitted, entering the remaining cycles the same way.
+
+    It runs in O((V + E) log V) time. Parallel edges are counted as separate in-edges.
     """
     if not G.is_directed():
         msg = "Topological sort not defined on undirected graphs."
@@ -96,48 +102,109 @@ def lexicographical_cyclic_topological_sort(G: nx.DiGraph, key=None) -> Iterable
         def key(node):
             return node
 
-    nodeid_map = {n: i for i, n in enumerate(G)}
-
-    def create_tuple(node):
-        return key(node), nodeid_map[node], node
-
-    indegree_map = {v: d for v, d in G.in_degree()}
-    G_copy: nx.MultiDiGraph = G.copy()
-
-    while G_copy.nodes:
-        # These nodes have min indegree and ready to be returned.
-        min_indegree = min(d for _, d in G_copy.in_degree())
-        min_indegree_heap = [
-            create_tuple(v) for v, d in G_copy.in_degree() if d == min_indegree
+    nodes = list(G)
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    successors = [[node_ids[child] for _, child in G.edges(node)] for node in nodes]
+
+    component_of = [0] * len(nodes)
+    components: List[List[int]] = []
+    for component in nx.strongly_connected_components(G):
+        members = [node_ids[node] for node in component]
+        for i in members:
+            component_of[i] = len(components)
+        components.append(members)
+
+    # The in-degree of every node from within its component and of every component from the other components
+    indegree = [0] * len(nodes)
+    component_indegree = [0] * len(components)
+    cyclic = [len(members) > 1 for members in components]
+    for i, children in enumerate(successors):
+        for child in children:
+            if component_of[i] == component_of[child]:
+                indegree[child] += 1
+                cyclic[component_of[i]] |= i == child
+            else:
+                component_indegree[component_of[child]] += 1
+
+    try:
+        keys = [key(node) for node in nodes]
+
+        def component_priority(c: int) -> tuple:
+            if not cyclic[c]:
+                i = components[c][0]
+                return False, keys[i], i
+            i = min(components[c], key=lambda i: (indegree[i], keys[i], i))
+            return True, indegree[i], keys[i], i
+
+        component_heap = [
+            (component_priority(c), c)
+            for c, degree in enumerate(component_indegree)
+            if degree == 0
         ]
-
-        heapq.heapify(min_indegree_heap)
-        # If min indegree is greater than 0, it means the graph contains cycles
-        # We should just try to take the first node on the heap to break the cycle
-        if min_indegree > 0:
-            _, _, node = heapq.heappop(min_indegree_heap)
-            min_indegree_heap = [create_tuple(node)]
-
-        while min_indegree_heap:
-            _, _, node = heapq.heappop(min_indegree_heap)
-
-            if node not in G_copy:
-                # If node is not in the graph, it means the node pointed to itself.
-                continue
-            for _, child in G_copy.edges(node):
-                try:
-                    indegree_map[child] -= 1
-                except KeyError as err:
-                    raise RuntimeError("Graph changed during iteration") from err
-                if indegree_map[child] == 0:
-                    try:
-                        child_tuple = create_tuple(child)
-                        if child_tuple not in min_indegree_heap:
-                            heapq.heappush(min_indegree_heap, child_tuple)
-                    except TypeError as err:
-                        raise TypeError(
-                            f"{err}\nConsider using `key=` parameter to resolve ambiguities in the sort order."
+        heapq.heapify(component_heap)
+        while component_heap:
+            _, c = heapq.heappop(component_heap)
+            if cyclic[c]:
+                yield from _sort_cyclic_component(
+                    components[c], nodes, keys, successors, indegree
+                )
+            else:
+                yield nodes[components[c][0]]
+
+            for i in components[c]:
+                for child in successors[i]:
+                    child_component = component_of[child]
+                    if child_component == c:
+                        continue
+                    component_indegree[child_component] -= 1
+                    if component_indegree[child_component] == 0:
+                        heapq.heappush(
+                            component_heap,
+                            (component_priority(child_component), child_component),
                         )
-
-            G_copy.remove_node(node)
-            yield node
+    except TypeError as err:
+        raise TypeError(
+            f"{err}\nConsider using `key=` parameter to resolve ambiguities in the sort order."
+        ) from err
+
+
+def _sort_cyclic_component(
+    members: List[int],
+    nodes: list,
+    keys: list,
+    successors: List[List[int]],
+    indegree: List[int],
+) -> Iterable:
+    """
+    Sort the nodes of a strongly connected component topologically and lexicographically, entering every cycle from
+    the node with the fewest remaining in-edges. `indegree` holds the in-degree of the nodes from within the component
+    and is consumed.
+    """
+    member_set = set(members)
+    emitted = set()
+    # Lazy heap of the remaining nodes by in-degree, the stale entries are skipped when popped
+    cycle_heap = [(indegree[i], keys[i], i) for i in members]
+    heapq.heapify(cycle_heap)
+    ready_heap = []
+    while len(emitted) < len(members):
+        if not ready_heap:
+            while True:
+                degree, node_key, i = heapq.heappop(cycle_heap)
+                if i not in emitted and degree == indegree[i]:
+                    break
+            ready_heap.append((node_key, i))
+
+        _, i = heapq.heappop(ready_heap)
+        if i in emitted:
+            continue
+        emitted.add(i)
+        yield nodes[i]
+
+        for child in successors[i]:
+            if child not in member_set or child in emitted:
+                continue
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                heapq.heappush(ready_heap, (keys[child], child))
+            else:
+                heapq.heappush(cycle_heap, (indegree[child], keys[child], child))
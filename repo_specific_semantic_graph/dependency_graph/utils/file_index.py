@@ -0,0 +1,321 @@
+import os
+import posixpath
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from dependency_graph.models import PathLike, VirtualPath
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.log import setup_logger
+
+# Initialize logging
+logger = setup_logger()
+
+# The directories of the version control systems, which never contain imported code
+IGNORED_DIRECTORY_NAMES = (".git", ".hg", ".svn")
+
+# The files other than the code files that the import resolvers of a language look up, they are in the directories of
+# the code files, e.g. the `Cargo.toml` of a crate is in the parent directory of its `src`
+MANIFEST_FILE_NAMES: Dict[Language, Tuple[str, ...]] = {
+    Language.Go: ("go.mod", "go.work"),
+    Language.Rust: ("Cargo.toml",),
+    Language.Swift: ("Package.swift",),
+}
+
+
+class FileIndex:
+    """
+    An in-memory snapshot of the files and directories of a repository, to answer the existence, directory listing and
+    suffix queries of the import resolvers without querying the file system.
+
+    If the Repository is given, the index is built from its files, the directories containing them and the manifest
+    files of its languages in these directories, so that its exclude and .gitignore rules apply and the repository is
+    not walked again. The other files, e.g. a `.css` file imported by JavaScript, are looked up in the file system on
+    demand. Otherwise, the index is built with a single walk of the repository.
+
+    The paths are looked up after being made absolute and normalized, without resolving the symbolic links. The
+    symbolic links are indexed with their real paths but the linked directories are not walked into.
+    Call invalidate with the paths of the changed files to refresh the index after the repository is modified.
+    """
+
+    def __init__(self, repo_path: Path, repo: Optional[Repository] = None):
+        self.repo_path = repo_path
+        self.repo = repo
+        self._path_module = posixpath if isinstance(repo_path, VirtualPath) else os.path
+        # The names of the entries of each directory, mapped to whether they are directories
+        self._directories: Dict[str, Dict[str, bool]] = {}
+        self._files: Set[str] = set()
+        self._files_by_suffix: Dict[str, Set[str]] = {}
+        self._files_by_name: Dict[str, Set[str]] = {}
+        # The real paths of the symbolic links
+        self._links: Dict[str, str] = {}
+        # Whether the files that are not code files of the Repository exist, checked on demand
+        self._other_files: Dict[str, bool] = {}
+        self._root = self._key(repo_path)
+        self._build()
+
+    def _build(self):
+        if self.repo is None:
+            self._walk(self._root)
+            return
+
+        for file_path in self.repo.files:
+            self._add_file_with_directories(self._key(file_path))
+        manifest_names = {
+            name
+            for language in self.repo.languages
+            for name in MANIFEST_FILE_NAMES.get(language, ())
+        }
+        if manifest_names:
+            for directory in list(self._directories):
+                for name in manifest_names:
+                    key = self._path_module.join(directory, name)
+                    if key not in self._files and self._Path(key).is_file():
+                        self._add_file_with_directories(key)
+
+    def _add_file_with_directories(self, key: str):
+        """Add a file of the repository together with the directories above it"""
+        if not key.startswith(self._path_module.join(self._root, "")):
+            return
+        self._directories.setdefault(self._root, {})
+        self._add_directories(key, False)
+        self._add_file(key)
+
+    def _add_directories(self, key: str, is_dir: bool):
+        """Add the entry to its parent directory, and the parent directories that are not indexed yet to theirs"""
+        parent, name = self._path_module.split(key)
+        while True:
+            entries = self._directories.get(parent)
+            is_new_directory = entries is None
+            if is_new_directory:
+                entries = self._directories[parent] = {}
+            entries[name] = is_dir
+            if not is_new_directory or parent == self._root:
+                break
+            parent, name = self._path_module.split(parent)
+            is_dir = True
+
+    def _key(self, path: PathLike) -> str:
+        """Get the absolute and normalized string of a path, relative paths are relative to the working directory"""
+        if isinstance(path, VirtualPath):
+            path = path.relative_fs_path
+        path = os.fspath(path)
+        if not self._path_module.isabs(path):
+            if self._path_module is posixpath:
+                # Virtual file systems have no working directory
+                path = posixpath.join("/", path)
+            else:
+                path = os.path.join(os.getcwd(), path)
+        return self._path_module.normpath(path)
+
+    def _Path(self, key: str) -> Path:
+        if isinstance(self.repo_path, VirtualPath):
+            return VirtualPath(self.repo_path.fs, key)
+        return Path(key)
+
+    def _scandir(self, directory: str) -> Iterator[Tuple[str, bool, Optional[str]]]:
+        """Yield the name, whether it is a directory and the real path if it is a symbolic link of the entries"""
+        if isinstance(self.repo_path, VirtualPath):
+            for info in self.repo_path.fs.scandir(directory):
+                yield info.name, info.is_dir, None
+            return
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                    if not is_dir and not entry.is_file():
+                        # Broken links, sockets etc.
+                        continue
+                    real_path = (
+                        os.path.realpath(entry.path) if entry.is_symlink() else None
+                    )
+                except OSError:
+                    continue
+                yield entry.name, is_dir, real_path
+
+    def _walk(self, directory: str):
+        """Index a directory and everything under it"""
+        stack = [directory]
+        while stack:
+            directory = stack.pop()
+            entries = self._directories.setdefault(directory, {})
+            try:
+                scanned = list(self._scandir(directory))
+            except Exception as e:
+                logger.warning(f"Error {e} listing {directory}, will ignore")
+                continue
+
+            for name, is_dir, real_path in scanned:
+                if is_dir and name in IGNORED_DIRECTORY_NAMES:
+                    continue
+                key = self._path_module.join(directory, name)
+                entries[name] = is_dir
+                if real_path is not None:
+                    self._links[key] = real_path
+                if not is_dir:
+                    self._add_file(key)
+                elif real_path is None:
+                    stack.append(key)
+                else:
+                    self._directories.setdefault(key, {})
+
+    def _add_file(self, key: str):
+        self._files.add(key)
+        suffix = self._path_module.splitext(key)[1]
+        self._files_by_suffix.setdefault(suffix, set()).add(key)
+        name = self._path_module.basename(key)
+        self._files_by_name.setdefault(name, set()).add(key)
+
+    def _remove(self, key: str):
+        """Remove an entry, and everything under it if it is a directory"""
+        parent, name = self._path_module.split(key)
+        self._directories.get(parent, {}).pop(name, None)
+        self._links.pop(key, None)
+        if key in self._files:
+            self._files.discard(key)
+            suffix = self._path_module.splitext(key)[1]
+            self._files_by_suffix[suffix].discard(key)
+            self._files_by_name[name].discard(key)
+        entries = self._directories.pop(key, None)
+        if entries:
+            for name in entries:
+                self._remove(self._path_module.join(key, name))
+
+    def invalidate(self, paths: Iterable[PathLike] = None):
+        """
+        Refresh the entries of the given paths from the file system, e.g. of the files added, modified or deleted since
+        the index was built. The whole repository is walked again if no path is given.
+        """
+        if paths is None:
+            self._directories.clear()
+            self._files.clear()
+            self._files_by_suffix.clear()
+            self._files_by_name.clear()
+            self._links.clear()
+            self._other_files.clear()
+            self._build()
+            return
+
+        for path in paths:
+            key = self._key(path)
+            if key == self._root:
+                self.invalidate()
+                return
+            if not key.startswith(self._path_module.join(self._root, "")):
+                continue
+            self._remove(key)
+            self._other_files.clear()
+
+            path = self._Path(key)
+            is_dir = path.is_dir()
+            if not is_dir and not path.is_file():
+                continue
+            # Index the directories created for the path
+            self._add_directories(key, is_dir)
+
+            is_symlink = path.is_symlink()
+            if is_symlink:
+                self._links[key] = self._key(path.resolve())
+            if not is_dir:
+                self._add_file(key)
+            elif is_symlink:
+                self._directories[key] = {}
+            else:
+                self._walk(key)
+
+    def normalize(self, path: PathLike) -> Path:
+        """Make a path absolute and normalized like the paths in the index, without resolving the symbolic links"""
+        return self._Path(self._key(path))
+
+    def _is_other_file(self, key: str) -> bool:
+        """Whether a file of the repository that is not a code file of the Repository, and so not indexed, exists"""
+        if (
+            self.repo is None
+            or key in self._directories
+            or self._path_module.splitext(key)[1] in self.repo.file_extensions
+            or not key.startswith(self._path_module.join(self._root, ""))
+        ):
+            return False
+        is_file = self._other_files.get(key)
+        if is_file is None:
+            is_file = self._other_files[key] = self._Path(key).is_file()
+        return is_file
+
+    def exists(self, path: PathLike) -> bool:
+        key = self._key(path)
+        return (
+            key in self._files or key in self._directories or self._is_other_file(key)
+        )
+
+    def is_file(self, path: PathLike) -> bool:
+        key = self._key(path)
+        return key in self._files or self._is_other_file(key)
+
+    def is_dir(self, path: PathLike) -> bool:
+        return self._key(path) in self._directories
+
+    def iterdir(self, path: PathLike) -> List[Path]:
+        """List the entries of a directory, which is empty if it is not in the index"""
+        key = self._key(path)
+        return [
+            self._Path(self._path_module.join(key, name))
+            for name in self._directories.get(key, ())
+        ]
+
+    def iter_subdirectories(self, path: PathLike) -> List[Path]:
+        """List the subdirectories of a directory, which is empty if it is not in the index"""
+        key = self._key(path)
+        return [
+            self._Path(self._path_module.join(key, name))
+            for name, is_dir in self._directories.get(key, {}).items()
+            if is_dir
+        ]
+
+    def glob_suffix(
+        self, path: PathLike, suffix: str, recursive: bool = False
+    ) -> List[Path]:
+        """
+        Find the files with a suffix in a directory like `path.glob(f"*{suffix}")`, or in the whole tree of the
+        directory like `path.glob(f"**/*{suffix}")` if recursive
+        """
+        key = self._key(path)
+        result = []
+        stack = [key]
+        while stack:
+            directory = stack.pop()
+            for name, is_dir in self._directories.get(directory, {}).items():
+                if is_dir:
+                    if recursive:
+                        stack.append(self._path_module.join(directory, name))
+                elif name.endswith(suffix):
+                    result.append(self._Path(self._path_module.join(directory, name)))
+        return result
+
+    def files_with_suffix(self, suffix: str) -> List[Path]:
+        """Find all files with a suffix, e.g. `.go`"""
+        return [self._Path(key) for key in self._files_by_suffix.get(suffix, ())]
+
+    def files_with_name(self, name: str) -> List[Path]:
+        """Find all files with a name, e.g. `utils.h`"""
+        return [self._Path(key) for key in self._files_by_name.get(name, ())]
+
+    def resolve(self, path: PathLike) -> Optional[Path]:
+        """
+        Get the normalized path of a file with its symbolic link resolved, like `path.resolve()`.
+        Returns None if the path is not a file.
+        """
+        key = self._key(path)
+        if key not in self._files and not self._is_other_file(key):
+            return None
+        real_path = self._links.get(key)
+        if real_path is None:
+            real_path = key
+            # The symbolic links among the files of a Repository are resolved on demand
+            if (
+                self.repo is not None
+                and self._path_module is os.path
+                and os.path.islink(key)
+            ):
+                real_path = self._links[key] = os.path.realpath(key)
+        return self._Path(real_path)
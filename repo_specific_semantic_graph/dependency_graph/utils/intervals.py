@@ -1,4 +1,6 @@
-from typing import Iterable, Any, Tuple, Optional
+import bisect
+import heapq
+from typing import Iterable, Any, Tuple, Optional, List
 
 
 def find_innermost_interval(
@@ -30,3 +32,50 @@ def find_innermost_interval(
                 inner_most_interval = interval
 
     return inner_most_interval
+
+
+class InnermostIntervalIndex:
+    """
+    An index answering "which is the innermost interval containing this index" in O(log n).
+
+    The intervals are split into the elementary segments between their boundaries, and each segment is mapped to the
+    innermost interval covering it, so that a query is a binary search over the segment starts. The answers are the
+    same as `find_innermost_interval` over the same intervals, including the tie-breaking: among intervals of the same
+    length, the first one in the given order is returned.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]]):
+        intervals = list(intervals)
+        order_by_start = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+        boundaries = sorted(
+            {start for start, _, _ in intervals} | {end + 1 for _, end, _ in intervals}
+        )
+
+        self._segment_starts: List[int] = []
+        self._segment_intervals: List[Optional[Tuple[int, int, Any]]] = []
+
+        # Sweep the boundaries, keeping the open intervals in a heap ordered by (length, original order)
+        heap: List[Tuple[int, int]] = []
+        next_interval = 0
+        for boundary in boundaries:
+            while (
+                next_interval < len(order_by_start)
+                and intervals[order_by_start[next_interval]][0] <= boundary
+            ):
+                i = order_by_start[next_interval]
+                start, end, _ = intervals[i]
+                heapq.heappush(heap, (end - start, i))
+                next_interval += 1
+            # Lazily drop the intervals that ended before this boundary
+            while heap and intervals[heap[0][1]][1] < boundary:
+                heapq.heappop(heap)
+
+            self._segment_starts.append(boundary)
+            self._segment_intervals.append(intervals[heap[0][1]] if heap else None)
+
+    def find_innermost_interval(self, index: int) -> Optional[Tuple[int, int, Any]]:
+        """Return the innermost interval (start, end, Any) that contains the index, or None if no such interval exists."""
+        segment = bisect.bisect_right(self._segment_starts, index) - 1
+        if segment < 0:
+            return None
+        return self._segment_intervals[segment]
@@ -0,0 +1,30 @@
+import os
+import sys
+from typing import Optional
+
+
+def get_rss() -> Optional[int]:
+    """
+    Get the resident set size of this process in bytes. It is read from /proc on Linux, elsewhere the peak resident set
+    size is returned. Returns None if it cannot be measured on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_size(size: Optional[int]) -> str:
+    """Format a number of bytes in megabytes for the logs"""
+    if size is None:
+        return "unknown"
+    return f"{size / 2**20:.1f} MB"
@@ -1,7 +1,29 @@
 import multiprocessing
 import pickle
+import time
 import traceback
-from typing import Any, Callable, Optional
+import weakref
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+
+def _rebuild_error(error: bytes, tb: str) -> Exception:
+    """Deserialize an exception raised in a subprocess and append its original traceback to the message"""
+    error = pickle.loads(error)
+    try:
+        rebuilt = type(error)(f"{error}\nOriginal traceback:\n{tb}")
+    except Exception:
+        rebuilt = RuntimeError(f"{error!r}\nOriginal traceback:\n{tb}")
+    rebuilt.__cause__ = error
+    return rebuilt
+
+
+def _dump_error(error: Exception) -> bytes:
+    try:
+        return pickle.dumps(error)
+    except Exception:
+        return pickle.dumps(RuntimeError(repr(error)))
 
 
 class SubprocessRunner:
@@ -47,3 +69,185 @@ class SubprocessRunner:
             raise type(error)(f"{error}\nOriginal traceback:\n{tb}") from error
 
         return return_dict.get("result")
+
+
+def _worker_loop(
+    conn: Connection,
+    func: Callable,
+    initializer: Optional[Callable],
+    initargs: tuple,
+):
+    """Build the state of the worker once, then run the received tasks until the connection is closed"""
+    state = initializer(*initargs) if initializer else None
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            break
+        if args is None:
+            break
+
+        try:
+            conn.send((True, func(state, *args)))
+        except Exception as e:
+            conn.send((False, (_dump_error(e), traceback.format_exc())))
+
+
+class _Worker:
+    def __init__(
+        self, func: Callable, initializer: Optional[Callable], initargs: tuple
+    ):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_loop,
+            args=(child_conn, func, initializer, initargs),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        # The index of the task being run and its deadline
+        self.task: Optional[int] = None
+        self.deadline: Optional[float] = None
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def _stop_workers(workers: List[_Worker]):
+    for worker in workers:
+        worker.stop()
+    workers.clear()
+
+
+class SubprocessPool:
+    """
+    A pool of long-lived worker processes to run the functions that may crash or deadlock, such as Tree-sitter
+    parsing, without paying for a new process per call.
+
+    Every worker builds its state once by calling `initializer(*initargs)`, then runs the tasks with
+    `func(state, *args)`. As with SubprocessRunner, a task that crashes its worker or runs longer than the timeout
+    fails with a RuntimeError or a TimeoutError, and an exception raised by the task is re-raised with its original
+    traceback. The other tasks are not affected: a crashed or timed out worker is killed and replaced by a new one.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        max_workers: int = 1,
+    ):
+        """
+        :param func: The function run by the workers, it takes the state of the worker and the arguments of a task.
+            func and initializer must be picklable if the processes are not forked.
+        :param initializer: The function that builds the state of a worker, e.g. loading a parser
+        :param initargs: The arguments of the initializer
+        :param max_workers: The maximum number of worker processes, they are started on demand
+        """
+        self.func = func
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_workers = max(1, max_workers)
+        self._workers: List[_Worker] = []
+        self._finalizer = weakref.finalize(self, _stop_workers, self._workers)
+
+    def run(self, *args, timeout: Optional[float] = None) -> Any:
+        """Run a single task and return its result"""
+        (result,) = self.map([args], timeout=timeout)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def map(
+        self, tasks: Iterable[Sequence], timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Run a batch of tasks on the workers.
+
+        :param tasks: The arguments of every task
+        :param timeout: The timeout of every task in seconds, counted from when it is sent to a worker
+        :return: The results of the tasks in order. The result of a failed task is its exception.
+        """
+        tasks = [tuple(args) for args in tasks]
+        results: List[Any] = [None] * len(tasks)
+        pending = deque(range(len(tasks)))
+        idle = deque(self._workers)
+        busy = {}
+
+        while pending or busy:
+            while pending and (idle or len(self._workers) < self.max_workers):
+                worker = idle.popleft() if idle else self._spawn()
+                index = pending[0]
+                try:
+                    worker.conn.send(tasks[index])
+                except (OSError, ValueError):
+                    # The worker has died while idle
+                    self._replace(worker, kill=True)
+                    continue
+                pending.popleft()
+                worker.task = index
+                worker.deadline = (
+                    None if timeout is None else time.monotonic() + timeout
+                )
+                busy[worker.conn] = worker
+
+            wait_timeout = None
+            if timeout is not None:
+                wait_timeout = max(
+                    0.0, min(w.deadline for w in busy.values()) - time.monotonic()
+                )
+            for conn in wait(list(busy), wait_timeout):
+                worker = busy.pop(conn)
+                try:
+                    success, payload = conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(1)
+                    results[worker.task] = RuntimeError(
+                        f"Process crashed with exit code: {worker.process.exitcode}"
+                    )
+                    self._replace(worker, kill=True)
+                    continue
+                results[worker.task] = payload if success else _rebuild_error(*payload)
+                idle.append(worker)
+
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                if worker.deadline is not None and worker.deadline <= now:
+                    del busy[conn]
+                    results[worker.task] = TimeoutError(
+                        f"Process timed out after {timeout} seconds"
+                    )
+                    self._replace(worker, kill=True)
+
+        return results
+
+    def close(self):
+        """Stop the workers, the pool starts new ones if it is used again"""
+        _stop_workers(self._workers)
+
+    def __enter__(self) -> "SubprocessPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.func, self.initializer, self.initargs)
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, kill: bool = False):
+        """Stop the worker, a new one is spawned on demand"""
+        self._workers.remove(worker)
+        worker.stop(kill=kill)
@@ -0,0 +1,245 @@
+import os
+import re
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, List, Optional, Pattern, Sequence, Set, Tuple
+
+from dependency_graph.models import VirtualPath
+from dependency_graph.utils.log import setup_logger
+
+# Initialize logging
+logger = setup_logger()
+
+# The directories of the version control systems are never scanned
+VCS_DIRECTORY_NAMES = (".git", ".hg", ".svn")
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate the body of a gitignore pattern into a regex, `*` and `?` do not match `/` while `**` does"""
+    regex, i = "", 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex += "/.*"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                regex += re.escape("[")
+                i += 1
+            else:
+                char_class = pattern[i + 1 : end]
+                if char_class.startswith("!"):
+                    char_class = "^" + char_class[1:]
+                regex += f"[{char_class}]"
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+class GitIgnore:
+    """The patterns of a .gitignore file, which are matched against the paths relative to its directory"""
+
+    def __init__(self, patterns: Iterable[str]):
+        # The regex, whether the pattern is negated and whether it only matches directories, of every pattern
+        self.rules: List[Tuple[Pattern, bool, bool]] = []
+        for pattern in patterns:
+            pattern = pattern.rstrip("\n")
+            # Trailing spaces are ignored unless they are escaped
+            if not pattern.endswith("\\ "):
+                pattern = pattern.rstrip(" ")
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            elif pattern.startswith(("\\!", "\\#")):
+                pattern = pattern[1:]
+            directory_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+
+            # A pattern with a slash is relative to the directory of the .gitignore, otherwise it matches at any depth
+            if "/" in pattern:
+                regex = _translate_glob(pattern.lstrip("/"))
+            else:
+                regex = "(?:.*/)?" + _translate_glob(pattern)
+            self.rules.append((re.compile(f"^{regex}$"), negated, directory_only))
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "GitIgnore":
+        return cls(file_path.read_text(errors="replace").splitlines())
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Match a path relative to the directory of the .gitignore, with `/` as separator.
+        Returns True if it is ignored, False if it is re-included by a negated pattern, None if no pattern matches.
+        """
+        ignored = None
+        for regex, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                ignored = not negated
+        return ignored
+
+
+def _scandir(
+    directory: Path, extensions: Tuple[str, ...], with_size: bool
+) -> List[Tuple[str, Path, bool, bool, Optional[int], Optional[Tuple[int, int]]]]:
+    """
+    List the subdirectories and the files with the extensions of a directory, sorted by name. Every entry is its name,
+    its path, whether it is a directory, whether it is a symbolic link, its size if it is a file and with_size is True,
+    and the device and inode numbers of the directory a symbolic link points to.
+    """
+    result = []
+    if isinstance(directory, VirtualPath):
+        namespaces = ["details"] if with_size else None
+        for info in directory.fs.scandir(
+            directory.relative_fs_path, namespaces=namespaces
+        ):
+            if info.is_dir or info.name.endswith(extensions):
+                size = info.size if with_size and not info.is_dir else None
+                result.append(
+                    (info.name, directory / info.name, info.is_dir, False, size, None)
+                )
+        result.sort(key=itemgetter(0))
+        return result
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+                # The broken links, sockets etc. are neither directories nor files
+                if not is_dir and not (
+                    entry.name.endswith(extensions) and entry.is_file()
+                ):
+                    continue
+                is_symlink = entry.is_symlink()
+                size, target = None, None
+                if not is_dir and with_size:
+                    size = entry.stat().st_size
+                elif is_dir and is_symlink:
+                    target_stat = entry.stat()
+                    target = target_stat.st_dev, target_stat.st_ino
+            except OSError:
+                continue
+            result.append(
+                (entry.name, Path(entry.path), is_dir, is_symlink, size, target)
+            )
+    result.sort(key=itemgetter(0))
+    return result
+
+
+def scan_files(
+    root: Path,
+    extensions: Sequence[str],
+    exclude: Sequence[str] = (),
+    respect_gitignore: bool = True,
+    max_file_size: Optional[int] = None,
+    follow_symlinks: bool = False,
+) -> List[Path]:
+    """
+    Find the files with the given extensions under a directory with a single walk, sorted by path.
+    :param root: The directory to scan.
+    :param extensions: The extensions of the files, e.g. `(".py", ".pyi")`.
+    :param exclude: Gitignore-style patterns of the files and directories to skip, relative to the root, e.g.
+        `("node_modules/", "build/", "*.min.js")`.
+    :param respect_gitignore: Whether to skip the files and directories ignored by the .gitignore files in the tree.
+    :param max_file_size: Skip the files larger than this number of bytes. Default is None, no limit.
+    :param follow_symlinks: Whether to walk into the symbolic links to directories. Each directory is walked at most once
+        so that the symbolic link loops are not followed.
+    """
+    extensions = tuple(extensions)
+    excluded = GitIgnore(exclude)
+    # The .gitignore files of the directories being walked, with the path of their directory relative to the root
+    gitignores: List[Tuple[str, GitIgnore]] = []
+    visited: Set[Tuple[int, int]] = set()
+    if follow_symlinks and not isinstance(root, VirtualPath):
+        root_stat = root.stat()
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    def is_ignored(relative_path: str, is_dir: bool) -> bool:
+        if excluded.match(relative_path, is_dir):
+            return True
+        ignored = False
+        for directory, gitignore in gitignores:
+            if directory:
+                if not relative_path.startswith(directory + "/"):
+                    continue
+                matched = gitignore.match(relative_path[len(directory) + 1 :], is_dir)
+            else:
+                matched = gitignore.match(relative_path, is_dir)
+            if matched is not None:
+                ignored = matched
+        return ignored
+
+    files = []
+
+    def walk(directory: Path, relative_directory: str):
+        gitignore_path = directory / ".gitignore"
+        has_gitignore = False
+        if respect_gitignore:
+            try:
+                if gitignore_path.is_file():
+                    gitignores.append(
+                        (relative_directory, GitIgnore.from_file(gitignore_path))
+                    )
+                    has_gitignore = True
+            except OSError as e:
+                logger.warning(f"Error {e} reading {gitignore_path}, will ignore")
+
+        try:
+            entries = _scandir(directory, extensions, max_file_size is not None)
+        except Exception as e:
+            logger.warning(f"Error {e} listing {directory}, will ignore")
+            entries = []
+
+        for name, path, is_dir, is_symlink, size, target in entries:
+            relative_path = (
+                f"{relative_directory}/{name}" if relative_directory else name
+            )
+            if is_dir:
+                if name in VCS_DIRECTORY_NAMES or is_ignored(relative_path, True):
+                    continue
+                if is_symlink:
+                    if not follow_symlinks or target in visited:
+                        continue
+                    visited.add(target)
+                elif follow_symlinks:
+                    directory_stat = path.stat()
+                    directory_key = directory_stat.st_dev, directory_stat.st_ino
+                    if directory_key in visited:
+                        continue
+                    visited.add(directory_key)
+                walk(path, relative_path)
+            else:
+                if max_file_size is not None and size > max_file_size:
+                    logger.info(f"Skipping {path} larger than {max_file_size} bytes")
+                    continue
+                if not is_ignored(relative_path, False):
+                    files.append(path)
+
+        if has_gitignore:
+            gitignores.pop()
+
+    walk(root, "")
+    return sorted(files)
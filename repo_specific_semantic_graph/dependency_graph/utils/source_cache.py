@@ -0,0 +1,129 @@
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Hashable, Optional, Tuple
+
+from dependency_graph.models import PathLike, VirtualPath
+from dependency_graph.utils.read_file import read_file_to_string
+from dependency_graph.utils.text import get_line_offsets, slice_text
+
+DEFAULT_MAX_SIZE = 64 * 2**20
+
+
+@dataclass
+class SourceFile:
+    """The decoded text of a file and the offsets of the starts of its lines"""
+
+    text: str
+    line_offsets: array
+
+    @classmethod
+    def from_text(cls, text: str) -> "SourceFile":
+        return cls(text, array("q", get_line_offsets(text)))
+
+    @property
+    def size(self) -> int:
+        """The approximate number of bytes held in memory"""
+        return sys.getsizeof(self.text) + self.line_offsets.itemsize * len(
+            self.line_offsets
+        )
+
+    def slice(
+        self, start_line: int, start_column: int, end_line: int, end_column: int
+    ) -> str:
+        """Slice the text like slice_text, without splitting the lines of the whole file"""
+        return slice_text(
+            self.text,
+            start_line,
+            start_column,
+            end_line,
+            end_column,
+            self.line_offsets,
+        )
+
+
+def get_file_version(file_path: Path) -> Optional[Hashable]:
+    """
+    Get the modification time and size of a file, which change when the file is modified.
+    Returns None if the file system of a virtual path supports neither the stat nor the details namespaces.
+    """
+    stat = file_path.stat()
+    if stat is not None:
+        return stat.st_mtime, stat.st_size
+    if isinstance(file_path, VirtualPath):
+        info = file_path.fs.getinfo(file_path.relative_fs_path, namespaces=["details"])
+        if info.has_namespace("details"):
+            return info.modified, info.size
+    return None
+
+
+class SourceCache:
+    """
+    A size-bounded LRU cache of the decoded source files, keyed by the file path and validated by the file version
+    returned by get_file_version. Files of a virtual file system without a version are cached until invalidated.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param max_size: The maximum approximate number of bytes of the cached files. The most recently read file is
+            always kept, even if it is larger.
+        """
+        self.max_size = max_size
+        self._files: OrderedDict[
+            Path, Tuple[Optional[Hashable], SourceFile]
+        ] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, file_path: PathLike) -> SourceFile:
+        """Get the source file, reading it if it is not cached or has been modified since it was cached"""
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+
+        version = get_file_version(file_path)
+        with self._lock:
+            cached = self._files.get(file_path)
+            if cached is not None and cached[0] == version:
+                self._files.move_to_end(file_path)
+                return cached[1]
+
+        source_file = SourceFile.from_text(read_file_to_string(file_path))
+        with self._lock:
+            self._pop(file_path)
+            self._files[file_path] = (version, source_file)
+            self._size += source_file.size
+            while self._size > self.max_size and len(self._files) > 1:
+                self._pop(next(iter(self._files)))
+        return source_file
+
+    def invalidate(self, file_path: PathLike):
+        """Drop a file from the cache, e.g. after modifying a virtual file without a version"""
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+        with self._lock:
+            self._pop(file_path)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, file_path: PathLike) -> bool:
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+        return file_path in self._files
+
+    def _pop(self, file_path: Path):
+        cached = self._files.pop(file_path, None)
+        if cached is not None:
+            self._size -= cached[1].size
+
+
+source_cache = SourceCache()
+"""The source cache shared by Location.get_text"""
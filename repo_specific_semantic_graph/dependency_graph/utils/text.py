@@ -1,8 +1,24 @@
-from typing import Tuple
+from typing import List, Optional, Sequence, Tuple
+
+
+def get_line_offsets(text: str) -> List[int]:
+    """
+    Get the offsets of the starts of the lines of the text, the last offset is past the end of the last line.
+    The lines are split by `str.splitlines` and counted with a one-character line separator, as in slice_text_around.
+    """
+    offsets = [0]
+    for line in text.splitlines():
+        offsets.append(offsets[-1] + len(line) + 1)
+    return offsets
 
 
 def slice_text_around(
-    text: str, start_line: int, start_column: int, end_line: int, end_column: int
+    text: str,
+    start_line: int,
+    start_column: int,
+    end_line: int,
+    end_column: int,
+    line_offsets: Optional[Sequence[int]] = None,
 ) -> Tuple[str, str, str]:
     """
     Slice the text around the specified portion of the text.
@@ -11,18 +27,23 @@ def slice_text_around(
     :param start_column: The column number of the start of the desired portion of the text (1-based index)
     :param end_line: The line number of the end of the desired portion of the text (1-based index)
     :param end_column: The column number of the end of the desired portion of the text (1-based index)
+    :param line_offsets: The line offsets of the text returned by get_line_offsets, computed if not provided
     :returns The text before the desired portion, the desired portion, and the text after the desired portion
     """
-    lines = text.splitlines()
-    start_index = (
-        sum(len(lines[i]) + 1 for i in range(start_line - 1)) + start_column - 1
-    )
-    end_index = sum(len(lines[i]) + 1 for i in range(end_line - 1)) + end_column - 1
+    if line_offsets is None:
+        line_offsets = get_line_offsets(text)
+    start_index = line_offsets[max(start_line - 1, 0)] + start_column - 1
+    end_index = line_offsets[max(end_line - 1, 0)] + end_column - 1
     return text[:start_index], text[start_index:end_index], text[end_index:]
 
 
 def slice_text(
-    text: str, start_line: int, start_column: int, end_line: int, end_column: int
+    text: str,
+    start_line: int,
+    start_column: int,
+    end_line: int,
+    end_column: int,
+    line_offsets: Optional[Sequence[int]] = None,
 ) -> str:
     """
     Slice the text inside the specified portion of the text.
@@ -31,9 +52,10 @@ def slice_text(
     :param start_column: The column number of the start of the desired portion of the text (1-based index)
     :param end_line: The line number of the end of the desired portion of the text (1-based index)
     :param end_column: The column number of the end of the desired portion of the text (1-based index)
+    :param line_offsets: The line offsets of the text returned by get_line_offsets, computed if not provided
     """
     _before, sliced_text, _after = slice_text_around(
-        text, start_line, start_column, end_line, end_column
+        text, start_line, start_column, end_line, end_column, line_offsets
     )
     return sliced_text
 
@@ -1,10 +1,24 @@
 """This module contains common fixtures for the tests that can be shared across multiple test modules."""
 
 from pathlib import Path
+from typing import Dict
 
 import pytest
 
 
+def _write_files(root: Path, files: Dict[str, str]):
+    """Write the files given by their paths relative to root and their contents"""
+    for relative_path, content in files.items():
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+
+@pytest.fixture
+def write_files():
+    return _write_files
+
+
 @pytest.fixture
 def repo_suite_path():
     return Path(__file__).parent / "code_example"
@@ -1,7 +1,17 @@
+import shutil
+from collections import Counter
+from textwrap import dedent
+
+import jedi
 import pytest
 from pytest_unordered import unordered
 
-from dependency_graph.graph_generator.jedi_generator import JediDependencyGraphGenerator
+from dependency_graph.graph_generator import jedi_generator as jedi_generator_module
+from dependency_graph.graph_generator.jedi_generator import (
+    JediDependencyGraphGenerator,
+    _EdgeRecorder,
+    _NameResolver,
+)
 from dependency_graph.models.graph_data import EdgeRelation
 from dependency_graph.models.language import Language
 from dependency_graph.models.repository import Repository
@@ -308,3 +318,158 @@ def test_field_use_relation_relation(jedi_generator, python_repo_suite_path):
             ("class", "Car", "variable", "Manufacturer", "engine.py", 9),
         ]
     )
+
+
+def test_update(jedi_generator, python_repo_suite_path, tmp_path):
+    repo_path = tmp_path / "cross_file_context"
+    shutil.copytree(python_repo_suite_path / "cross_file_context", repo_path)
+    repository = Repository(repo_path=repo_path, language=Language.Python)
+    D = jedi_generator.generate(repository)
+
+    (repo_path / "c.py").write_text(
+        dedent(
+            """
+            def qux():
+                return 1
+
+
+            def baz():
+                print("baz", qux())
+            """
+        )
+    )
+    (repo_path / "d.py").write_text("from c import baz\n\nbaz()\n")
+    (repo_path / "usage.py").unlink()
+    jedi_generator.update(
+        repository,
+        [repo_path / "c.py", str(repo_path / "d.py"), repo_path / "usage.py"],
+        D,
+    )
+
+    expected = JediDependencyGraphGenerator().generate(
+        Repository(repo_path=repo_path, language=Language.Python)
+    )
+    assert Counter(map(str, D.get_edges())) == Counter(map(str, expected.get_edges()))
+    assert set(D.get_nodes()) == set(expected.get_nodes())
+
+
+@pytest.mark.parametrize("repo_name", ["cross_file_context", "class_hierarchy"])
+def test_parallel_generation(jedi_generator, python_repo_suite_path, repo_name):
+    repository = Repository(
+        repo_path=python_repo_suite_path / repo_name, language=Language.Python
+    )
+    D = jedi_generator.generate(repository)
+    parallel_generator = JediDependencyGraphGenerator(jobs=2)
+    parallel_D = parallel_generator.generate(repository)
+
+    assert parallel_D.get_edges() == D.get_edges()
+    assert parallel_D.get_nodes() == D.get_nodes()
+    # The workers report the Jedi calls of their files to the parent
+    assert parallel_generator._jedi_calls == jedi_generator._jedi_calls > 0
+    assert parallel_generator._name_lookups == jedi_generator._name_lookups
+
+
+def test_name_resolver(python_repo_suite_path):
+    file_path = python_repo_suite_path / "call_relation" / "main.py"
+    script = jedi.Script(path=file_path)
+    resolver = _NameResolver(script)
+    names = script.get_names(all_scopes=True, definitions=True, references=False)
+
+    for _ in range(2):
+        for name in names:
+            assert resolver.goto(name, follow_imports=True) == name.goto(
+                follow_imports=True
+            )
+            assert resolver.parent(name) == name.parent()
+    assert resolver.calls == 2 * len(names)
+    assert resolver.lookups == 4 * len(names)
+
+
+def test_reference_search_depth(tmp_path):
+    (tmp_path / "a.py").write_text("def helper():\n    return 1\n")
+    (tmp_path / "b.py").write_text("from a import helper\n\nhelper()\n")
+    (tmp_path / "c.py").write_text("from b import helper\n\nhelper()\n")
+    (tmp_path / "d.py").write_text("def helper():\n    return 2\n\nhelper()\n")
+    repository = Repository(repo_path=tmp_path, language=Language.Python)
+
+    def get_def_use_relations(generator):
+        D = generator.generate(repository)
+        return [
+            (
+                edge[0].location.file_path.name,
+                edge[1].location.file_path.name,
+                edge[1].location.start_line,
+            )
+            for edge in D.get_related_edges(EdgeRelation.Defines)
+        ]
+
+    in_file = [("d.py", "d.py", 4)]
+    in_importers = [("a.py", "b.py", 1), ("a.py", "b.py", 3)]
+    in_transitive_importers = [("a.py", "c.py", 1), ("a.py", "c.py", 3)]
+    assert get_def_use_relations(JediDependencyGraphGenerator()) == unordered(
+        in_file + in_importers + in_transitive_importers
+    )
+    assert get_def_use_relations(
+        JediDependencyGraphGenerator(reference_search_depth=0)
+    ) == unordered(in_file)
+    assert get_def_use_relations(
+        JediDependencyGraphGenerator(reference_search_depth=1)
+    ) == unordered(in_file + in_importers)
+    assert get_def_use_relations(
+        JediDependencyGraphGenerator(jobs=2, reference_search_depth=2)
+    ) == unordered(in_file + in_importers + in_transitive_importers)
+
+
+def test_node_cache(jedi_generator, python_repo_suite_path):
+    repository = Repository(
+        repo_path=python_repo_suite_path / "cross_file_context",
+        language=Language.Python,
+    )
+    project = jedi.Project(repository.repo_path)
+    recorder = _EdgeRecorder()
+    jedi_generator._reset_node_cache()
+    for file_path in repository.files:
+        jedi_generator._generate_file(
+            file_path.read_text(), file_path, recorder, project
+        )
+
+    # Every node is built once, so the equal endpoints of the edges are the same object
+    nodes = {}
+    for u, v, _, _ in recorder.edges:
+        assert nodes.setdefault(u, u) is u
+        assert nodes.setdefault(v, v) is v
+    assert len(nodes) == len(set(jedi_generator._nodes.values()))
+
+
+def test_bounded_memory_generation(
+    jedi_generator, python_repo_suite_path, monkeypatch, caplog
+):
+    repository = Repository(
+        repo_path=python_repo_suite_path / "cross_file_context",
+        language=Language.Python,
+    )
+    D = jedi_generator.generate(repository)
+
+    cleared = []
+    monkeypatch.setattr(
+        jedi_generator_module, "_clear_jedi_caches", lambda: cleared.append(True)
+    )
+    bounded_D = JediDependencyGraphGenerator(max_files_per_epoch=3).generate(repository)
+    assert bounded_D.get_edges() == D.get_edges()
+    # 4 files, the caches are dropped after the third one
+    assert len(cleared) == 1
+    assert "Epoch 2: 1 files" in caplog.text
+
+    # The worker processes are replaced after every 2 files
+    bounded_D = JediDependencyGraphGenerator(jobs=2, max_files_per_epoch=2).generate(
+        repository
+    )
+    assert bounded_D.get_edges() == D.get_edges()
+    assert "Epoch 2: 2 files" in caplog.text and "Epoch 3" not in caplog.text
+
+    # The memory budget is ignored once the RSS is over it right after the caches are dropped
+    monkeypatch.setattr(jedi_generator_module, "get_rss", lambda: 2**30)
+    bounded_D = JediDependencyGraphGenerator(memory_budget=2**20).generate(repository)
+    assert bounded_D.get_edges() == D.get_edges()
+    assert len(cleared) == 2
+    assert "the budget is ignored for the rest of the run" in caplog.text
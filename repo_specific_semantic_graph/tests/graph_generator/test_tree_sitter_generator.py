@@ -1,4 +1,7 @@
+import shutil
+from collections import Counter
 from textwrap import dedent
+from pathlib import Path
 
 import pytest
 from pytest_unordered import unordered
@@ -9,7 +12,22 @@ from dependency_graph import (
     Repository,
     EdgeRelation,
 )
+from dependency_graph.graph_generator.tree_sitter_generator.import_finder import (
+    ImportFinder,
+)
+from dependency_graph.graph_generator.tree_sitter_generator.module_registry import (
+    ModuleRegistry,
+)
+from dependency_graph.graph_generator.tree_sitter_generator.rust_crates import (
+    expand_use_tree,
+)
+from dependency_graph.graph_generator.tree_sitter_generator.swift_modules import (
+    SwiftModuleIndex,
+)
 from dependency_graph.models.virtual_fs.virtual_repository import VirtualRepository
+from dependency_graph.utils.file_index import FileIndex
+from dependency_graph.utils.read_file import read_file_to_string
+from dependency_graph.utils.run_in_subprocess import SubprocessPool
 
 
 @pytest.fixture
@@ -27,6 +45,31 @@ def test_tree_sitter_deadlock_will_not_block_and_do_not_raise_error(
     assert edges == []
 
 
+def test_import_finder_batch(java_repo_suite_path):
+    file_paths = sorted(Repository(java_repo_suite_path, Language.Java).files)
+    codes = [read_file_to_string(file_path) for file_path in file_paths]
+    with ImportFinder(Language.Java, max_workers=2) as finder:
+        assert finder.find_module_names(file_paths) == [
+            finder.find_module_name(file_path) for file_path in file_paths
+        ]
+        assert finder.find_imports_batch(codes) == [
+            finder.find_imports(code) for code in codes
+        ]
+
+
+@pytest.mark.parametrize("language", [Language.Java, Language.Python, Language.Swift])
+def test_extract_facts_batch(repo_suite_path, language):
+    repo_path = repo_suite_path / language.value
+    file_paths = sorted(Repository(repo_path, language).files)
+    codes = [read_file_to_string(file_path) for file_path in file_paths]
+    with ImportFinder(language) as finder:
+        batch_facts = finder.extract_facts_batch(file_paths, codes)
+        for file_path, code, facts in zip(file_paths, codes, batch_facts):
+            assert facts.error is None
+            assert facts.module_name == finder.find_module_name(file_path)
+            assert facts.imports == finder.find_imports(code)
+
+
 def test_the_same_relative_paths_are_represented_to_the_same_node_in_the_graph(
     tree_sitter_generator,
 ):
@@ -469,6 +512,34 @@ def test_c(tree_sitter_generator, c_repo_suite_path):
     ]
 
 
+def test_c_include_search_order(tree_sitter_generator, tmp_path, write_files):
+    files = {
+        "include/net/utils.h": "",
+        "src/net/utils.h": "",
+        "lib/core/net/utils.h": "",
+        "lib/core/main.c": '#include "net/utils.h"\n#include "config"\n',
+        "lib/core/config.h": "",
+        "lib/sibling/net/utils.h": "",
+        "other/deep/net/utils.h": "",
+    }
+    write_files(tmp_path, files)
+
+    repository = Repository(repo_path=tmp_path, language=Language.C)
+    D = tree_sitter_generator.generate(repository)
+    imported = [
+        str(edge[1].location.file_path.relative_to(tmp_path))
+        for edge in D.get_related_edges(EdgeRelation.Imports)
+    ]
+    # `other/deep` is neither searched nor a subdirectory of a parent of main.c
+    assert imported == [
+        "include/net/utils.h",
+        "lib/core/net/utils.h",
+        "src/net/utils.h",
+        "lib/sibling/net/utils.h",
+        "lib/core/config.h",
+    ]
+
+
 def test_cpp(tree_sitter_generator, cpp_repo_suite_path):
     repo_path = cpp_repo_suite_path
     repository = Repository(repo_path=repo_path, language=Language.CPP)
@@ -540,6 +611,56 @@ def test_go(tree_sitter_generator, go_repo_suite_path):
     ]
 
 
+def test_go_nested_modules(tree_sitter_generator, tmp_path, write_files):
+    files = {
+        "go.work": "go 1.21\n\nuse (\n    ./app\n    ./lib\n)\n",
+        "app/go.mod": dedent(
+            """
+            module example.com/app
+
+            replace (
+                example.com/legacy => ./third_party/legacy // vendored fork
+                example.com/old v1.0.0 => example.com/lib v1.2.0
+            )
+            """
+        ),
+        "app/main.go": dedent(
+            """
+            package main
+
+            import (
+                "example.com/app/internal"
+                "example.com/lib/util"
+                "example.com/legacy/sub"
+                "example.com/old"
+                "fmt"
+            )
+            """
+        ),
+        "app/internal/internal.go": "package internal\n",
+        "app/third_party/legacy/sub/sub.go": "package sub\n",
+        "lib/go.mod": "module example.com/lib\n",
+        "lib/lib.go": "package lib\n",
+        "lib/util/util.go": "package util\n",
+    }
+    write_files(tmp_path, files)
+
+    repository = Repository(repo_path=tmp_path, language=Language.Go)
+    D = tree_sitter_generator.generate(repository)
+    imported = [
+        (edge[2].get_text(), str(edge[1].location.file_path.relative_to(tmp_path)))
+        for edge in D.get_related_edges(EdgeRelation.Imports)
+    ]
+    assert imported == unordered(
+        [
+            ('"example.com/app/internal"', "app/internal/internal.go"),
+            ('"example.com/lib/util"', "lib/util/util.go"),
+            ('"example.com/legacy/sub"', "app/third_party/legacy/sub/sub.go"),
+            ('"example.com/old"', "lib/lib.go"),
+        ]
+    )
+
+
 def test_swift(tree_sitter_generator, swift_repo_suite_path):
     repo_path = swift_repo_suite_path
     repository = Repository(repo_path=repo_path, language=Language.Swift)
@@ -568,6 +689,65 @@ def test_swift(tree_sitter_generator, swift_repo_suite_path):
     )
 
 
+def test_swift_targets(tree_sitter_generator, tmp_path, write_files):
+    files = {
+        "App/Package.swift": dedent(
+            """
+            let package = Package(
+                name: "App",
+                targets: [
+                    .target(name: "Core", dependencies: [.product(name: "X", package: "x")], path: "Code/Core"),
+                    .executableTarget(name: "App", dependencies: ["Core", "Shared"]),
+                ]
+            )
+            """
+        ),
+        "App/Code/Core/Core.swift": "public struct Core {}\n",
+        "App/Code/Core/Models/Model.swift": "public struct Model {}\n",
+        "App/Sources/App/main.swift": "import Core\nimport Shared\n",
+        "App/Sources/Shared/Shared.swift": "public struct Shared {}\n",
+        "Library/Sources/Shared/Shared.swift": "public struct Shared {}\n",
+        "Library/Sources/Lib/Lib.swift": "import Shared\nimport struct Core.Model\n",
+    }
+    write_files(tmp_path, files)
+
+    repository = Repository(repo_path=tmp_path, language=Language.Swift)
+    D = tree_sitter_generator.generate(repository)
+    imported = [
+        (
+            str(edge[0].location.file_path.relative_to(tmp_path)),
+            str(edge[1].location.file_path.relative_to(tmp_path)),
+        )
+        for edge in D.get_related_edges(EdgeRelation.Imports)
+    ]
+    # The target of the same package is preferred if several targets have the same name
+    assert imported == unordered(
+        [
+            ("App/Sources/App/main.swift", "App/Code/Core/Core.swift"),
+            ("App/Sources/App/main.swift", "App/Code/Core/Models/Model.swift"),
+            ("App/Sources/App/main.swift", "App/Sources/Shared/Shared.swift"),
+            ("Library/Sources/Lib/Lib.swift", "Library/Sources/Shared/Shared.swift"),
+            ("Library/Sources/Lib/Lib.swift", "App/Code/Core/Core.swift"),
+            ("Library/Sources/Lib/Lib.swift", "App/Code/Core/Models/Model.swift"),
+        ]
+    )
+
+
+def test_swift_targets_are_in_the_repository(tmp_path, write_files):
+    # The `Sources` directory above the repository is not a directory of targets
+    repo_path = tmp_path / "Sources" / "proj"
+    write_files(
+        repo_path,
+        {
+            "App/main.swift": "import Lib\n",
+            "Sources/Lib/Lib.swift": "public struct Lib {}\n",
+        },
+    )
+
+    module_index = SwiftModuleIndex(FileIndex(repo_path))
+    assert module_index.targets == {"Lib": [repo_path / "Sources" / "Lib"]}
+
+
 def test_rust(tree_sitter_generator, rust_repo_suite_path):
     repo_path = rust_repo_suite_path
     repository = Repository(repo_path=repo_path, language=Language.Rust)
@@ -634,6 +814,69 @@ def test_rust(tree_sitter_generator, rust_repo_suite_path):
     )
 
 
+def test_rust_expand_use_tree():
+    assert expand_use_tree(
+        "super::{sub_module::sub_function as sub, bar::{self, *},\n  r#baz}"
+    ) == [
+        ["super", "sub_module", "sub_function"],
+        ["super", "bar", "self"],
+        ["super", "bar", "*"],
+        ["super", "baz"],
+    ]
+    assert expand_use_tree("crate::foo::*") == [["crate", "foo", "*"]]
+
+
+def test_rust_workspace(tree_sitter_generator, tmp_path, write_files):
+    files = {
+        "Cargo.toml": '[workspace]\nmembers = ["app", "my-lib"]\n',
+        "app/Cargo.toml": '[package]\nname = "app"\n',
+        "app/src/main.rs": dedent(
+            """
+            mod net;
+            #[path = "generated/config.rs"]
+            mod config;
+            mod tests {
+                mod inner;
+            }
+
+            use my_lib::parse::{self, helpers::trim};
+            use crate::net::http::get;
+            use config::Settings;
+            use std::collections::HashMap;
+            """
+        ),
+        "app/src/net/mod.rs": "pub mod http;\nuse super::config::Settings;\n",
+        "app/src/net/http.rs": "pub fn get() {}\n",
+        "app/src/generated/config.rs": "pub struct Settings;\n",
+        "app/src/tests/inner.rs": "use crate::net::http;\n",
+        "my-lib/Cargo.toml": '[package]\nname = "my-lib"\n',
+        "my-lib/src/lib.rs": "pub mod parse;\n",
+        "my-lib/src/parse/mod.rs": "pub mod helpers;\n",
+        "my-lib/src/parse/helpers.rs": "pub fn trim() {}\n",
+    }
+    write_files(tmp_path, files)
+
+    repository = Repository(repo_path=tmp_path, language=Language.Rust)
+    D = tree_sitter_generator.generate(repository)
+    imported = [
+        (
+            str(edge[0].location.file_path.relative_to(tmp_path)),
+            str(edge[1].location.file_path.relative_to(tmp_path)),
+        )
+        for edge in D.get_related_edges(EdgeRelation.Imports)
+    ]
+    assert imported == unordered(
+        [
+            ("app/src/main.rs", "my-lib/src/parse/mod.rs"),
+            ("app/src/main.rs", "my-lib/src/parse/helpers.rs"),
+            ("app/src/main.rs", "app/src/net/http.rs"),
+            ("app/src/main.rs", "app/src/generated/config.rs"),
+            ("app/src/net/mod.rs", "app/src/generated/config.rs"),
+            ("app/src/tests/inner.rs", "app/src/net/http.rs"),
+        ]
+    )
+
+
 def test_lua(tree_sitter_generator, lua_repo_suite_path):
     repo_path = lua_repo_suite_path
     repository = Repository(repo_path=repo_path, language=Language.Lua)
@@ -806,3 +1049,215 @@ def test_r(tree_sitter_generator, r_repo_suite_path):
             (4, 8, 4, 27),
         )
     ]
+
+
+def test_polyglot(tree_sitter_generator, tmp_path, write_files):
+    files = {
+        "src/app.ts": 'import { util } from "./util";\nimport helper from "helper";\n',
+        "src/helper.js": 'const model = require("./model");\n',
+        "src/model.ts": "export class Model {}\n",
+        "src/util.js": "export function util() {}\n",
+        "scripts/build.py": "import os\n",
+    }
+    write_files(tmp_path, files)
+
+    repository = Repository(
+        repo_path=tmp_path, language=(Language.TypeScript, Language.JavaScript)
+    )
+    D = tree_sitter_generator.generate(repository)
+    assert sorted(D.languages) == [Language.JavaScript, Language.TypeScript]
+
+    def get_imported():
+        return [
+            (
+                str(edge[0].location.file_path.relative_to(tmp_path)),
+                edge[1].name,
+                str(edge[1].location.file_path.relative_to(tmp_path)),
+            )
+            for edge in D.get_related_edges(EdgeRelation.Imports)
+        ]
+
+    # The bare module names resolve across TypeScript and JavaScript within the same run
+    assert get_imported() == unordered(
+        [
+            ("src/app.ts", "util", "src/util.js"),
+            ("src/app.ts", "helper", "src/helper.js"),
+            ("src/helper.js", "model", "src/model.ts"),
+        ]
+    )
+
+    (tmp_path / "src" / "view.js").write_text('import { Model } from "model";\n')
+    tree_sitter_generator.update(repository, [tmp_path / "src" / "view.js"], D)
+    assert ("src/view.js", "model", "src/model.ts") in get_imported()
+
+
+def test_generate_file(tree_sitter_generator, python_repo_suite_path):
+    repo_path = python_repo_suite_path / "cyclic_import"
+    repository = Repository(repo_path=repo_path, language=Language.Python)
+    D = tree_sitter_generator.generate_file(repository, file_path=repo_path / "d.py")
+    edges = D.get_related_edges(EdgeRelation.Imports)
+    assert [(edge[0].name, edge[1].name) for edge in edges] == [("d", "a")]
+
+    D = tree_sitter_generator.generate_file(
+        repository, code="import e\nimport x\n", file_path=repo_path / "d.py"
+    )
+    edges = D.get_related_edges(EdgeRelation.Imports)
+    assert [(edge[0].name, edge[1].name) for edge in edges] == [
+        ("d", "e"),
+        ("d", "x"),
+    ]
+
+    with pytest.raises(ValueError, match="file_path is required"):
+        tree_sitter_generator.generate_file(repository, code="import e\n")
+
+
+def test_update(tree_sitter_generator, python_repo_suite_path, tmp_path):
+    repo_path = tmp_path / "cyclic_import"
+    shutil.copytree(python_repo_suite_path / "cyclic_import", repo_path)
+    repository = Repository(repo_path=repo_path, language=Language.Python)
+    D = tree_sitter_generator.generate(repository)
+
+    (repo_path / "d.py").write_text(
+        "from e import func_e\n\n\ndef func_d():\n    pass\n"
+    )
+    (repo_path / "w.py").write_text("import x\n")
+    (repo_path / "z.py").unlink()
+    tree_sitter_generator.update(
+        repository,
+        [repo_path / "d.py", repo_path / "w.py", repo_path / "z.py"],
+        D,
+    )
+
+    expected = TreeSitterDependencyGraphGenerator().generate(
+        Repository(repo_path=repo_path, language=Language.Python)
+    )
+    assert Counter(map(str, D.get_edges())) == Counter(map(str, expected.get_edges()))
+    assert set(D.get_nodes()) == set(expected.get_nodes())
+
+
+def test_update_resolves_imports_of_added_file(tree_sitter_generator, tmp_path):
+    (tmp_path / "a.py").write_text("import b\n")
+    repository = Repository(repo_path=tmp_path, language=Language.Python)
+    D = tree_sitter_generator.generate(repository)
+    assert not D.get_related_edges(EdgeRelation.Imports)
+
+    (tmp_path / "b.py").write_text("X = 1\n")
+    tree_sitter_generator.update(repository, [tmp_path / "b.py"], D)
+
+    edges = D.get_related_edges(EdgeRelation.Imports)
+    assert [(edge[0].name, edge[1].name) for edge in edges] == [("a", "b")]
+    expected = TreeSitterDependencyGraphGenerator().generate(
+        Repository(repo_path=tmp_path, language=Language.Python)
+    )
+    assert Counter(map(str, D.get_edges())) == Counter(map(str, expected.get_edges()))
+
+
+def test_update_does_not_reanalyze_library_importers(
+    tree_sitter_generator, tmp_path, monkeypatch
+):
+    for i in range(20):
+        (tmp_path / f"m{i}.py").write_text(
+            "import os\nimport b\n" if i == 0 else "import os\n"
+        )
+    repository = Repository(repo_path=tmp_path, language=Language.Python)
+    D = tree_sitter_generator.generate(repository)
+
+    generated_files = []
+    generate_file = TreeSitterDependencyGraphGenerator.generate_file
+
+    def generate_and_record(self, repo, code=None, file_path=None):
+        generated_files.append(file_path)
+        return generate_file(self, repo, code, file_path)
+
+    monkeypatch.setattr(
+        TreeSitterDependencyGraphGenerator, "generate_file", generate_and_record
+    )
+    (tmp_path / "new.py").write_text("X = 1\n")
+    tree_sitter_generator.update(repository, [tmp_path / "new.py"], D)
+    assert generated_files == [tmp_path / "new.py"]
+
+    # Only the importer of the added module is re-analyzed
+    generated_files.clear()
+    (tmp_path / "b.py").write_text("X = 1\n")
+    tree_sitter_generator.update(repository, [tmp_path / "b.py"], D)
+    assert generated_files == [tmp_path / "b.py", tmp_path / "m0.py"]
+    edges = D.get_related_edges(EdgeRelation.Imports)
+    assert [(edge[0].name, edge[1].name) for edge in edges] == [("m0", "b")]
+
+
+def test_update_shares_parse_workers(python_repo_suite_path, tmp_path, monkeypatch):
+    repo_path = tmp_path / "cyclic_import"
+    shutil.copytree(python_repo_suite_path / "cyclic_import", repo_path)
+    repository = Repository(repo_path=repo_path, language=Language.Python)
+    generator = TreeSitterDependencyGraphGenerator(max_workers=1)
+    D = generator.generate(repository)
+
+    spawned = []
+    spawn = SubprocessPool._spawn
+
+    def spawn_and_record(self):
+        spawned.append(self)
+        return spawn(self)
+
+    monkeypatch.setattr(SubprocessPool, "_spawn", spawn_and_record)
+    changed_files = sorted(repository.files)[:3]
+    for file_path in changed_files:
+        file_path.write_text(file_path.read_text() + "\nimport os\n")
+    generator.update(repository, changed_files, D)
+
+    assert len(spawned) == 1
+    with generator:
+        generator.generate_file(repository, file_path=changed_files[0])
+        generator.generate_file(repository, file_path=changed_files[1])
+    assert len(spawned) == 2
+
+
+def test_files_are_read_once(tree_sitter_generator, java_repo_suite_path, monkeypatch):
+    read_files = []
+    read = TreeSitterDependencyGraphGenerator.read_file_to_string_with_limited_line
+
+    def read_and_record(self, file_path):
+        read_files.append(file_path)
+        return read(self, file_path)
+
+    monkeypatch.setattr(
+        TreeSitterDependencyGraphGenerator,
+        "read_file_to_string_with_limited_line",
+        read_and_record,
+    )
+    repository = Repository(repo_path=java_repo_suite_path, language=Language.Java)
+    D = tree_sitter_generator.generate(repository)
+
+    assert D.get_related_edges(EdgeRelation.Imports)
+    assert sorted(read_files) == sorted(repository.files)
+
+
+def test_module_registry():
+    registry = ModuleRegistry()
+    registry.add("com.example.Foo", Path("Foo.java"))
+    registry.add("com.example.Bar", Path("Bar.java"))
+    registry.add("com.example.sub.Baz", Path("Baz.java"))
+    registry.add("Ns", Path("a.cs"))
+    registry.add("Ns", Path("b.cs"))
+
+    assert registry.get("Ns") == [Path("a.cs"), Path("b.cs")]
+    assert registry.get("missing", []) == []
+    assert registry.get_module_name(Path("Baz.java")) == "com.example.sub.Baz"
+    assert registry.get_package_modules("com.example") == [
+        "com.example.Foo",
+        "com.example.Bar",
+    ]
+    assert registry.get_package_paths("com.example") == [
+        Path("Foo.java"),
+        Path("Bar.java"),
+    ]
+    assert registry.get_package_paths("") == [Path("a.cs"), Path("b.cs")]
+
+    # A file added again with another module name is moved
+    registry.add("com.example.sub.Foo", Path("Foo.java"))
+    assert registry.get_package_modules("com.example") == ["com.example.Bar"]
+    registry.remove(Path("Bar.java"))
+    assert registry.get_package_paths("com.example") == []
+    assert "com.example.Bar" not in registry
+    assert registry.get_module_name(Path("Bar.java")) is None
+    assert len(registry) == 3
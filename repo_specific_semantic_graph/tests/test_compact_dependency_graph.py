@@ -0,0 +1,277 @@
+import pickle
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from pytest_unordered import unordered
+
+from dependency_graph import (
+    construct_dependency_graph,
+    CompactDependencyGraph,
+    DependencyGraph,
+    GraphGeneratorType,
+)
+from dependency_graph.models.graph_data import (
+    Node,
+    Location,
+    EdgeRelation,
+    NodeType,
+    Edge,
+)
+from dependency_graph.models.language import Language
+
+
+def _edge_counter(edges):
+    return Counter((str(u), str(v), str(e)) for u, v, e in edges)
+
+
+@pytest.fixture(scope="module")
+def sample_graph():
+    return construct_dependency_graph(
+        Path(__file__).parent / "code_example" / "python",
+        GraphGeneratorType.JEDI,
+        Language.Python,
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_compact_graph(sample_graph):
+    return CompactDependencyGraph.from_dict(sample_graph.to_dict())
+
+
+def test_get_edges(sample_graph, sample_compact_graph):
+    assert _edge_counter(sample_compact_graph.get_edges()) == _edge_counter(
+        sample_graph.get_edges()
+    )
+
+
+def test_get_related_edges(sample_graph, sample_compact_graph):
+    for relation in EdgeRelation:
+        compact_edges = sample_compact_graph.get_related_edges(relation)
+        edges = sample_graph.get_related_edges(relation)
+        assert _edge_counter(compact_edges) == _edge_counter(edges)
+        # Both are sorted by the edge's location
+        assert [str(e[2].location) for e in compact_edges] == [
+            str(e[2].location) for e in edges
+        ]
+
+
+def test_get_related_edges_by_node(sample_graph, sample_compact_graph):
+    for node in sample_graph.get_nodes():
+        assert _edge_counter(
+            sample_compact_graph.get_related_edges_by_node(node, *EdgeRelation)
+        ) == _edge_counter(sample_graph.get_related_edges_by_node(node, *EdgeRelation))
+
+
+def test_get_related_edges_by_node_not_in_graph(sample_compact_graph):
+    node = Node(
+        type=NodeType.MODULE, name="not_exist", location=Location(file_path=None)
+    )
+    assert sample_compact_graph.get_related_edges_by_node(node) is None
+
+
+def test_query_edges_and_nodes(sample_graph, sample_compact_graph):
+    file_paths = {
+        node.location.file_path
+        for node in sample_graph.get_nodes()
+        if node.location and node.location.file_path
+    }
+    for file_path in file_paths:
+        for kwargs in (
+            dict(source_files=[file_path]),
+            dict(target_files=[file_path], relations=[EdgeRelation.ImportedBy]),
+            dict(source_files=[file_path], target_types=[NodeType.FUNCTION]),
+        ):
+            assert _edge_counter(
+                sample_compact_graph.query_edges(**kwargs)
+            ) == _edge_counter(sample_graph.query_edges(**kwargs))
+        assert sample_compact_graph.query_nodes(
+            node_types=[NodeType.CLASS], file_paths=[file_path]
+        ) == unordered(
+            sample_graph.query_nodes(
+                node_types=[NodeType.CLASS], file_paths=[file_path]
+            )
+        )
+
+
+def test_query_edges_and_nodes_order(sample_graph):
+    compact_graph = CompactDependencyGraph.from_dict(sample_graph.to_dict())
+    file_paths = sorted(
+        {
+            node.location.file_path
+            for node in sample_graph.get_nodes()
+            if node.location and node.location.file_path
+        }
+    )
+
+    def _in(node, paths):
+        return node.location is not None and node.location.file_path in paths
+
+    # The indexes are built by the first queries and kept up to date by the next additions
+    for _ in range(2):
+        for paths in ([file_paths[0]], file_paths[1:3]):
+            # get_edges is grouped by relation and in insertion order, like query_edges
+            assert compact_graph.query_edges(
+                source_files=paths
+            ) == compact_graph.get_edges(lambda u, v, e: _in(u, paths))
+            assert compact_graph.query_edges(
+                target_files=paths, source_types=[NodeType.MODULE]
+            ) == compact_graph.get_edges(
+                lambda u, v, e: _in(v, paths) and u.type == NodeType.MODULE
+            )
+            assert compact_graph.query_nodes(
+                file_paths=paths
+            ) == compact_graph.get_nodes(lambda node: _in(node, paths))
+
+        module = Node(
+            type=NodeType.MODULE,
+            name="added",
+            location=Location(file_path=file_paths[1], start_line=1),
+        )
+        target = compact_graph.query_nodes(file_paths=[file_paths[0]])[0]
+        compact_graph.add_relational_edge(
+            module, target, Edge(relation=EdgeRelation.Imports)
+        )
+
+
+def test_remove_file(sample_graph):
+    file_path = next(
+        node.location.file_path
+        for node in sample_graph.get_nodes()
+        if node.location and node.location.file_path
+    )
+    graph = DependencyGraph.from_dict(sample_graph.to_dict())
+    compact_graph = CompactDependencyGraph.from_dict(sample_graph.to_dict())
+    graph.remove_file(file_path)
+    compact_graph.remove_file(file_path)
+
+    assert _edge_counter(compact_graph.get_edges()) == _edge_counter(graph.get_edges())
+    assert compact_graph.get_nodes() == unordered(graph.get_nodes())
+
+
+def test_get_topological_sorting(sample_graph, sample_compact_graph):
+    assert list(sample_compact_graph.get_topological_sorting()) == list(
+        sample_graph.get_topological_sorting()
+    )
+    for relation in EdgeRelation:
+        assert list(sample_compact_graph.get_topological_sorting(relation)) == list(
+            sample_graph.get_topological_sorting(relation)
+        )
+
+
+def test_serialization_and_deserialization(sample_compact_graph):
+    graph = CompactDependencyGraph.from_json(sample_compact_graph.to_json())
+    assert isinstance(graph, CompactDependencyGraph)
+    assert _edge_counter(graph.get_edges()) == _edge_counter(
+        sample_compact_graph.get_edges()
+    )
+    assert graph.repo_path == sample_compact_graph.repo_path
+    assert graph.languages == sample_compact_graph.languages
+
+
+def test_graph_is_materialized_as_networkx(sample_graph, sample_compact_graph):
+    G = sample_compact_graph.graph
+    assert set(G.nodes) == set(sample_graph.graph.nodes)
+    assert G.number_of_edges() == sample_graph.graph.number_of_edges()
+
+
+def test_keep_none_attributes_and_parallel_edges():
+    graph = CompactDependencyGraph("/repo", Language.Python)
+    n1 = Node(type=NodeType.MODULE, name=None, location=Location(file_path=None))
+    n2 = Node(
+        type=NodeType.FUNCTION,
+        name="foo",
+        location=Location(file_path="/repo/a.py", start_line=1, end_line=2),
+    )
+    graph.add_relational_edge(n1, n2, Edge(EdgeRelation.ParentOf))
+    graph.add_relational_edge(n1, n2, Edge(EdgeRelation.ParentOf))
+
+    assert graph.get_nodes() == [n1, n2]
+    assert graph.get_edge(n1, n2) == [
+        Edge(EdgeRelation.ParentOf),
+        Edge(EdgeRelation.ParentOf),
+    ]
+    assert graph.get_edge(n2, n1) is None
+    assert graph.get_nodes()[1].location.start_column is None
+
+
+@pytest.fixture(scope="module")
+def binary_graph_path(sample_graph, tmp_path_factory):
+    file_path = tmp_path_factory.mktemp("binary") / "graph.bin"
+    sample_graph.to_binary(file_path)
+    return file_path
+
+
+def test_binary_round_trip(sample_graph, binary_graph_path):
+    graph = CompactDependencyGraph.from_binary(binary_graph_path)
+    assert graph.repo_path == sample_graph.repo_path
+    assert graph.languages == sample_graph.languages
+    assert _edge_counter(graph.get_edges()) == _edge_counter(sample_graph.get_edges())
+    assert graph.get_nodes() == unordered(sample_graph.get_nodes())
+    for node in sample_graph.get_nodes():
+        assert _edge_counter(
+            graph.get_related_edges_by_node(node, *EdgeRelation)
+        ) == _edge_counter(sample_graph.get_related_edges_by_node(node, *EdgeRelation))
+        assert graph.in_degree(node) == sample_graph.in_degree(node)
+    assert list(graph.get_topological_sorting()) == list(
+        sample_graph.get_topological_sorting()
+    )
+
+    graph = DependencyGraph.from_binary(binary_graph_path)
+    assert type(graph) is DependencyGraph
+    assert _edge_counter(graph.get_edges()) == _edge_counter(sample_graph.get_edges())
+
+
+def test_binary_graph_is_saved_again(sample_graph, binary_graph_path, tmp_path):
+    file_path = tmp_path / "saved_again.bin"
+    CompactDependencyGraph.from_binary(binary_graph_path).to_binary(file_path)
+
+    # A graph can also be saved to the file it is read from
+    CompactDependencyGraph.from_binary(file_path).to_binary(file_path)
+
+    graph = CompactDependencyGraph.from_binary(file_path)
+    assert _edge_counter(graph.get_edges()) == _edge_counter(sample_graph.get_edges())
+    assert graph.get_nodes() == unordered(sample_graph.get_nodes())
+
+
+def test_binary_graph_is_decoded_lazily(binary_graph_path):
+    graph = CompactDependencyGraph.from_binary(binary_graph_path)
+    assert graph.get_related_edges(EdgeRelation.Calls)
+    assert not graph._paths._loaded
+    assert graph._node_id_map is None
+
+
+def test_binary_graph_can_be_modified_and_pickled(sample_graph, binary_graph_path):
+    graph = pickle.loads(
+        pickle.dumps(CompactDependencyGraph.from_binary(binary_graph_path))
+    )
+    assert _edge_counter(graph.get_edges()) == _edge_counter(sample_graph.get_edges())
+
+    n1 = Node(type=NodeType.MODULE, name="new", location=Location(file_path=None))
+    n2 = sample_graph.get_nodes()[0]
+    graph.add_relational_edge(n1, n2, Edge(EdgeRelation.Imports))
+    assert graph.get_edge(n1, n2) == [Edge(EdgeRelation.Imports)]
+    assert len(graph.get_edges()) == len(sample_graph.get_edges()) + 1
+
+    graph = pickle.loads(pickle.dumps(graph))
+    assert graph.get_edge(n1, n2) == [Edge(EdgeRelation.Imports)]
+
+
+def test_binary_graph_retriever(
+    sample_graph, binary_graph_path, python_repo_suite_path
+):
+    graph = CompactDependencyGraph.from_binary(binary_graph_path)
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    for line in (18, 30, 40):
+        assert graph.as_retriever().get_cross_file_definition_by_line(
+            file_path, line
+        ) == sample_graph.as_retriever().get_cross_file_definition_by_line(
+            file_path, line
+        )
+
+
+def test_not_a_binary_graph(tmp_path):
+    file_path = tmp_path / "graph.json"
+    file_path.write_text("{}")
+    with pytest.raises(ValueError, match="not a binary dependency graph"):
+        CompactDependencyGraph.from_binary(file_path)
@@ -1,3 +1,7 @@
+import gzip
+import io
+from pathlib import Path
+
 import networkx as nx
 import pytest
 from fs.memoryfs import MemoryFS
@@ -14,6 +18,7 @@ from dependency_graph.models.graph_data import (
     Location,
     EdgeRelation,
     NodeType,
+    Edge,
 )
 from dependency_graph.models.language import Language
 
@@ -65,6 +70,141 @@ def test_get_related_edges_by_node(sample_graph, python_repo_suite_path):
     assert isinstance(edge_list[0][0], Node)
 
 
+def test_query_edges(sample_graph, python_repo_suite_path):
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    other_file_path = python_repo_suite_path / "cross_file_context" / "b.py"
+    relations = (EdgeRelation.Calls, EdgeRelation.Instantiates)
+
+    def _file_path(node):
+        return node.location.file_path if node.location else None
+
+    assert sample_graph.query_edges() == unordered(sample_graph.get_edges())
+    assert sample_graph.query_edges(relations=relations) == unordered(
+        sample_graph.get_edges(lambda u, v, e: e.relation in relations)
+    )
+    edges = sample_graph.query_edges(relations=relations, source_files=[str(file_path)])
+    assert len(edges) > 0
+    assert edges == unordered(
+        sample_graph.get_edges(
+            lambda u, v, e: e.relation in relations and _file_path(u) == file_path
+        )
+    )
+    assert sample_graph.query_edges(
+        target_files=[file_path, other_file_path], source_types=[NodeType.MODULE]
+    ) == unordered(
+        sample_graph.get_edges(
+            lambda u, v, e: _file_path(v) in (file_path, other_file_path)
+            and u.type == NodeType.MODULE
+        )
+    )
+    assert sample_graph.query_edges(relations=[]) == []
+    assert sample_graph.query_edges(source_files=["/not/exist.py"]) == []
+
+
+def test_query_nodes(sample_graph, python_repo_suite_path):
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    nodes = sample_graph.query_nodes(
+        node_types=[NodeType.FUNCTION, NodeType.CLASS], file_paths=[file_path]
+    )
+    assert len(nodes) > 0
+    assert nodes == unordered(
+        sample_graph.get_nodes(
+            lambda n: n.type in (NodeType.FUNCTION, NodeType.CLASS)
+            and n.location.file_path == file_path
+        )
+    )
+    assert sample_graph.query_nodes() == unordered(sample_graph.get_nodes())
+
+
+def _is_edge_in_file(u, v, edge, file_path):
+    return any(
+        location and location.file_path == file_path
+        for location in (u.location, v.location, edge.location)
+    )
+
+
+def test_remove_file(sample_graph, python_repo_suite_path):
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    edges = sample_graph.get_edges()
+    assert any(_is_edge_in_file(*edge, file_path) for edge in edges)
+    sample_graph.remove_file(file_path)
+
+    assert sample_graph.get_edges() == unordered(
+        [edge for edge in edges if not _is_edge_in_file(*edge, file_path)]
+    )
+    assert not any(
+        node.location and node.location.file_path == file_path
+        for node in sample_graph.get_nodes()
+    )
+    assert sample_graph.query_edges() == unordered(sample_graph.get_edges())
+    assert sample_graph.query_nodes() == unordered(sample_graph.get_nodes())
+    assert sample_graph.query_edges(source_files=[file_path]) == []
+    assert sample_graph.query_nodes(file_paths=[file_path]) == []
+
+
+def _make_module(name):
+    return Node(
+        type=NodeType.MODULE,
+        name=name,
+        location=Location(file_path=Path(f"/repo/{name}.py"), start_line=1),
+    )
+
+
+def test_reindexing_keeps_insertion_order():
+    a, b, c, d = map(_make_module, "abcd")
+    # The adjacency order of networkx, (a, b), (a, c), (c, a), differs from the insertion order
+    edges = [
+        (a, b, Edge(relation=EdgeRelation.Imports)),
+        (c, a, Edge(relation=EdgeRelation.Imports)),
+        (a, c, Edge(relation=EdgeRelation.Calls)),
+    ]
+    graph = DependencyGraph("/repo", Language.Python)
+    graph.add_relational_edges_from(edges)
+    graph.add_relational_edges_from(
+        (d, _make_module(f"x{i}"), Edge(relation=EdgeRelation.Calls)) for i in range(10)
+    )
+    # Removing most of the graph rebuilds the indexes
+    graph.remove_file("/repo/d.py")
+    assert len(graph._index.edges) == len(edges)
+    assert graph.query_edges() == edges
+    assert graph.query_nodes() == [a, b, c]
+
+    other_graph = DependencyGraph("/repo", Language.Python)
+    other_edges = [
+        (d, a, Edge(relation=EdgeRelation.Imports)),
+        (a, d, Edge(relation=EdgeRelation.Calls)),
+    ]
+    other_graph.add_relational_edges_from(other_edges)
+    graph.compose_all(other_graph)
+    assert graph.query_edges() == edges + other_edges
+    assert graph.query_nodes() == [a, b, c, d]
+
+
+def test_replace_file(sample_graph, python_repo_suite_path):
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    edges = sample_graph.get_edges()
+    subgraph = DependencyGraph(sample_graph.repo_path, *sample_graph.languages)
+    subgraph.add_relational_edges_from(
+        edge
+        for edge in edges
+        if edge[2].location and edge[2].location.file_path == file_path
+    )
+
+    sample_graph.replace_file(file_path, subgraph)
+    assert sample_graph.get_edges() == unordered(
+        [edge for edge in edges if not _is_edge_in_file(*edge, file_path)]
+        + subgraph.get_edges()
+    )
+
+
+def test_get_dependent_files(sample_graph, python_repo_suite_path):
+    repo_path = python_repo_suite_path / "cross_file_context"
+    dependent_files = sample_graph.get_dependent_files([repo_path / "c.py"])
+    assert {f for f in dependent_files if f.is_relative_to(repo_path)} == {
+        repo_path / "main.py"
+    }
+
+
 def test_get_related_subgraph(sample_graph):
     subgraph = sample_graph.get_related_subgraph(EdgeRelation.Calls)
     assert isinstance(subgraph, DependencyGraph)
@@ -80,6 +220,26 @@ def test_serialization_and_deserialization(sample_graph):
     assert sample_graph.languages == graph.languages
 
 
+@pytest.mark.parametrize("file_name", ["graph.ndjson", "graph.ndjson.gz"])
+def test_ndjson_serialization_and_deserialization(sample_graph, tmp_path, file_name):
+    file_path = tmp_path / file_name
+    sample_graph.to_ndjson(file_path)
+    if file_name.endswith(".gz"):
+        with gzip.open(file_path, "rt") as f:
+            assert len(f.readlines()) == len(sample_graph.get_edges()) + 1
+
+    graph = DependencyGraph.from_ndjson(file_path)
+    assert nx.utils.graphs_equal(sample_graph.graph, graph.graph)
+    assert sample_graph.repo_path == graph.repo_path
+    assert sample_graph.languages == graph.languages
+
+    buffer = io.StringIO()
+    sample_graph.to_ndjson(buffer)
+    buffer.seek(0)
+    graph = DependencyGraph.from_ndjson(buffer)
+    assert nx.utils.graphs_equal(sample_graph.graph, graph.graph)
+
+
 def test_get_topological_sorting(sample_graph):
     sorted_nodes = list(sample_graph.get_topological_sorting())
     assert len(sorted_nodes) == sample_graph.graph.number_of_nodes()
@@ -135,6 +295,8 @@ def test_merge_graph(sample_graph: DependencyGraph, sample_java_graph: Dependenc
     assert sample_graph.languages == unordered((Language.Python, Language.Java))
     assert sample_graph.graph.number_of_nodes() == all_nodes
     assert sample_graph.graph.number_of_edges() == all_edages
+    assert len(sample_graph.query_edges()) == all_edages
+    assert len(sample_graph.query_nodes()) == all_nodes
 
 
 def test_merge_graph_with_same_node():
@@ -0,0 +1,55 @@
+import pickle
+from pathlib import Path
+
+from dependency_graph.models.graph_data import (
+    Edge,
+    EdgeRelation,
+    Interner,
+    Location,
+    Node,
+    NodeType,
+)
+
+
+def _node(name="foo", start_line=1) -> Node:
+    return Node(
+        type=NodeType.FUNCTION,
+        name=name,
+        location=Location(Path("/repo/a.py"), start_line, 1, start_line + 1, 1),
+    )
+
+
+def test_hash_and_equality():
+    node = _node()
+    assert hash(node) == hash(str(node))
+    assert node == _node()
+    assert node != _node(start_line=2)
+    assert node in {_node(): 1}
+    assert Edge(EdgeRelation.Calls, node.location) == Edge(
+        EdgeRelation.Calls, _node().location
+    )
+
+
+def test_cached_hash_is_not_pickled():
+    node = _node()
+    hash(node)
+    assert "_hash" not in pickle.loads(pickle.dumps(node)).__dict__
+    assert pickle.loads(pickle.dumps(node)) == node
+    assert "_hash" not in node.to_dict()
+
+
+def test_interner():
+    intern = Interner()
+    node = intern(_node())
+    assert intern(_node()) is node
+    assert intern(_node(start_line=2)) is not node
+
+    edge = intern(Edge(EdgeRelation.Calls, _node().location))
+    assert edge.location is node.location
+    assert intern(Edge(EdgeRelation.Calls, _node().location)) is edge
+    assert intern(Edge(EdgeRelation.CalledBy, _node().location)) is not edge
+    assert intern(None) is None
+    assert len(intern) == 6
+
+    intern.clear()
+    assert intern(_node()) is not node
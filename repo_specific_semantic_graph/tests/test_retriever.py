@@ -7,6 +7,7 @@ from dependency_graph import (
     Language,
     EdgeRelation,
 )
+from dependency_graph.models.graph_data import Node, NodeType, Location
 
 
 @pytest.fixture
@@ -325,3 +326,26 @@ def test_get_cross_file_reference_by_line(sample_retriever, python_repo_suite_pa
             ),
         ]
     )
+
+
+def test_innermost_node_index_is_updated_with_the_graph(
+    sample_retriever, python_repo_suite_path
+):
+    file_path = python_repo_suite_path / "cross_file_context" / "main.py"
+    node = sample_retriever._get_innermost_node_by_line(file_path, 18)
+    assert node.name == "Foo.call"
+
+    inner_node = Node(
+        type=NodeType.VARIABLE,
+        name="inner",
+        location=Location(
+            file_path=file_path,
+            start_line=18,
+            start_column=9,
+            end_line=18,
+            end_column=14,
+        ),
+    )
+    sample_retriever.graph.add_node(inner_node)
+    assert sample_retriever._get_innermost_node_by_line(file_path, 18) == inner_node
+    assert sample_retriever._get_innermost_node_by_line(file_path, 17) == node
@@ -104,3 +104,38 @@ def test_lexicographical_cyclic_topological_sort6():
 
     key = lambda node: (isinstance(node, str), node)
     assert list(lexicographical_cyclic_topological_sort(DG, key=key)) == [1]
+
+
+def test_lexicographical_cyclic_topological_sort7():
+    """
+    Cycles are emitted as a whole, after the acyclic nodes that are ready
+
+    E -> B -> C -> D
+         ^    |
+         |    v
+         +--- A
+    """
+    DG = nx.MultiDiGraph(
+        [("E", "B"), ("B", "C"), ("C", "A"), ("A", "B"), ("C", "D"), ("C", "D")]
+    )
+
+    # The edge from E is ignored once E is emitted, so the cycle is entered from A
+    assert list(lexicographical_cyclic_topological_sort(DG)) == [
+        "E",
+        "A",
+        "B",
+        "C",
+        "D",
+    ]
+
+    DG.add_edge("D", "C")
+    DG.add_node("F")
+    # After A and B, C has one remaining in-edge from D and D has two parallel in-edges from C
+    assert list(lexicographical_cyclic_topological_sort(DG)) == [
+        "E",
+        "F",
+        "A",
+        "B",
+        "C",
+        "D",
+    ]
@@ -0,0 +1,149 @@
+import os
+
+from fs.memoryfs import MemoryFS
+
+from dependency_graph.models import VirtualPath
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.file_index import FileIndex
+
+
+def _make_repo(repo_path):
+    (repo_path / "src" / "pkg").mkdir(parents=True)
+    (repo_path / ".git").mkdir()
+    (repo_path / ".git" / "HEAD").write_text("")
+    (repo_path / "main.go").write_text("")
+    (repo_path / "src" / "a.go").write_text("")
+    (repo_path / "src" / "b.txt").write_text("")
+    (repo_path / "src" / "pkg" / "c.go").write_text("")
+
+
+def test_file_index(tmp_path):
+    _make_repo(tmp_path)
+    index = FileIndex(tmp_path)
+
+    assert index.is_file(tmp_path / "src" / "a.go")
+    assert index.is_file(tmp_path / "src" / "pkg" / ".." / "a.go")
+    assert not index.is_file(tmp_path / "src")
+    assert index.is_dir(tmp_path / "src")
+    assert index.exists(tmp_path / "src" / "pkg")
+    assert not index.exists(tmp_path / "src" / "d.go")
+    assert not index.exists(tmp_path / ".git" / "HEAD")
+
+    assert sorted(index.iterdir(tmp_path / "src")) == [
+        tmp_path / "src" / "a.go",
+        tmp_path / "src" / "b.txt",
+        tmp_path / "src" / "pkg",
+    ]
+    assert index.iter_subdirectories(tmp_path) == [tmp_path / "src"]
+    assert index.glob_suffix(tmp_path / "src", ".go") == [tmp_path / "src" / "a.go"]
+    assert sorted(index.glob_suffix(tmp_path / "src", ".go", recursive=True)) == [
+        tmp_path / "src" / "a.go",
+        tmp_path / "src" / "pkg" / "c.go",
+    ]
+    assert sorted(index.files_with_suffix(".go")) == [
+        tmp_path / "main.go",
+        tmp_path / "src" / "a.go",
+        tmp_path / "src" / "pkg" / "c.go",
+    ]
+    assert index.files_with_name("c.go") == [tmp_path / "src" / "pkg" / "c.go"]
+    assert index.resolve(tmp_path / "src" / "pkg" / ".." / "a.go") == (
+        tmp_path / "src" / "a.go"
+    )
+    assert index.resolve(tmp_path / "src") is None
+
+
+def test_file_index_resolves_symlinks(tmp_path):
+    _make_repo(tmp_path)
+    os.symlink(tmp_path / "src" / "a.go", tmp_path / "link.go")
+    os.symlink(tmp_path / "src", tmp_path / "link")
+    index = FileIndex(tmp_path)
+
+    assert index.resolve(tmp_path / "link.go") == tmp_path / "src" / "a.go"
+    assert index.is_dir(tmp_path / "link")
+    # Linked directories are not walked into
+    assert not index.exists(tmp_path / "link" / "a.go")
+
+
+def test_file_index_invalidate(tmp_path):
+    _make_repo(tmp_path)
+    index = FileIndex(tmp_path)
+
+    (tmp_path / "src" / "a.go").unlink()
+    (tmp_path / "new" / "dir").mkdir(parents=True)
+    (tmp_path / "new" / "dir" / "d.go").write_text("")
+    # The index is a snapshot until invalidated
+    assert index.is_file(tmp_path / "src" / "a.go")
+    assert not index.exists(tmp_path / "new")
+
+    index.invalidate([tmp_path / "src" / "a.go", tmp_path / "new" / "dir" / "d.go"])
+    assert not index.exists(tmp_path / "src" / "a.go")
+    assert index.is_file(tmp_path / "new" / "dir" / "d.go")
+    assert index.iter_subdirectories(tmp_path / "new") == [tmp_path / "new" / "dir"]
+    assert tmp_path / "new" in index.iterdir(tmp_path)
+    assert sorted(index.files_with_suffix(".go")) == [
+        tmp_path / "main.go",
+        tmp_path / "new" / "dir" / "d.go",
+        tmp_path / "src" / "pkg" / "c.go",
+    ]
+
+    assert index.files_with_name("a.go") == []
+
+    (tmp_path / "src" / "pkg" / "c.go").unlink()
+    index.invalidate()
+    assert not index.exists(tmp_path / "src" / "pkg" / "c.go")
+    assert index.is_dir(tmp_path / "src" / "pkg")
+
+
+def test_file_index_on_virtual_file_system():
+    repo_path = VirtualPath(MemoryFS(), "/repo")
+    _make_repo(repo_path)
+    index = FileIndex(repo_path)
+
+    assert index.is_file(VirtualPath(repo_path.fs, "/repo/src/pkg/c.go"))
+    assert not index.exists(VirtualPath(repo_path.fs, "/repo/.git/HEAD"))
+    assert sorted(index.glob_suffix(repo_path / "src", ".go", recursive=True)) == [
+        repo_path / "src" / "a.go",
+        repo_path / "src" / "pkg" / "c.go",
+    ]
+    resolved = index.resolve(repo_path / "main.go")
+    assert isinstance(resolved, VirtualPath)
+    assert resolved == repo_path / "main.go"
+
+
+def test_file_index_of_repository(tmp_path, monkeypatch):
+    _make_repo(tmp_path)
+    (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+    (tmp_path / "node_modules" / "dep" / "d.go").write_text("")
+    (tmp_path / "src" / "go.mod").write_text("module src\n")
+    (tmp_path / "src" / "go.work").write_text("go 1.21\n")
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "go.work").write_text("go 1.21\n")
+    repository = Repository(tmp_path, Language.Go, exclude=("node_modules/",))
+
+    def walk(self, directory):
+        raise AssertionError("The repository is walked again")
+
+    monkeypatch.setattr(FileIndex, "_walk", walk)
+    index = FileIndex(tmp_path, repository)
+
+    # The files and directories excluded from the repository are not indexed
+    assert not index.exists(tmp_path / "node_modules")
+    assert not index.exists(tmp_path / "node_modules" / "dep" / "d.go")
+    assert sorted(index.files_with_suffix(".go")) == [
+        tmp_path / "main.go",
+        tmp_path / "src" / "a.go",
+        tmp_path / "src" / "pkg" / "c.go",
+    ]
+    assert sorted(index.iterdir(tmp_path / "src")) == [
+        tmp_path / "src" / "a.go",
+        tmp_path / "src" / "go.mod",
+        tmp_path / "src" / "go.work",
+        tmp_path / "src" / "pkg",
+    ]
+    # The manifests are only looked up in the directories of the code files
+    assert index.files_with_name("go.work") == [tmp_path / "src" / "go.work"]
+    # The other files are checked in the file system
+    assert index.is_file(tmp_path / "src" / "b.txt")
+    assert not index.exists(tmp_path / "src" / "c.txt")
+    assert index.resolve(tmp_path / "src" / "b.txt") == tmp_path / "src" / "b.txt"
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from dependency_graph.utils.intervals import (
+    find_innermost_interval,
+    InnermostIntervalIndex,
+)
+
+
+@pytest.mark.parametrize(
+    "intervals, index, expected",
+    [
+        ([(1, 10, "a"), (2, 5, "b"), (3, 4, "c")], 3, (3, 4, "c")),
+        ([(1, 10, "a"), (2, 5, "b"), (3, 4, "c")], 5, (2, 5, "b")),
+        ([(1, 10, "a"), (2, 5, "b"), (3, 4, "c")], 6, (1, 10, "a")),
+        ([(1, 10, "a"), (2, 5, "b"), (3, 4, "c")], 11, None),
+        ([(1, 10, "a"), (2, 5, "b"), (3, 4, "c")], 0, None),
+        # The first interval wins when they have the same length
+        ([(1, 10, "a"), (1, 10, "b")], 5, (1, 10, "a")),
+        ([(1, 5, "a"), (3, 7, "b")], 4, (1, 5, "a")),
+        ([(5, 1, "invalid")], 3, None),
+        ([], 1, None),
+    ],
+)
+def test_innermost_interval_index(intervals, index, expected):
+    assert InnermostIntervalIndex(intervals).find_innermost_interval(index) == expected
+    assert find_innermost_interval(intervals, index) == expected
+
+
+def test_innermost_interval_index_is_consistent_with_linear_scan():
+    rng = random.Random(0)
+    for _ in range(50):
+        intervals = []
+        for i in range(rng.randint(1, 30)):
+            start = rng.randint(1, 100)
+            intervals.append((start, start + rng.randint(0, 40), i))
+        index = InnermostIntervalIndex(intervals)
+        for line in range(0, 150):
+            assert index.find_innermost_interval(line) == find_innermost_interval(
+                intervals, line
+            )
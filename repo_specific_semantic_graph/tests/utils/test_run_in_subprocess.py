@@ -3,7 +3,7 @@ from time import sleep
 
 import pytest
 
-from dependency_graph.utils.run_in_subprocess import SubprocessRunner
+from dependency_graph.utils.run_in_subprocess import SubprocessPool, SubprocessRunner
 
 
 # This is an example C code snippet that is assumed to cause a segmentation fault.
@@ -49,3 +49,42 @@ def test_run_will_reraise_error_with_original_traceback():
 def test_run_can_accept_args():
     result = SubprocessRunner(lambda x: x + 1, 1).run(timeout=1)
     assert result == 2
+
+
+def run_task(state, task, value=None):
+    if task == "sleep":
+        sleep(5)
+    elif task == "crash":
+        return c_function()
+    elif task == "error":
+        raise_error()
+    return state + value
+
+
+def test_pool_run():
+    with SubprocessPool(run_task, initializer=lambda: 1) as pool:
+        assert pool.run("add", 1, timeout=1) == 2
+        with pytest.raises(NotImplementedError, match="Original traceback:"):
+            pool.run("error", timeout=1)
+        with pytest.raises(TimeoutError, match="Process timed out after 1 seconds"):
+            pool.run("sleep", timeout=1)
+        with pytest.raises(RuntimeError, match="Process crashed with exit code:"):
+            pool.run("crash", timeout=1)
+        # The worker is respawned
+        assert pool.run("add", 2, timeout=1) == 3
+
+
+def test_pool_map_isolates_failing_tasks():
+    with SubprocessPool(run_task, initializer=lambda: 1, max_workers=2) as pool:
+        results = pool.map(
+            [("add", 1), ("crash",), ("sleep",), ("error",), ("add", 2)], timeout=1
+        )
+        assert results[0] == 2
+        assert isinstance(results[1], RuntimeError)
+        assert isinstance(results[2], TimeoutError)
+        assert isinstance(results[3], NotImplementedError)
+        assert results[4] == 3
+        assert len(pool._workers) <= 2
+
+    # The workers are stopped when the pool is closed
+    assert pool._workers == []
@@ -0,0 +1,129 @@
+import os
+
+from fs.memoryfs import MemoryFS
+
+from dependency_graph.models import VirtualPath
+from dependency_graph.models.language import Language
+from dependency_graph.models.repository import Repository
+from dependency_graph.utils.scan_files import GitIgnore, scan_files
+
+
+def _make_repo(repo_path):
+    for directory in ("src/pkg", "build", "node_modules/lib", "docs", ".git"):
+        (repo_path / directory).mkdir(parents=True)
+    for file_path in (
+        "main.py",
+        "stub.pyi",
+        "README.md",
+        "src/a.py",
+        "src/generated_a.py",
+        "src/pkg/b.py",
+        "src/pkg/keep_generated.py",
+        "build/c.py",
+        "node_modules/lib/d.py",
+        "docs/e.py",
+        ".git/f.py",
+    ):
+        (repo_path / file_path).write_text("")
+    (repo_path / ".gitignore").write_text("# Comment\n/build/\ngenerated_*.py\n")
+    (repo_path / "src" / "pkg" / ".gitignore").write_text("!keep_generated.py\n")
+    (repo_path / "src" / "pkg" / "keep_generated.py").write_text("")
+
+
+def test_gitignore():
+    gitignore = GitIgnore(["*.log", "!keep.log", "/root.txt", "out/", "a/**/b"])
+
+    assert gitignore.match("debug.log", False)
+    assert gitignore.match("dir/debug.log", False)
+    assert gitignore.match("keep.log", False) is False
+    assert gitignore.match("root.txt", False)
+    assert gitignore.match("dir/root.txt", False) is None
+    assert gitignore.match("out", True)
+    assert gitignore.match("out", False) is None
+    assert gitignore.match("a/b", True)
+    assert gitignore.match("a/x/y/b", False)
+    assert gitignore.match("main.py", False) is None
+
+
+def test_scan_files(tmp_path):
+    _make_repo(tmp_path)
+
+    assert scan_files(tmp_path, (".py", ".pyi")) == [
+        tmp_path / "docs" / "e.py",
+        tmp_path / "main.py",
+        tmp_path / "node_modules" / "lib" / "d.py",
+        tmp_path / "src" / "a.py",
+        tmp_path / "src" / "pkg" / "b.py",
+        tmp_path / "src" / "pkg" / "keep_generated.py",
+        tmp_path / "stub.pyi",
+    ]
+    assert scan_files(
+        tmp_path, (".py",), exclude=("node_modules/", "docs"), respect_gitignore=False
+    ) == [
+        tmp_path / "build" / "c.py",
+        tmp_path / "main.py",
+        tmp_path / "src" / "a.py",
+        tmp_path / "src" / "generated_a.py",
+        tmp_path / "src" / "pkg" / "b.py",
+        tmp_path / "src" / "pkg" / "keep_generated.py",
+    ]
+
+
+def test_scan_files_max_file_size(tmp_path):
+    (tmp_path / "small.py").write_text("x = 1\n")
+    (tmp_path / "large.py").write_text("x = 1\n" * 100)
+
+    assert scan_files(tmp_path, (".py",), max_file_size=100) == [tmp_path / "small.py"]
+
+
+def test_scan_files_symlinks(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("")
+    # A loop back to the root and a second link to the same directory
+    os.symlink(tmp_path, tmp_path / "src" / "loop")
+    os.symlink(tmp_path / "src", tmp_path / "link")
+    os.symlink(tmp_path / "src" / "a.py", tmp_path / "b.py")
+    os.symlink(tmp_path / "missing.py", tmp_path / "broken.py")
+
+    assert scan_files(tmp_path, (".py",)) == [
+        tmp_path / "b.py",
+        tmp_path / "src" / "a.py",
+    ]
+    assert scan_files(tmp_path, (".py",), follow_symlinks=True) == [
+        tmp_path / "b.py",
+        tmp_path / "link" / "a.py",
+    ]
+
+
+def test_scan_files_on_virtual_file_system():
+    repo_path = VirtualPath(MemoryFS(), "/repo")
+    _make_repo(repo_path)
+
+    assert scan_files(repo_path, (".py",), exclude=("node_modules/",)) == [
+        repo_path / "docs" / "e.py",
+        repo_path / "main.py",
+        repo_path / "src" / "a.py",
+        repo_path / "src" / "pkg" / "b.py",
+        repo_path / "src" / "pkg" / "keep_generated.py",
+    ]
+
+    (repo_path / "main.py").write_text("x = 1\n")
+    assert repo_path / "main.py" not in scan_files(repo_path, (".py",), max_file_size=0)
+
+
+def test_repository_files(tmp_path):
+    _make_repo(tmp_path)
+    repo = Repository(tmp_path, Language.Python, exclude=("docs/", "node_modules/"))
+
+    assert repo.files == [
+        tmp_path / "main.py",
+        tmp_path / "src" / "a.py",
+        tmp_path / "src" / "pkg" / "b.py",
+        tmp_path / "src" / "pkg" / "keep_generated.py",
+        tmp_path / "stub.pyi",
+    ]
+    repo.language = Language.Go
+    assert repo.files == []
+
+    repo.files = [tmp_path / "main.py", tmp_path / "src" / "a.py", tmp_path / "main.py"]
+    assert repo.files == [tmp_path / "main.py", tmp_path / "src" / "a.py"]
@@ -0,0 +1,70 @@
+import os
+
+from fs.memoryfs import MemoryFS
+
+from dependency_graph.models import VirtualPath
+from dependency_graph.models.graph_data import Location
+from dependency_graph.utils.source_cache import SourceCache, SourceFile
+from dependency_graph.utils.text import slice_text
+
+
+def test_source_file_slice():
+    text = "Line 1\r\nLine 2\nLine 3\n"
+    source_file = SourceFile.from_text(text)
+    for loc in ((1, 1, 1, 5), (2, 2, 3, 2), (3, 1, 3, 999), (1, 3, 2, 1)):
+        assert source_file.slice(*loc) == slice_text(text, *loc)
+
+
+def test_cache_hit_and_modification(tmp_path):
+    cache = SourceCache()
+    file_path = tmp_path / "a.py"
+    file_path.write_text("x = 1\n")
+
+    source_file = cache.get(file_path)
+    assert source_file.text == "x = 1\n"
+    assert cache.get(str(file_path)) is source_file
+
+    file_path.write_text("x = 12\n")
+    os.utime(file_path, ns=(0, 0))
+    assert cache.get(file_path).text == "x = 12\n"
+    assert len(cache) == 1
+
+
+def test_cache_is_size_bounded(tmp_path):
+    file_paths = []
+    for i in range(3):
+        file_path = tmp_path / f"{i}.py"
+        file_path.write_text("x" * 1000)
+        file_paths.append(file_path)
+
+    cache = SourceCache(max_size=2 * SourceFile.from_text("x" * 1000).size)
+    cache.get(file_paths[0])
+    cache.get(file_paths[1])
+    cache.get(file_paths[0])
+    cache.get(file_paths[2])
+    # The least recently used file is evicted
+    assert file_paths[1] not in cache
+    assert file_paths[0] in cache
+    assert file_paths[2] in cache
+
+    cache.invalidate(file_paths[0])
+    assert file_paths[0] not in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_virtual_file():
+    cache = SourceCache()
+    file_path = VirtualPath(MemoryFS(), "/a.py")
+    file_path.write_text("def foo():\n    pass\n")
+    assert cache.get(file_path).slice(2, 5, 2, 9) == "pass"
+
+    file_path.write_text("def foo():\n    return 1\n")
+    assert cache.get(file_path).slice(2, 5, 2, 11) == "return"
+
+
+def test_location_get_text(tmp_path):
+    file_path = tmp_path / "a.py"
+    file_path.write_text("def foo():\n    pass\n")
+    assert Location(file_path, 2, 5, 2, 9).get_text() == "pass"
+    assert Location(file_path, 2, 5, None, None).get_text() is None
@@ -10,6 +10,7 @@ from joblib import Parallel, delayed
 from tqdm import tqdm
 
 from dependency_graph import (
+    CompactDependencyGraph,
     DependencyGraph,
     Repository,
     Language,
@@ -84,7 +85,7 @@ def construct_cross_file_definition_context(
         context = RetrievedChunk(
             retrieved_chunk=retrieved_chunk_content,
             filename=str(edge[1].location.file_path.relative_to(repo_path)),
-            score=graph.graph.in_degree(edge[1]),
+            score=graph.in_degree(edge[1]),
             node_type=edge[1].type.value,
             relation=edge[2].relation.name,
         )
@@ -118,7 +119,7 @@ def construct_cross_file_reference_context(
             # Generate the stub only if the node is not a function
             retrieved_chunk=edge[1].get_text(),
             filename=str(edge[1].location.file_path.relative_to(repo_path)),
-            score=graph.graph.in_degree(edge[1]),
+            score=graph.in_degree(edge[1]),
             node_type=edge[1].type.value,
             relation=edge[2].relation.name,
         )
@@ -162,12 +163,21 @@ def process_data(
     with lock:
         if repository not in dependency_graph_dict:
             if dependency_graph_suite_path and dependency_graph_suite_path.is_dir():
-                dependency_graph_path = (
-                    dependency_graph_suite_path / f"{repository}.json"
-                )
-                dependency_graph_dict[repository] = DependencyGraph.from_json(
-                    dependency_graph_path.read_text()
+                binary_dependency_graph_path = (
+                    dependency_graph_suite_path / f"{repository}.bin"
                 )
+                if binary_dependency_graph_path.exists():
+                    # The binary graph is memory-mapped and decoded lazily
+                    dependency_graph_dict[repository] = (
+                        CompactDependencyGraph.from_binary(binary_dependency_graph_path)
+                    )
+                else:
+                    dependency_graph_path = (
+                        dependency_graph_suite_path / f"{repository}.json"
+                    )
+                    dependency_graph_dict[repository] = DependencyGraph.from_json(
+                        dependency_graph_path.read_text()
+                    )
             else:
                 repo = Repository(repo_path, Language(language))
                 try:
@@ -222,7 +232,7 @@ def main(
     :param output_path:
     :param max_workers:
     :param dependency_graph_suite_path: if provided, load pre-generated Repo-Specific Semantic Graph
-    from `dependency_graph_suite_path/{repository}.json`
+    from `dependency_graph_suite_path/{repository}.bin` in binary format, or `dependency_graph_suite_path/{repository}.json`
     :return:
     """
     cceval_data = data_path.read_text().splitlines()